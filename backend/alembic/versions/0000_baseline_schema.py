@@ -0,0 +1,128 @@
+"""Bring a database created before migrations up to the schema 0001 starts from
+
+Databases created before Alembic was introduced only have the original
+tables. create_all adds new tables at startup but never new columns or
+indexes on existing ones, so those are added here: the recap schedule on
+portfolios, the recap fingerprint with the (portfolio_id, created_at)
+index used to find a portfolio's latest recap, the delivery queue
+columns with the sent_at index the delivery worker claims by, and the
+indexes on portfolio_holdings and portfolios.user_id. On PostgreSQL recap
+content also becomes bytea, since bodies are now stored compressed;
+existing plain-text bodies are read back as they are.
+
+Indexes are only created while their columns exist: on a database that
+init_db created at the current schema, holdings no longer have a symbol.
+Downgrading leaves recap content as bytea, because compressed bodies have
+no text form.
+
+Each step checks the live schema first, since init_db creates new
+databases at the current schema before this runs.
+
+Revision ID: 0000_baseline_schema
+Revises:
+Create Date: 2026-10-19 08:00:00
+
+"""
+from typing import Dict, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0000_baseline_schema"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES: Dict[str, Dict[str, List[str]]] = {
+    "portfolios": {
+        "ix_portfolios_next_recap_at": ["next_recap_at"],
+        "ix_portfolios_user_id": ["user_id"],
+    },
+    "portfolio_holdings": {
+        "ix_portfolio_holdings_portfolio_id": ["portfolio_id"],
+        "ix_portfolio_holdings_symbol": ["symbol"],
+        "ix_portfolio_holdings_validation_status_symbol": ["validation_status", "symbol"],
+    },
+    "email_recaps": {
+        "ix_email_recaps_portfolio_id_created_at": ["portfolio_id", "created_at"],
+        "ix_email_recaps_sent_at": ["sent_at"],
+    },
+}
+
+
+def _new_columns() -> Dict[str, List[sa.Column]]:
+    # Fresh Column objects per database: env.py runs this once per shard
+    return {
+        "portfolios": [
+            sa.Column("next_recap_at", sa.DateTime(), nullable=True),
+            sa.Column("recap_claim_token", sa.String(), nullable=True),
+        ],
+        "email_recaps": [
+            sa.Column("fingerprint", sa.String(64), nullable=True),
+            sa.Column("delivery_attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("delivery_claimed_at", sa.DateTime(), nullable=True),
+            sa.Column("delivery_token", sa.String(), nullable=True),
+        ],
+    }
+
+
+def _columns(table: str) -> List[str]:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return []
+    return [column["name"] for column in inspector.get_columns(table)]
+
+
+def _indexes(table: str) -> List[str]:
+    return [index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)]
+
+
+def upgrade() -> None:
+    for table, columns in _new_columns().items():
+        existing = _columns(table)
+        if not existing:
+            continue
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+    for table, indexes in INDEXES.items():
+        table_columns = _columns(table)
+        if not table_columns:
+            continue
+        existing = _indexes(table)
+        for name, columns in indexes.items():
+            if name not in existing and set(columns) <= set(table_columns):
+                op.create_index(name, table, columns)
+
+    if op.get_bind().dialect.name == "postgresql" and _columns("email_recaps"):
+        content = next(
+            column for column in sa.inspect(op.get_bind()).get_columns("email_recaps") if column["name"] == "content"
+        )
+        if isinstance(content["type"], sa.String):
+            op.alter_column(
+                "email_recaps", "content",
+                type_=sa.LargeBinary(),
+                existing_type=sa.Text(),
+                existing_nullable=False,
+                postgresql_using="convert_to(content, 'UTF8')"
+            )
+
+
+def downgrade() -> None:
+    for table, indexes in INDEXES.items():
+        if not _columns(table):
+            continue
+        existing = _indexes(table)
+        for name in indexes:
+            if name in existing:
+                op.drop_index(name, table_name=table)
+
+    for table, columns in _new_columns().items():
+        existing = _columns(table)
+        if not existing:
+            continue
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                if column.name in existing:
+                    batch.drop_column(column.name)
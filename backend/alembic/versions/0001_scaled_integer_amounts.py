@@ -0,0 +1,93 @@
+"""Store holding quantity, price and market value as scaled integers
+
+Quantities become BIGINT micro-units (scale 6) and money becomes BIGINT
+minor units (scale 2), matching ScaledInteger in app.models.types. Values
+are rounded to the new scale; quantities with more than 6 decimal places
+lose the excess.
+
+init_db creates new databases with the current models, so each step checks
+the live column types and only converts columns that are still NUMERIC.
+
+Revision ID: 0001_scaled_integer_amounts
+Revises: 0000_baseline_schema
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001_scaled_integer_amounts"
+down_revision: Union[str, None] = "0000_baseline_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "portfolio_holdings"
+
+SCALES = {"quantity": 6, "price": 2, "market_value": 2}
+NUMERIC_TYPES = {
+    "quantity": sa.Numeric(precision=18, scale=8),
+    "price": sa.Numeric(precision=18, scale=2),
+    "market_value": sa.Numeric(precision=18, scale=2),
+}
+
+
+def _column_types() -> Dict[str, sa.types.TypeEngine]:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return {}
+    return {column["name"]: column["type"] for column in inspector.get_columns(TABLE)}
+
+
+def upgrade() -> None:
+    types = _column_types()
+    pending = [name for name in SCALES if name in types and not isinstance(types[name], sa.Integer)]
+    if not pending:
+        return
+
+    if op.get_bind().dialect.name == "postgresql":
+        for name in pending:
+            op.alter_column(
+                TABLE, name,
+                type_=sa.BigInteger(),
+                existing_type=NUMERIC_TYPES[name],
+                existing_nullable=True,
+                postgresql_using=f"round({name} * {10 ** SCALES[name]})::bigint"
+            )
+        return
+
+    # Scale in place first: the table rebuild copies each column with
+    # CAST(... AS BIGINT), which would otherwise drop the fractions
+    for name in pending:
+        op.execute(
+            f"UPDATE {TABLE} SET {name} = CAST(ROUND({name} * {10 ** SCALES[name]}) AS INTEGER) "
+            f"WHERE {name} IS NOT NULL"
+        )
+    with op.batch_alter_table(TABLE) as batch:
+        for name in pending:
+            batch.alter_column(name, type_=sa.BigInteger(), existing_type=NUMERIC_TYPES[name], existing_nullable=True)
+
+
+def downgrade() -> None:
+    types = _column_types()
+    pending = [name for name in SCALES if name in types and isinstance(types[name], sa.Integer)]
+    if not pending:
+        return
+
+    if op.get_bind().dialect.name == "postgresql":
+        for name in pending:
+            op.alter_column(
+                TABLE, name,
+                type_=NUMERIC_TYPES[name],
+                existing_type=sa.BigInteger(),
+                existing_nullable=True,
+                postgresql_using=f"{name}::numeric / {10 ** SCALES[name]}"
+            )
+        return
+
+    with op.batch_alter_table(TABLE) as batch:
+        for name in pending:
+            batch.alter_column(name, type_=NUMERIC_TYPES[name], existing_type=sa.BigInteger(), existing_nullable=True)
+    for name in pending:
+        op.execute(f"UPDATE {TABLE} SET {name} = {name} * 1.0 / {10 ** SCALES[name]} WHERE {name} IS NOT NULL")
@@ -0,0 +1,109 @@
+"""Store UUID keys as 16-byte BLOBs on SQLite
+
+Every primary and foreign key column becomes BLOB(16), matching CompactUUID
+in app.models.types. PostgreSQL already stores these columns as native uuid
+and is left unchanged.
+
+The old columns were declared UUID, which SQLite gives NUMERIC affinity, so
+a key whose hex happened to read as a number was stored as a REAL and its
+original value is gone. Such keys get a replacement derived from the stored
+number, which is the same in every table that references them.
+
+The recap search index keys rows by recap id, so it is dropped here and
+rebuilt by the application's next startup.
+
+Revision ID: 0002_compact_uuid_keys
+Revises: 0001_scaled_integer_amounts
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Dict, List, Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002_compact_uuid_keys"
+down_revision: Union[str, None] = "0001_scaled_integer_amounts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Parents first, so the rebuilt tables are created in dependency order
+KEY_COLUMNS: Dict[str, List[str]] = {
+    "users": ["id"],
+    "portfolios": ["id", "user_id"],
+    "portfolio_holdings": ["id", "portfolio_id"],
+    "email_recaps": ["id", "portfolio_id"],
+    "holding_snapshots": ["id", "portfolio_id"],
+}
+
+SEARCH_OBJECTS = [
+    ("TRIGGER", "email_recaps_search_insert"),
+    ("TRIGGER", "email_recaps_search_delete"),
+    ("TRIGGER", "email_recaps_search_update"),
+    ("VIEW", "email_recaps_search_content"),
+    ("TABLE", "email_recaps_fts"),
+    ("TABLE", "email_recaps_search_keys"),
+]
+
+LOST_KEY_NAMESPACE = uuid.UUID("5b0d6f1e-8f5a-4d43-9a43-3f3c1b8f2f0e")
+
+
+def _key_bytes(value):
+    if value is None or isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return uuid.UUID(value).bytes
+    return uuid.uuid5(LOST_KEY_NAMESPACE, repr(value)).bytes
+
+
+def _tables_with_keys(compact: bool) -> List[str]:
+    """Existing tables whose keys are currently BLOBs (compact) or the old UUID type"""
+    inspector = sa.inspect(op.get_bind())
+    tables = []
+    for table in KEY_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        id_type = next(column["type"] for column in inspector.get_columns(table) if column["name"] == "id")
+        if isinstance(id_type, sa.LargeBinary) == compact:
+            tables.append(table)
+    return tables
+
+
+def _drop_recap_search():
+    for kind, name in SEARCH_OBJECTS:
+        op.execute(f"DROP {kind} IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    tables = _tables_with_keys(compact=False)
+    if not tables:
+        return
+
+    _drop_recap_search()
+    op.get_bind().connection.driver_connection.create_function("scout_key_bytes", 1, _key_bytes, deterministic=True)
+    for table in tables:
+        assignments = ", ".join(f"{column} = scout_key_bytes({column})" for column in KEY_COLUMNS[table])
+        op.execute(f"UPDATE {table} SET {assignments}")
+        with op.batch_alter_table(table) as batch:
+            for column in KEY_COLUMNS[table]:
+                batch.alter_column(column, type_=sa.LargeBinary(16))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    tables = _tables_with_keys(compact=True)
+    if not tables:
+        return
+
+    _drop_recap_search()
+    # Back to the 32-character hex strings the previous models bind
+    for table in tables:
+        assignments = ", ".join(f"{column} = lower(hex({column}))" for column in KEY_COLUMNS[table])
+        op.execute(f"UPDATE {table} SET {assignments}")
+        with op.batch_alter_table(table) as batch:
+            for column in KEY_COLUMNS[table]:
+                batch.alter_column(column, type_=sa.Uuid())
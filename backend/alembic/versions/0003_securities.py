@@ -0,0 +1,119 @@
+"""Move holding symbols into a securities table
+
+Each distinct symbol becomes one securities row keyed by an integer id, and
+holdings reference it through security_id. Symbols are upper-cased and
+trimmed, as imports already stored them, so holdings created through the
+API in another case join the same security. Holdings keep their own name
+and sector; a security's are filled in only by the symbol validator.
+
+init_db creates the empty securities table for an existing database before
+this runs, so the table is only created when missing, and holdings are only
+converted while they still have a symbol column. A database without
+holdings (a directory that holds no tenants) is left alone.
+
+Revision ID: 0003_securities
+Revises: 0002_compact_uuid_keys
+Create Date: 2026-10-19 15:00:00
+
+"""
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003_securities"
+down_revision: Union[str, None] = "0002_compact_uuid_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "portfolio_holdings"
+
+SYMBOL_INDEXES = {
+    "ix_portfolio_holdings_symbol": ["symbol"],
+    "ix_portfolio_holdings_validation_status_symbol": ["validation_status", "symbol"],
+}
+SECURITY_INDEXES = {
+    "ix_portfolio_holdings_security_id": ["security_id"],
+    "ix_portfolio_holdings_validation_status_security_id": ["validation_status", "security_id"],
+}
+SECURITY_FOREIGN_KEY = "fk_portfolio_holdings_security_id_securities"
+
+
+def _columns() -> List[str]:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return []
+    return [column["name"] for column in inspector.get_columns(TABLE)]
+
+
+def _indexes() -> List[str]:
+    return [index["name"] for index in sa.inspect(op.get_bind()).get_indexes(TABLE)]
+
+
+def upgrade() -> None:
+    columns = _columns()
+    if not columns:
+        return
+
+    if not sa.inspect(op.get_bind()).has_table("securities"):
+        op.create_table(
+            "securities",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("symbol", sa.String(), nullable=False, unique=True),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("sector", sa.String(), nullable=True),
+        )
+
+    if "symbol" not in columns:
+        return
+
+    op.execute(
+        "INSERT INTO securities (symbol) "
+        f"SELECT DISTINCT upper(trim(symbol)) FROM {TABLE} "
+        "WHERE upper(trim(symbol)) NOT IN (SELECT symbol FROM securities) "
+    )
+    op.add_column(TABLE, sa.Column("security_id", sa.Integer(), nullable=True))
+    op.execute(
+        f"UPDATE {TABLE} SET security_id = "
+        f"(SELECT id FROM securities WHERE securities.symbol = upper(trim({TABLE}.symbol)))"
+    )
+
+    indexes = _indexes()
+    with op.batch_alter_table(TABLE) as batch:
+        for name in SYMBOL_INDEXES:
+            if name in indexes:
+                batch.drop_index(name)
+        batch.drop_column("symbol")
+        batch.alter_column("security_id", existing_type=sa.Integer(), nullable=False)
+        batch.create_foreign_key(SECURITY_FOREIGN_KEY, "securities", ["security_id"], ["id"])
+        for name, columns in SECURITY_INDEXES.items():
+            batch.create_index(name, columns)
+
+
+def downgrade() -> None:
+    columns = _columns()
+    if "security_id" not in columns:
+        return
+
+    for column in ("symbol", "name", "sector"):
+        if column not in columns:
+            op.add_column(TABLE, sa.Column(column, sa.String(), nullable=True))
+    # A holding without its own name or sector showed the security's
+    for column in ("symbol", "name", "sector"):
+        own = f"{TABLE}.{column}" if column != "symbol" else "NULL"
+        op.execute(
+            f"UPDATE {TABLE} SET {column} = coalesce({own}, "
+            f"(SELECT {column} FROM securities WHERE securities.id = {TABLE}.security_id))"
+        )
+
+    indexes = _indexes()
+    with op.batch_alter_table(TABLE) as batch:
+        for name in SECURITY_INDEXES:
+            if name in indexes:
+                batch.drop_index(name)
+        batch.drop_column("security_id")
+        batch.alter_column("symbol", existing_type=sa.String(), nullable=False)
+        for name, columns in SYMBOL_INDEXES.items():
+            batch.create_index(name, columns)
+
+    op.drop_table("securities")
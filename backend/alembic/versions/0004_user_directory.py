@@ -0,0 +1,54 @@
+"""Add the user directory that maps sign-in emails to user ids
+
+Sign-in and registration look users up by email in user_directory, which
+lives in DATABASE_URL however many shards hold the users themselves. The
+directory is created and filled from this database's users; it is skipped
+on databases that are only shards.
+
+Revision ID: 0004_user_directory
+Revises: 0003_securities
+Create Date: 2026-10-19 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004_user_directory"
+down_revision: Union[str, None] = "0003_securities"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "user_directory"
+
+
+def _holds_directory() -> bool:
+    # Set per database by env.py; a single-database setup is its own directory
+    return op.get_context().opts.get("holds_directory", True)
+
+
+def upgrade() -> None:
+    if not _holds_directory():
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        # Same key storage as the users table it points at
+        key_type = sa.Uuid() if op.get_bind().dialect.name == "postgresql" else sa.LargeBinary(16)
+        op.create_table(
+            TABLE,
+            sa.Column("email", sa.String(), primary_key=True),
+            sa.Column("user_id", key_type, nullable=False, unique=True),
+        )
+
+    if inspector.has_table("users"):
+        op.execute(
+            f"INSERT INTO {TABLE} (email, user_id) "
+            f"SELECT email, id FROM users WHERE email NOT IN (SELECT email FROM {TABLE})"
+        )
+
+
+def downgrade() -> None:
+    if _holds_directory() and sa.inspect(op.get_bind()).has_table(TABLE):
+        op.drop_table(TABLE)
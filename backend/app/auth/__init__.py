@@ -1,4 +1,4 @@
-from .jwt_handler import create_access_token, create_refresh_token, verify_token, get_current_user
+from .jwt_handler import create_access_token, create_refresh_token, verify_token, get_current_user, get_current_admin
 from .password import verify_password, get_password_hash
 
 __all__ = [
@@ -6,6 +6,7 @@ __all__ = [
     "create_refresh_token",
     "verify_token",
     "get_current_user",
+    "get_current_admin",
     "verify_password",
     "get_password_hash"
 ]
\ No newline at end of file
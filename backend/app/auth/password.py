@@ -1,11 +1,21 @@
-from passlib.context import CryptContext
+from functools import lru_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..instrumentation.metrics import track_password_hash
+
+
+@lru_cache(maxsize=None)
+def _password_context():
+    # passlib and bcrypt are only needed once someone logs in; importing them
+    # lazily keeps them off every worker's startup path
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with track_password_hash("verify"):
+        return _password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    with track_password_hash("hash"):
+        return _password_context().hash(password)
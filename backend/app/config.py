@@ -1,13 +1,63 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
     database_url: str
+    shard_urls: Dict[str, str] = {}
+    shard_ring_vnodes: int = 64
+    init_db_on_startup: bool = True
+    background_jobs_enabled: bool = True
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    symbol_master_path: Optional[str] = None
+    symbol_validation_interval_seconds: int = 30
+    symbol_validation_batch_size: int = 5000
+    recap_scheduler_enabled: bool = False
+    recap_scheduler_interval_seconds: int = 60
+    recap_scheduler_batch_size: int = 1000
+    recap_scheduler_workers: int = 4
+    recap_scheduler_time_budget_seconds: int = 600
+    smtp_host: Optional[str] = None
+    smtp_port: int = 25
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_use_tls: bool = False
+    email_sender: str = "Scout Portfolio Tracker <recaps@localhost>"
+    email_delivery_connections: int = 4
+    email_delivery_interval_seconds: int = 30
+    email_delivery_batch_size: int = 500
+    email_delivery_max_attempts: int = 5
+    event_stream_max_connections: int = 1000
+    event_stream_max_per_portfolio: int = 20
+    event_stream_queue_size: int = 256
+    event_stream_heartbeat_seconds: int = 15
+    server_timing_enabled: bool = True
+    slow_query_ms: Optional[float] = 200
+    n_plus_one_threshold: int = 5
+    metrics_enabled: bool = True
+    admin_emails: List[str] = []
+    profiler_enabled: bool = True
+    profiler_interval_ms: float = 5
+    profiler_max_sessions: int = 20
+    admission_enabled: bool = True
+    admission_max_in_flight: int = 64
+    admission_max_clients: int = 100000
+    admission_auth_per_minute: float = 10
+    admission_auth_burst: int = 5
+    admission_auth_max_in_flight: Optional[int] = 8
+    admission_import_per_minute: float = 6
+    admission_import_burst: int = 3
+    admission_import_max_in_flight: Optional[int] = 2
+    admission_export_per_minute: float = 30
+    admission_export_burst: int = 5
+    admission_export_max_in_flight: Optional[int] = 4
+    admission_read_per_minute: float = 1200
+    admission_read_burst: int = 200
+    holdings_cache_max_bytes: int = 64 * 1024 * 1024
+    securities_cache_max_entries: int = 100000
 
     class Config:
         env_file = ".env"
@@ -1,17 +1,200 @@
-from sqlalchemy import create_engine
+from typing import Callable, Dict, List, Optional, TypeVar
+from sqlalchemy import Integer, LargeBinary, create_engine, event, exists, inspect, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import uuid
+import zlib
+
 from .config import settings
+from .sharding import HashRing
+
+# Shard name used when SHARD_URLS is empty and DATABASE_URL holds every tenant
+DEFAULT_SHARD = "default"
+
+T = TypeVar("T")
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Columns added to tables that predate migrations; create_all never adds them
+MIGRATED_COLUMNS: Dict[str, List[str]] = {
+    "portfolios": ["next_recap_at", "recap_claim_token"],
+    "email_recaps": ["fingerprint", "delivery_attempts", "delivery_claimed_at", "delivery_token"],
+    "portfolio_holdings": ["name", "sector"],
+}
 
 Base = declarative_base()
 
 
+def _sqlite_inflate(value):
+    # Mirrors CompressedText so SQL (search triggers, views) can read recap bodies
+    if value is None or isinstance(value, str):
+        return value
+    try:
+        return zlib.decompress(value).decode("utf-8")
+    except zlib.error:
+        return bytes(value).decode("utf-8")
+
+
+def _sqlite_key_token(value):
+    # Renders a stored UUID key as a single full-text token
+    if value is None:
+        return None
+    if isinstance(value, (bytes, memoryview)):
+        return bytes(value).hex()
+    return uuid.UUID(str(value)).hex
+
+
+def create_database_engine(url: str) -> Engine:
+    database_engine = create_engine(url)
+    if database_engine.dialect.name == "sqlite":
+        @event.listens_for(database_engine, "connect")
+        def _register_sqlite_functions(dbapi_connection, connection_record):
+            dbapi_connection.create_function("scout_inflate", 1, _sqlite_inflate, deterministic=True)
+            dbapi_connection.create_function("scout_key_token", 1, _sqlite_key_token, deterministic=True)
+    return database_engine
+
+
+# DATABASE_URL: the user directory, and every tenant unless SHARD_URLS names
+# other databases. A shard on the same URL shares this engine and its pool.
+engine = create_database_engine(settings.database_url)
+
+shard_engines: Dict[str, Engine] = {
+    name: engine if url == settings.database_url else create_database_engine(url)
+    for name, url in (settings.shard_urls or {DEFAULT_SHARD: settings.database_url}).items()
+}
+shard_ring = HashRing(shard_engines, vnodes=settings.shard_ring_vnodes)
+
+
+def database_engines() -> List[Engine]:
+    """Every distinct engine, the directory's first"""
+    engines = [engine]
+    engines.extend(shard_engine for shard_engine in shard_engines.values() if shard_engine is not engine)
+    return engines
+
+
+def shard_for(user_id: uuid.UUID) -> str:
+    return shard_ring.owner(user_id)
+
+
+class TenantSession(Session):
+    """Session routed to one tenant's shard.
+
+    Directory models (``info={"directory": True}``) always go to DATABASE_URL;
+    everything else goes to the shard in ``info["shard"]``, which
+    ``use_tenant`` sets from the user id. With a single shard the shard is
+    implied, so scripts and jobs need no setup.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if mapper is not None and mapper.local_table.info.get("directory"):
+            return engine
+        shard = self.info.get("shard")
+        if shard is None:
+            if len(shard_engines) > 1:
+                raise RuntimeError("No tenant shard chosen for this session; call use_tenant() or shard_session()")
+            return next(iter(shard_engines.values()))
+        return shard_engines[shard]
+
+
+SessionLocal = sessionmaker(class_=TenantSession, autocommit=False, autoflush=False)
+
+
+def use_tenant(db: Session, user_id: uuid.UUID) -> str:
+    """Route the rest of this session's tenant queries to the user's shard"""
+    db.info["shard"] = shard = shard_for(user_id)
+    return shard
+
+
+def shard_session(shard: Optional[str]) -> Session:
+    return SessionLocal(info={"shard": shard})
+
+
+def for_each_shard(work: Callable[[Session], T], shards: Optional[List[str]] = None) -> Dict[str, T]:
+    """Run ``work`` in its own session on every shard, for jobs and admin queries that span tenants"""
+    results = {}
+    for shard in shards or list(shard_engines):
+        db = shard_session(shard)
+        try:
+            results[shard] = work(db)
+        finally:
+            db.close()
+    return results
+
+
+def check_migrations():
+    """Refuse to run against a schema that still needs ``alembic upgrade head``.
+
+    create_all only adds missing tables, so a database from before a column
+    change keeps the old columns, and the models would misread or miss them.
+    """
+    from .models.user import User
+    from .models.user_directory import UserDirectory
+
+    for shard, shard_engine in shard_engines.items():
+        inspector = inspect(shard_engine)
+        for table, columns in MIGRATED_COLUMNS.items():
+            present = {column["name"] for column in inspector.get_columns(table)}
+            missing = [name for name in columns if name not in present]
+            if missing:
+                raise RuntimeError(
+                    f"{table}.{', '.join(missing)} missing on shard {shard!r}; "
+                    "run `alembic upgrade head` in backend/ before starting the application"
+                )
+
+        holdings_columns = {
+            column["name"]: column["type"] for column in inspector.get_columns("portfolio_holdings")
+        }
+        legacy = [
+            name for name in ("quantity", "price", "market_value")
+            if not isinstance(holdings_columns[name], Integer)
+        ]
+        # Keys are 16-byte BLOBs everywhere but PostgreSQL, which keeps its native uuid
+        if shard_engine.dialect.name != "postgresql" and not isinstance(holdings_columns["id"], LargeBinary):
+            legacy.append("id")
+        # Symbols moved to securities
+        if "security_id" not in holdings_columns:
+            legacy.append("symbol")
+        if legacy:
+            raise RuntimeError(
+                f"portfolio_holdings.{', '.join(legacy)} on shard {shard!r} predate the current schema; "
+                "run `alembic upgrade head` in backend/ before starting the application"
+            )
+
+    # Users from before the directory can't sign in until it is backfilled
+    if any(shard_engine is engine for shard_engine in shard_engines.values()):
+        with engine.connect() as connection:
+            if connection.scalar(select(exists().select_from(User))) and not connection.scalar(
+                select(exists().select_from(UserDirectory))
+            ):
+                raise RuntimeError(
+                    "user_directory is empty; run `alembic upgrade head` in backend/ before starting the application"
+                )
+
+
+def init_db():
+    """Create missing tables and the recap search index on every database; safe to run on every start"""
+    from . import models  # registers every table on Base
+    from .services.recap_search import install_recap_search
+
+    directory_tables = [table for table in Base.metadata.sorted_tables if table.info.get("directory")]
+    tenant_tables = [table for table in Base.metadata.sorted_tables if not table.info.get("directory")]
+
+    Base.metadata.create_all(bind=engine, tables=directory_tables)
+    for shard_engine in shard_engines.values():
+        Base.metadata.create_all(bind=shard_engine, tables=tenant_tables)
+    check_migrations()
+    for shard_engine in shard_engines.values():
+        install_recap_search(shard_engine)
+
+
+def dispose_engines():
+    for database_engine in database_engines():
+        database_engine.dispose()
+
+
 def get_db():
+    # Unrouted until get_current_user (or the auth endpoints) picks the tenant
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,51 @@
+from .metrics import (
+    MetricsMiddleware,
+    instrument_pool,
+    render_metrics,
+    track_password_hash,
+)
+from .profiler import (
+    ProfileSession,
+    Profiler,
+    ProfilerMiddleware,
+    profiled_thread,
+)
+from .queries import (
+    QueryStats,
+    QueryTrackingMiddleware,
+    assert_max_queries,
+    current_query_stats,
+    instrument_engine,
+    parameter_shape,
+    track_queries,
+)
+from .timing import (
+    RequestTimer,
+    ServerTimingMiddleware,
+    TimedRoute,
+    current_timer,
+    span,
+)
+
+__all__ = [
+    "MetricsMiddleware",
+    "ProfileSession",
+    "Profiler",
+    "ProfilerMiddleware",
+    "QueryStats",
+    "QueryTrackingMiddleware",
+    "RequestTimer",
+    "ServerTimingMiddleware",
+    "TimedRoute",
+    "assert_max_queries",
+    "current_query_stats",
+    "current_timer",
+    "instrument_engine",
+    "instrument_pool",
+    "parameter_shape",
+    "profiled_thread",
+    "render_metrics",
+    "span",
+    "track_password_hash",
+    "track_queries",
+]
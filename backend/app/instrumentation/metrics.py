@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, Tuple
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# With several workers each process writes its samples to files under
+# PROMETHEUS_MULTIPROC_DIR (set before the app is imported) and /metrics
+# merges them, so any worker can answer a scrape for all of them.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+REQUEST_LATENCY = Histogram(
+    "scout_http_request_duration_seconds",
+    "Time to the end of the response body, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "scout_http_requests_in_progress",
+    "Requests being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKOUTS = Counter(
+    "scout_db_pool_checkouts_total",
+    "Connections handed out by the SQLAlchemy pool"
+)
+DB_POOL_CONNECTS = Counter(
+    "scout_db_pool_connections_opened_total",
+    "New DBAPI connections opened by the pool"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "scout_db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "scout_db_pool_capacity",
+    "Pool size plus overflow; checked_out at this level means callers wait",
+    multiprocess_mode="livesum"
+)
+
+PASSWORD_HASHES_IN_PROGRESS = Gauge(
+    "scout_password_hash_in_progress",
+    "bcrypt hash/verify calls started and not yet finished, including those waiting for a CPU",
+    ["operation"],
+    multiprocess_mode="livesum"
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "scout_password_hash_duration_seconds",
+    "bcrypt hash/verify wall time",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+)
+
+IMPORT_ROWS = Counter(
+    "scout_import_rows_total",
+    "CSV rows processed by holdings imports; rate() gives rows per second"
+)
+IMPORT_DURATION = Histogram(
+    "scout_import_duration_seconds",
+    "Wall time of holdings imports",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+
+ADMISSION_DECISIONS = Counter(
+    "scout_admission_decisions_total",
+    "Requests accepted, rate limited (429) or shed (503) by the admission controller",
+    ["route_class", "decision"]
+)
+
+HOLDINGS_CACHE_LOOKUPS = Counter(
+    "scout_holdings_cache_lookups_total",
+    "Holdings-list cache lookups by result",
+    ["result"]
+)
+HOLDINGS_CACHE_BYTES = Gauge(
+    "scout_holdings_cache_bytes",
+    "Bytes held by the holdings-list cache",
+    multiprocess_mode="livesum"
+)
+
+
+@contextmanager
+def track_password_hash(operation: str) -> Iterator[None]:
+    gauge = PASSWORD_HASHES_IN_PROGRESS.labels(operation)
+    gauge.inc()
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        PASSWORD_HASH_DURATION.labels(operation).observe(perf_counter() - started)
+        gauge.dec()
+
+
+def instrument_pool(engine: Engine):
+    """Count pool checkouts and track how many connections are in use; capacity adds up across engines"""
+    pool = engine.pool
+    if hasattr(pool, "size") and hasattr(pool, "_max_overflow"):
+        DB_POOL_CAPACITY.inc(pool.size() + max(pool._max_overflow, 0))
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition for this process, or every worker in multiprocess mode"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template and requests in flight"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(scope["method"])
+        in_progress.inc()
+        started = perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Templates, not raw paths, keep the label set bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(scope["method"], route, str(status_code)).observe(perf_counter() - started)
@@ -0,0 +1,293 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+
+from starlette.routing import compile_path
+
+PROFILE_HEADER = b"x-profile-token"
+
+# Event-loop samples parked in the selector are idle time, not request work
+_IDLE_FILES = ("selectors.py",)
+
+
+class ProfileSession:
+    """Collapsed stacks sampled from up to ``requests`` matching requests.
+
+    Requests carrying the session's token are profiled until it expires and
+    do not count towards ``requests``.
+    """
+
+    def __init__(
+        self,
+        requests: int,
+        expires_at: float,
+        route: Optional[str] = None,
+        method: Optional[str] = None
+    ):
+        self.id = uuid.uuid4()
+        self.route = route
+        self.method = method
+        self.requests = requests
+        self.expires_at = expires_at
+        self.created_at = datetime.utcnow()
+        self.profiled = 0
+        self.token_requests = 0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._path_regex = compile_path(route)[0] if route else None
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return max(self.requests - self.profiled, 0)
+
+    @property
+    def active(self) -> bool:
+        return self.remaining > 0 and time.time() < self.expires_at
+
+    def matches(self, scope) -> bool:
+        if self._path_regex is None or (self.method and scope["method"] != self.method):
+            return False
+        return self._path_regex.match(scope["path"]) is not None
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def claim(self) -> bool:
+        with self._lock:
+            if not self.active:
+                return False
+            self.profiled += 1
+            return True
+
+    def claim_token(self) -> bool:
+        with self._lock:
+            if self.expired:
+                return False
+            self.token_requests += 1
+            return True
+
+    def add(self, stack: str):
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: ``frame;frame;frame count`` per line"""
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+class _ProfiledRequest:
+    __slots__ = ("session", "threads")
+
+    def __init__(self, session: ProfileSession):
+        self.session = session
+        self.threads: Dict[int, str] = {}
+
+
+_current_request: ContextVar[Optional[_ProfiledRequest]] = ContextVar("profiled_request", default=None)
+
+
+def profiling() -> bool:
+    return _current_request.get() is not None
+
+
+@contextmanager
+def profiled_thread(role: str = "worker") -> Iterator[None]:
+    """Sample the current thread too while it works for a profiled request.
+
+    Threadpool calls inherit the request's context, so sync endpoints wrap
+    their body in this to be sampled alongside the event loop.
+    """
+    request = _current_request.get()
+    if request is None:
+        yield
+        return
+    ident = threading.get_ident()
+    request.threads[ident] = role
+    try:
+        yield
+    finally:
+        request.threads.pop(ident, None)
+
+
+class Profiler:
+    """Wall-clock sampling profiler for selected requests.
+
+    Sessions live in the process that created them: with several workers,
+    each one profiles only its own requests and serves only its own sessions.
+
+    A background thread wakes every ``interval_seconds`` while a profiled
+    request is in flight, reads the threads serving it from
+    ``sys._current_frames()`` and counts their stacks. With no sessions the
+    middleware skips it entirely and the thread is parked.
+    """
+
+    def __init__(self, secret_key: str, interval_seconds: float = 0.005, max_sessions: int = 20):
+        self.interval_seconds = interval_seconds
+        self.max_sessions = max_sessions
+        self._key = hashlib.sha256(f"profiler:{secret_key}".encode()).digest()
+        self._sessions: Dict[uuid.UUID, ProfileSession] = {}
+        self._active: List[_ProfiledRequest] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._frame_names: Dict[object, str] = {}
+        # Latest expiry among sessions; past it no request can be profiled
+        self._armed_until = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return time.time() >= self._armed_until
+
+    def create(
+        self,
+        requests: int,
+        ttl_seconds: float,
+        route: Optional[str] = None,
+        method: Optional[str] = None
+    ) -> ProfileSession:
+        session = ProfileSession(requests, time.time() + ttl_seconds, route, method)
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                # Finished sessions go first, then the oldest
+                oldest = min(self._sessions.values(), key=lambda s: (s.active, s.created_at))
+                del self._sessions[oldest.id]
+            self._sessions[session.id] = session
+            self._armed_until = max(self._armed_until, session.expires_at)
+        return session
+
+    def get(self, session_id: uuid.UUID) -> Optional[ProfileSession]:
+        return self._sessions.get(session_id)
+
+    def list(self) -> List[ProfileSession]:
+        return sorted(self._sessions.values(), key=lambda s: s.created_at, reverse=True)
+
+    def delete(self, session_id: uuid.UUID) -> bool:
+        with self._lock:
+            deleted = self._sessions.pop(session_id, None) is not None
+            # Token requests keep a session live after its route budget is spent
+            self._armed_until = max((s.expires_at for s in self._sessions.values() if not s.expired), default=0.0)
+            return deleted
+
+    def token(self, session: ProfileSession) -> str:
+        """Value for the X-Profile-Token header, valid until the session expires"""
+        message = f"{session.id.hex}.{int(session.expires_at)}"
+        signature = hmac.new(self._key, message.encode(), hashlib.sha256).hexdigest()
+        return f"{message}.{signature}"
+
+    def _session_for_token(self, token: str) -> Optional[ProfileSession]:
+        try:
+            session_id, expires, signature = token.split(".")
+            expected = hmac.new(self._key, f"{session_id}.{expires}".encode(), hashlib.sha256).hexdigest()
+            # Compare bytes: compare_digest refuses str with non-ASCII characters
+            if not hmac.compare_digest(signature.encode("latin-1"), expected.encode()) or time.time() >= int(expires):
+                return None
+            return self._sessions.get(uuid.UUID(hex=session_id))
+        except ValueError:
+            return None
+
+    def claim(self, scope) -> Optional[ProfileSession]:
+        """The session that should profile this request, if any"""
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                session = self._session_for_token(value.decode("latin-1"))
+                return session if session is not None and session.claim_token() else None
+        for session in list(self._sessions.values()):
+            if session.active and session.matches(scope) and session.claim():
+                return session
+        return None
+
+    @contextmanager
+    def profile(self, session: ProfileSession) -> Iterator[None]:
+        request = _ProfiledRequest(session)
+        request.threads[threading.get_ident()] = "loop"
+        token = _current_request.set(request)
+        with self._lock:
+            self._active.append(request)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._sampler.start()
+        self._wake.set()
+        try:
+            yield
+        finally:
+            _current_request.reset(token)
+            with self._lock:
+                self._active.remove(request)
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            for request in list(self._active):
+                for ident, role in list(request.threads.items()):
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stack = self._collapse(frame)
+                        if stack:
+                            request.session.add(f"{role};{stack}")
+            del frames
+            time.sleep(self.interval_seconds)
+
+    def _collapse(self, frame) -> Optional[str]:
+        names = []
+        leaf = True
+        while frame is not None:
+            code = frame.f_code
+            if leaf and code.co_filename.endswith(_IDLE_FILES):
+                return None
+            leaf = False
+            name = self._frame_names.get(code)
+            if name is None:
+                name = f"{_module_name(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+                self._frame_names[code] = name
+            names.append(name)
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+
+def _module_name(filename: str) -> str:
+    # Shortest path relative to an import root, so frames read like app/routers/holdings.py
+    best = filename
+    for root in sys.path:
+        if root and filename.startswith(root + os.sep) and len(filename) - len(root) - 1 < len(best):
+            best = filename[len(root) + 1:]
+    return best.replace(" ", "_")
+
+
+class ProfilerMiddleware:
+    """ASGI middleware handing matching or token-carrying requests to the profiler"""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.profiler.idle:
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.claim(scope)
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        with self.profiler.profile(session):
+            await self.app(scope, receive, send)
@@ -0,0 +1,173 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Iterator, List, Optional, Tuple
+import json
+import logging
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import ExecuteStyle
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+request_logger = logging.getLogger("app.requests")
+
+
+class QueryStats:
+    """Statements executed within one request or ``track_queries`` block"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        # Bulk inserts and executemany run one statement per batch of rows; repeats there are expected
+        self.batched = set()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, batched: bool = False):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[statement] += 1
+            if batched:
+                self.batched.add(statement)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times: the usual sign of an N+1 loop"""
+        return [
+            (statement, count) for statement, count in self.statements.most_common()
+            if count >= threshold and statement not in self.batched
+        ]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Collectors that see every statement from any thread, for assert_max_queries
+_global_stats: List[QueryStats] = []
+_global_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """The collector of the enclosing ``track_queries`` block, if any"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statements executed in the current context (including threadpool calls made from it)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, n_plus_one_threshold: Optional[int] = None) -> Iterator[QueryStats]:
+    """Fail if more than ``limit`` statements run inside the block, from any thread.
+
+        with assert_max_queries(3):
+            client.get(f"/api/portfolios/{portfolio_id}/holdings")
+
+    With ``n_plus_one_threshold`` it also fails when one statement repeats that often.
+    """
+    stats = QueryStats()
+    with _global_lock:
+        _global_stats.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global_stats.remove(stats)
+
+    listing = "\n".join(f"  {count}x {statement}" for statement, count in stats.statements.most_common())
+    if stats.count > limit:
+        raise AssertionError(f"{stats.count} queries executed, expected at most {limit}:\n{listing}")
+    if n_plus_one_threshold:
+        repeated = stats.repeated(n_plus_one_threshold)
+        if repeated:
+            raise AssertionError(
+                f"{len(repeated)} statement(s) repeated {n_plus_one_threshold}+ times (likely N+1):\n{listing}"
+            )
+
+
+class QueryTrackingMiddleware:
+    """ASGI middleware that counts each request's statements and logs likely N+1 loops
+
+    Statements repeated ``n_plus_one_threshold`` or more times in one request
+    are logged as a warning: they are usually a lazy load inside a loop.
+    Middleware inside it (Server-Timing) reads the counts through
+    ``current_query_stats``.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if self.n_plus_one_threshold:
+                    route = getattr(scope.get("route"), "path", None)
+                    for statement, count in stats.repeated(self.n_plus_one_threshold):
+                        request_logger.warning(json.dumps({
+                            "event": "n_plus_one",
+                            "method": scope["method"],
+                            "route": route or scope["path"],
+                            "count": count,
+                            "statement": " ".join(statement.split())
+                        }, separators=(",", ":")))
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types, not values, of a statement's parameters, so logs never carry user data"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def instrument_engine(engine: Engine, slow_query_seconds: Optional[float] = None):
+    """Count and time every statement, and log those slower than ``slow_query_seconds``"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context: a failed statement never reaches
+        # after_cursor_execute, so a per-connection stack would drift
+        if context is not None:
+            context.query_started = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        elapsed = perf_counter() - context.query_started
+        batched = executemany or context.execute_style is ExecuteStyle.INSERTMANYVALUES
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed, batched)
+        if _global_stats:
+            with _global_lock:
+                for collector in _global_stats:
+                    collector.record(statement, elapsed, batched)
+
+        if slow_query_seconds is not None and elapsed >= slow_query_seconds:
+            slow_query_logger.warning(json.dumps({
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": " ".join(statement.split()),
+                "parameters": parameter_shape(parameters, executemany),
+                "executemany": executemany
+            }, separators=(",", ":")))
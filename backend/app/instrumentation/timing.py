@@ -0,0 +1,176 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, Optional
+import functools
+import inspect
+import json
+import logging
+
+from fastapi.routing import APIRoute
+
+from .profiler import profiled_thread, profiling
+from .queries import QueryStats, current_query_stats, track_queries
+
+logger = logging.getLogger("app.requests")
+
+
+class RequestTimer:
+    """Span durations accumulated over one request"""
+
+    __slots__ = ("durations", "counts", "endpoint_finished")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.endpoint_finished: Optional[float] = None
+
+    def add(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def add_queries(self, stats: QueryStats):
+        if stats.count:
+            self.durations["db"] = stats.seconds
+            self.counts["db"] = stats.count
+
+    def server_timing(self, total: float) -> str:
+        metrics = []
+        for name, seconds in self.durations.items():
+            metric = f"{name};dur={seconds * 1000:.2f}"
+            if self.counts[name] > 1:
+                metric += f';desc="{self.counts[name]}x"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the duration of the block to the current request's ``name`` span"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, perf_counter() - started)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # The wrapper keeps the endpoint's signature (via __wrapped__) and its
+    # sync/async kind, so FastAPI resolves parameters and threads it the same way
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _finish_endpoint(started)
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            started = perf_counter()
+            try:
+                if profiling():
+                    # Sync endpoints run in the threadpool, away from the event loop the profiler samples
+                    with profiled_thread():
+                        return endpoint(*args, **kwargs)
+                return endpoint(*args, **kwargs)
+            finally:
+                _finish_endpoint(started)
+    return timed
+
+
+def _finish_endpoint(started: float):
+    timer = _current_timer.get()
+    if timer is not None:
+        finished = perf_counter()
+        timer.add("endpoint", finished - started)
+        timer.endpoint_finished = finished
+
+
+class TimedRoute(APIRoute):
+    """Route that records the endpoint body and response serialization as separate spans"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timer = _current_timer.get()
+            if timer is not None and timer.endpoint_finished is not None:
+                # Validation against response_model, jsonable_encoder and rendering
+                timer.add("serialize", perf_counter() - timer.endpoint_finished)
+            return response
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that reports a request's spans in a Server-Timing header and a log line
+
+    Query counts come from QueryTrackingMiddleware when it wraps this one;
+    on its own it tracks the request's statements itself. The log line's
+    ``repeated_queries`` counts statements run ``n_plus_one_threshold`` or
+    more times.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        started = perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timer.add_queries(stats)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing(perf_counter() - started).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        tracked = current_query_stats()
+        with nullcontext(tracked) if tracked is not None else track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _current_timer.reset(token)
+                timer.add_queries(stats)
+                route = getattr(scope.get("route"), "path", None)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(json.dumps({
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round((perf_counter() - started) * 1000, 2),
+                        "spans": {name: round(seconds * 1000, 2) for name, seconds in timer.durations.items()},
+                        "queries": stats.count,
+                        "repeated_queries": sum(
+                            count for _, count in stats.repeated(self.n_plus_one_threshold)
+                        ) if self.n_plus_one_threshold else 0
+                    }, separators=(",", ":")))
@@ -0,0 +1,528 @@
+"""Pre-fork production launcher: one supervisor, N uvicorn workers on a shared socket.
+
+The supervisor binds the listening socket, imports the app once (so workers
+share its memory copy-on-write), runs the schema check once and forks the
+workers. Background jobs (symbol validation, the recap scheduler and email
+delivery) run in one worker at a time; a replacement for that worker takes
+them over. Workers report readiness and a heartbeat over a pipe; the
+supervisor replaces workers that crash, kills ones whose event loop stops
+answering, and replaces workers that reach --max-requests, or all of them
+on SIGHUP, one at a time, starting each replacement before retiring the
+old worker, so the socket never stops accepting connections.
+
+    SIGHUP          rolling restart
+    SIGUSR1         log worker status
+    SIGTERM/SIGINT  graceful shutdown
+"""
+from typing import Dict, List, Optional, Tuple
+import importlib
+import json
+import logging
+import os
+import random
+import resource
+import select
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+# Consecutive workers that exit before becoming ready before the supervisor gives up
+MAX_BOOT_FAILURES = 5
+
+
+def default_worker_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server that reports readiness and a heartbeat to the supervisor"""
+
+    def __init__(self, config: uvicorn.Config, channel: int, supervisor_pid: int, heartbeat_interval: float):
+        super().__init__(config)
+        self.channel = channel
+        self.supervisor_pid = supervisor_pid
+        # on_tick runs every 0.1 s on the worker's event loop, so a heartbeat
+        # also proves the loop is not blocked
+        self.heartbeat_ticks = max(int(heartbeat_interval * 10), 1)
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.report("ready")
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.started and counter % self.heartbeat_ticks == 0:
+            if os.getppid() != self.supervisor_pid:
+                # Orphaned: the supervisor died, so nobody will replace or stop us
+                self.should_exit = True
+            self.report("heartbeat")
+        return await super().on_tick(counter)
+
+    def report(self, event: str):
+        message = {
+            "event": event,
+            "requests": self.server_state.total_requests,
+            "connections": len(self.server_state.connections),
+            "tasks": len(self.server_state.tasks),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        }
+        try:
+            os.write(self.channel, (json.dumps(message) + "\n").encode())
+        except OSError:
+            self.should_exit = True
+
+
+class _Worker:
+    __slots__ = (
+        "pid", "channel", "generation", "jobs", "started_at", "ready_at", "last_heartbeat",
+        "retiring_at", "request_limit", "stats", "buffer"
+    )
+
+    def __init__(self, pid: int, channel: int, generation: int, jobs: bool, request_limit: Optional[int]):
+        self.pid = pid
+        self.channel = channel
+        self.generation = generation
+        self.jobs = jobs
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.last_heartbeat: Optional[float] = None
+        self.retiring_at: Optional[float] = None
+        self.request_limit = request_limit
+        self.stats: Dict[str, int] = {}
+        self.buffer = b""
+
+    @property
+    def state(self) -> str:
+        if self.retiring_at is not None:
+            return "retiring"
+        return "ready" if self.ready_at is not None else "booting"
+
+
+class Supervisor:
+    def __init__(
+        self,
+        app: str = "app.main:app",
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: Optional[int] = None,
+        preload: bool = True,
+        max_requests: Optional[int] = None,
+        max_requests_jitter: Optional[int] = None,
+        heartbeat_interval: float = 1.0,
+        timeout: float = 30.0,
+        graceful_timeout: float = 30.0,
+        status_file: Optional[str] = None,
+        log_level: str = "info"
+    ):
+        self.app_path = app
+        self.host = host
+        self.port = port
+        self.workers = workers or default_worker_count()
+        self.preload = preload
+        self.max_requests = max_requests or None
+        if max_requests_jitter is None and self.max_requests:
+            # Spread recycling out so workers don't all restart together
+            max_requests_jitter = self.max_requests // 10
+        self.max_requests_jitter = max_requests_jitter or 0
+        self.heartbeat_interval = heartbeat_interval
+        self.timeout = timeout
+        self.graceful_timeout = graceful_timeout
+        self.status_file = status_file
+        self.log_level = log_level
+
+        self.pid = os.getpid()
+        self.app = None
+        self.socket: Optional[socket.socket] = None
+        self._workers: Dict[int, _Worker] = {}
+        self._generation = 0
+        self._signals: List[int] = []
+        self._wakeup: Optional[Tuple[int, int]] = None
+        self._stopping_at: Optional[float] = None
+        self._restart_queue: List[int] = []
+        self._replacing: Optional[Tuple[int, int]] = None
+        self._boot_failures = 0
+        self._next_spawn_at = 0.0
+        self._last_status = 0.0
+        self._exit_code = 0
+        self._metrics_dir: Optional[str] = None
+
+    # Supervisor
+
+    def run(self) -> int:
+        self._prepare_metrics()
+        config = uvicorn.Config(self.app_path, host=self.host, port=self.port, log_level=self.log_level)
+        self.socket = config.bind_socket()
+        self.socket.set_inheritable(True)
+
+        if self.preload:
+            self._preload()
+        else:
+            self._init_db_in_child()
+
+        self._install_signal_handlers()
+        logger.info(
+            "Supervisor [%d] starting %d workers (preload=%s, max_requests=%s)",
+            self.pid, self.workers, self.preload, self.max_requests
+        )
+        for index in range(self.workers):
+            self._spawn(jobs=index == 0)
+
+        while self._workers or self._stopping_at is None:
+            self._handle_signals()
+            self._read_messages(0.5)
+            self._reap()
+            if self._stopping_at is None:
+                self._check_health()
+                self._advance_restart()
+                self._maintain_worker_count()
+            else:
+                self._force_stop_if_overdue()
+            self._write_status()
+
+        self.socket.close()
+        if self._metrics_dir:
+            shutil.rmtree(self._metrics_dir, ignore_errors=True)
+        logger.info("Supervisor [%d] stopped", self.pid)
+        return self._exit_code
+
+    def _prepare_metrics(self):
+        # Must happen before anything imports prometheus_client
+        directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for name in os.listdir(directory):
+                if name.endswith(".db"):
+                    os.remove(os.path.join(directory, name))
+        else:
+            self._metrics_dir = tempfile.mkdtemp(prefix="scout-metrics-")
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = self._metrics_dir
+
+    def _preload(self):
+        module_name, _, attribute = self.app_path.partition(":")
+        started = time.perf_counter()
+        self.app = getattr(importlib.import_module(module_name), attribute)
+
+        from .config import settings
+        from .database import dispose_engines, init_db
+
+        if settings.init_db_on_startup:
+            # Once here instead of once per worker
+            init_db()
+            settings.init_db_on_startup = False
+        # Forked workers must not share the supervisor's pooled connections
+        dispose_engines()
+        logger.info("Preloaded %s in %.0f ms", self.app_path, (time.perf_counter() - started) * 1000)
+
+    def _init_db_in_child(self):
+        # Without preload the supervisor must not import app code, or forked
+        # workers would inherit those modules instead of importing new ones on
+        # SIGHUP; the schema check runs once in a throwaway child instead
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                from .config import settings
+                from .database import init_db
+
+                if settings.init_db_on_startup:
+                    init_db()
+                code = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            raise RuntimeError("Schema check failed; see the traceback above")
+        # Inherited by every worker, which then skips it
+        os.environ["INIT_DB_ON_STARTUP"] = "false"
+
+    def _install_signal_handlers(self):
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        self._wakeup = (read_fd, write_fd)
+        signal.set_wakeup_fd(write_fd)
+        for sig in (signal.SIGHUP, signal.SIGUSR1, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, self._queue_signal)
+
+    def _queue_signal(self, sig, frame):
+        self._signals.append(sig)
+
+    def _handle_signals(self):
+        while self._signals:
+            sig = self._signals.pop(0)
+            if sig in (signal.SIGTERM, signal.SIGINT):
+                self._stop()
+            elif sig == signal.SIGHUP and self._stopping_at is None:
+                logger.info("Rolling restart of %d workers", len(self._workers))
+                self._restart_queue = [pid for pid, worker in self._workers.items() if worker.retiring_at is None]
+            elif sig == signal.SIGUSR1:
+                for line in self._status_lines():
+                    logger.info(line)
+
+    def _stop(self, exit_code: int = 0):
+        if self._stopping_at is not None:
+            return
+        self._exit_code = exit_code
+        self._stopping_at = time.monotonic()
+        logger.info("Stopping %d workers", len(self._workers))
+        for worker in self._workers.values():
+            self._retire(worker)
+
+    # Workers
+
+    def _spawn(self, jobs: bool = False) -> _Worker:
+        self._generation += 1
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._run_worker(write_fd, jobs)
+        os.close(write_fd)
+        os.set_blocking(read_fd, False)
+        request_limit = None
+        if self.max_requests:
+            request_limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        worker = _Worker(pid, read_fd, self._generation, jobs, request_limit)
+        self._workers[pid] = worker
+        return worker
+
+    def _run_worker(self, channel: int, jobs: bool):
+        code = 1
+        try:
+            # Read by the worker's own settings without preload, and set on the
+            # supervisor's already-imported settings with it
+            os.environ["BACKGROUND_JOBS_ENABLED"] = "true" if jobs else "false"
+            if self.preload:
+                from .config import settings
+
+                settings.background_jobs_enabled = jobs
+
+            signal.set_wakeup_fd(-1)
+            for sig in (signal.SIGHUP, signal.SIGUSR1, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                signal.signal(sig, signal.SIG_DFL)
+            for worker in self._workers.values():
+                os.close(worker.channel)
+            if self._wakeup:
+                for fd in self._wakeup:
+                    os.close(fd)
+
+            config = uvicorn.Config(
+                self.app if self.preload else self.app_path,
+                log_level=self.log_level,
+                timeout_graceful_shutdown=int(self.graceful_timeout)
+            )
+            server = _WorkerServer(config, channel, self.pid, self.heartbeat_interval)
+            server.run(sockets=[self.socket])
+            code = 0 if server.started else 3
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _retire(self, worker: _Worker, sig: int = signal.SIGTERM):
+        if worker.retiring_at is None:
+            worker.retiring_at = time.monotonic()
+        try:
+            os.kill(worker.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _read_messages(self, timeout: float):
+        channels = {worker.channel: worker for worker in self._workers.values()}
+        readable, _, _ = select.select(list(channels) + [self._wakeup[0]], [], [], timeout)
+        for fd in readable:
+            if fd == self._wakeup[0]:
+                try:
+                    while os.read(fd, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+            worker = channels[fd]
+            try:
+                data = os.read(fd, 65536)
+            except BlockingIOError:
+                continue
+            *lines, worker.buffer = (worker.buffer + data).split(b"\n")
+            for line in lines:
+                self._handle_message(worker, json.loads(line))
+
+    def _handle_message(self, worker: _Worker, message: dict):
+        now = time.monotonic()
+        event = message.pop("event")
+        worker.stats = message
+        worker.last_heartbeat = now
+        if event == "ready" and worker.ready_at is None:
+            worker.ready_at = now
+            self._boot_failures = 0
+            logger.info("Worker [%d] ready in %.2f s", worker.pid, now - worker.started_at)
+        if (
+            worker.request_limit
+            and worker.stats.get("requests", 0) >= worker.request_limit
+            and worker.retiring_at is None
+            and worker.pid not in self._restart_queue
+            and (self._replacing is None or worker.pid != self._replacing[1])
+        ):
+            # Recycled like a rolling restart rather than by exiting on its own,
+            # so capacity never drops while the replacement boots
+            logger.info("Worker [%d] served %d requests; recycling", worker.pid, worker.stats["requests"])
+            self._restart_queue.append(worker.pid)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self._workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.channel)
+            self._mark_metrics_dead(pid)
+
+            code = os.waitstatus_to_exitcode(status)
+            if worker.retiring_at is not None:
+                logger.info("Worker [%d] stopped", pid)
+            elif worker.ready_at is None:
+                self._boot_failures += 1
+                self._next_spawn_at = time.monotonic() + min(self._boot_failures, 5)
+                logger.error("Worker [%d] failed to start (exit %s)", pid, code)
+                if self._boot_failures >= MAX_BOOT_FAILURES and self._stopping_at is None:
+                    logger.error("Workers keep failing to start; shutting down")
+                    self._stop(exit_code=1)
+            else:
+                logger.error(
+                    "Worker [%d] exited unexpectedly (code %s) after %s requests",
+                    pid, code, worker.stats.get("requests", "?")
+                )
+
+            if self._replacing and pid == self._replacing[0]:
+                logger.error("Replacement worker [%d] died during rolling restart; restart aborted", pid)
+                self._replacing = None
+                self._restart_queue = []
+
+    def _mark_metrics_dead(self, pid: int):
+        try:
+            from prometheus_client import multiprocess
+        except ImportError:
+            return
+        multiprocess.mark_process_dead(pid)
+
+    def _check_health(self):
+        now = time.monotonic()
+        for worker in list(self._workers.values()):
+            if worker.retiring_at is not None:
+                if now - worker.retiring_at > self.graceful_timeout + 5:
+                    logger.error("Worker [%d] ignored shutdown; killing it", worker.pid)
+                    self._retire(worker, signal.SIGKILL)
+            elif worker.ready_at is None:
+                if now - worker.started_at > max(self.timeout, 60):
+                    logger.error("Worker [%d] did not start within %.0f s; killing it", worker.pid, now - worker.started_at)
+                    self._retire(worker, signal.SIGKILL)
+            elif now - worker.last_heartbeat > self.timeout:
+                logger.error(
+                    "Worker [%d] missed heartbeats for %.0f s (event loop blocked?); killing it",
+                    worker.pid, now - worker.last_heartbeat
+                )
+                # Not marked as retiring, so it is replaced as a crash
+                os.kill(worker.pid, signal.SIGKILL)
+                worker.last_heartbeat = now
+
+    def _advance_restart(self):
+        if self._replacing:
+            new_pid, old_pid = self._replacing
+            new = self._workers.get(new_pid)
+            if new is not None and new.ready_at is not None:
+                old = self._workers.get(old_pid)
+                if old is not None:
+                    self._retire(old)
+                self._replacing = None
+            return
+
+        while self._restart_queue:
+            old_pid = self._restart_queue.pop(0)
+            if old_pid in self._workers and self._workers[old_pid].retiring_at is None:
+                # Both run the jobs until the old worker retires. Recaps and
+                # deliveries are claimed through the database and revalidating
+                # a symbol is harmless, so the overlap does no double work
+                new = self._spawn(jobs=self._workers[old_pid].jobs)
+                self._replacing = (new.pid, old_pid)
+                return
+
+    def _maintain_worker_count(self):
+        live = sum(1 for worker in self._workers.values() if worker.retiring_at is None)
+        # A replacement in progress already counts its old worker
+        if self._replacing:
+            live -= 1
+        while live < self.workers and time.monotonic() >= self._next_spawn_at:
+            # Replaces a jobs worker that crashed or was killed
+            jobs = not any(worker.jobs and worker.retiring_at is None for worker in self._workers.values())
+            self._spawn(jobs=jobs)
+            live += 1
+
+    def _force_stop_if_overdue(self):
+        if time.monotonic() - self._stopping_at > self.graceful_timeout + 5:
+            for worker in self._workers.values():
+                self._retire(worker, signal.SIGKILL)
+
+    # Status
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "supervisor_pid": self.pid,
+            "workers": [
+                {
+                    "pid": worker.pid,
+                    "generation": worker.generation,
+                    "state": worker.state,
+                    "jobs": worker.jobs,
+                    "uptime_seconds": round(now - worker.started_at, 1),
+                    "heartbeat_age_seconds": (
+                        round(now - worker.last_heartbeat, 1) if worker.last_heartbeat is not None else None
+                    ),
+                    **worker.stats
+                }
+                for worker in sorted(self._workers.values(), key=lambda w: w.generation)
+            ]
+        }
+
+    def _status_lines(self) -> List[str]:
+        lines = [f"Supervisor [{self.pid}]: {len(self._workers)} workers"]
+        for worker in self.status()["workers"]:
+            lines.append(
+                f"  [{worker['pid']}] {worker['state']:<8}{' jobs' if worker['jobs'] else '':<5} up {worker['uptime_seconds']:>8.1f}s  "
+                f"requests {worker.get('requests', 0):>8}  connections {worker.get('connections', 0):>4}  "
+                f"heartbeat {worker['heartbeat_age_seconds']}s ago  max rss {worker.get('max_rss_kb', 0) // 1024} MiB"
+            )
+        return lines
+
+    def _write_status(self):
+        if not self.status_file or time.monotonic() - self._last_status < self.heartbeat_interval:
+            return
+        self._last_status = time.monotonic()
+        temporary = f"{self.status_file}.tmp"
+        with open(temporary, "w") as status_file:
+            json.dump(self.status(), status_file, indent=2)
+        os.replace(temporary, self.status_file)
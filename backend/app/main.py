@@ -1,20 +1,102 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine
 
-from .database import Base, engine
-from .routers import auth, portfolios, holdings, recaps, upload
+from .database import database_engines, init_db
+from .routers import auth, portfolios, holdings, recaps, upload, snapshots, exposure, search, events, admin, export, shards
 from .config import settings
+from .instrumentation import (
+    MetricsMiddleware,
+    Profiler,
+    ProfilerMiddleware,
+    QueryTrackingMiddleware,
+    ServerTimingMiddleware,
+    instrument_engine,
+    instrument_pool,
+    render_metrics,
+)
+from .services.admission import AdmissionMiddleware, admission
+from .services.events import event_bus
+from .services.holdings_cache import holdings_cache
+from .services.securities import security_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module has no side effects; schema work, directories and
+    # background workers all start here, once per process
+    if settings.init_db_on_startup:
+        init_db()
+    upload.UPLOAD_DIR.mkdir(exist_ok=True)
+
+    workers = []
+    # The launcher leaves these on in one worker only
+    jobs = settings.background_jobs_enabled
+
+    if jobs and settings.symbol_master_path:
+        from .services.symbol_master import SymbolMaster
+        from .services.symbol_validation import SymbolValidator
+
+        workers.append(SymbolValidator(
+            SymbolMaster.from_csv(settings.symbol_master_path),
+            interval_seconds=settings.symbol_validation_interval_seconds,
+            batch_size=settings.symbol_validation_batch_size
+        ))
+
+    if jobs and settings.recap_scheduler_enabled:
+        from .services.recap_scheduler import RecapScheduler
+
+        workers.append(RecapScheduler(
+            interval_seconds=settings.recap_scheduler_interval_seconds,
+            batch_size=settings.recap_scheduler_batch_size,
+            max_workers=settings.recap_scheduler_workers,
+            time_budget_seconds=settings.recap_scheduler_time_budget_seconds
+        ))
+
+    if jobs and settings.smtp_host:
+        from .services.email_delivery import EmailDeliveryWorker, SMTPConnectionPool, smtp_connection_factory
+
+        pool = SMTPConnectionPool(
+            smtp_connection_factory(
+                settings.smtp_host,
+                settings.smtp_port,
+                username=settings.smtp_username,
+                password=settings.smtp_password,
+                use_tls=settings.smtp_use_tls
+            ),
+            size=settings.email_delivery_connections
+        )
+        workers.append(EmailDeliveryWorker(
+            pool,
+            settings.email_sender,
+            interval_seconds=settings.email_delivery_interval_seconds,
+            batch_size=settings.email_delivery_batch_size,
+            max_attempts=settings.email_delivery_max_attempts
+        ))
+
+    for worker in workers:
+        worker.start()
+
+    try:
+        yield
+    finally:
+        event_bus.close()
+        for worker in workers:
+            worker.stop(timeout=5)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Scout Portfolio Tracker API",
     description="FastAPI backend for portfolio tracking application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Per-client rate limits and load shedding. Added before CORS so that it runs
+# inside it and browsers can read the 429/503 responses.
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,12 +106,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Query counting and the slow-query log, on the directory and every shard
+for database_engine in database_engines():
+    instrument_engine(database_engine, slow_query_seconds=settings.slow_query_ms / 1000 if settings.slow_query_ms else None)
+
+# Per-request Server-Timing header and structured log line
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware, n_plus_one_threshold=settings.n_plus_one_threshold)
+
+# Per-request query counts and N+1 warnings; added after Server-Timing so it
+# runs outside it and the header can report the counts
+app.add_middleware(QueryTrackingMiddleware, n_plus_one_threshold=settings.n_plus_one_threshold)
+
+# Prometheus metrics, served at /metrics
+if settings.metrics_enabled:
+    for database_engine in database_engines():
+        instrument_pool(database_engine)
+    app.add_middleware(MetricsMiddleware)
+
+# On-demand request profiling, armed through /admin/profiles
+if settings.profiler_enabled:
+    app.state.profiler = Profiler(
+        settings.secret_key,
+        interval_seconds=settings.profiler_interval_ms / 1000,
+        max_sessions=settings.profiler_max_sessions
+    )
+    app.add_middleware(ProfilerMiddleware, profiler=app.state.profiler)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(portfolios.router)
 app.include_router(holdings.router)
 app.include_router(recaps.router)
 app.include_router(upload.router)
+app.include_router(snapshots.router)
+app.include_router(exposure.router)
+app.include_router(search.router)
+app.include_router(events.router)
+app.include_router(admin.router)
+app.include_router(export.router)
+app.include_router(shards.router)
 
 
 @app.get("/")
@@ -39,4 +155,18 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "event_streams": event_bus.stats(),
+        "admission": admission.stats(),
+        "holdings_cache": holdings_cache.stats(),
+        "securities_cache": security_registry.stats()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
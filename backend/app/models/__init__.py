@@ -1,6 +1,9 @@
 from .user import User
+from .user_directory import UserDirectory
 from .portfolio import Portfolio
 from .portfolio_holding import PortfolioHolding
+from .security import Security
 from .email_recap import EmailRecap
+from .holding_snapshot import HoldingSnapshot
 
-__all__ = ["User", "Portfolio", "PortfolioHolding", "EmailRecap"]
\ No newline at end of file
+__all__ = ["User", "UserDirectory", "Portfolio", "PortfolioHolding", "Security", "EmailRecap", "HoldingSnapshot"]
\ No newline at end of file
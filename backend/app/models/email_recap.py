@@ -1,20 +1,29 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
-import uuid
 
 from ..database import Base
+from .types import CompactUUID, CompressedText, uuid7
 
 
 class EmailRecap(Base):
     __tablename__ = "email_recaps"
+    __table_args__ = (
+        Index("ix_email_recaps_portfolio_id_created_at", "portfolio_id", "created_at"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(CompactUUID(), primary_key=True, default=uuid7)
     subject = Column(String, nullable=False)
-    content = Column(Text, nullable=False)
-    portfolio_id = Column(UUID(as_uuid=True), ForeignKey("portfolios.id"), nullable=False)
-    sent_at = Column(DateTime, default=datetime.utcnow)
+    # Compressed at rest and only loaded when a single recap is read
+    content = deferred(Column(CompressedText(), nullable=False))
+    # Hash of the portfolio settings and holdings the recap was built from
+    fingerprint = Column(String(64), nullable=True)
+    portfolio_id = Column(CompactUUID(), ForeignKey("portfolios.id"), nullable=False)
+    # Null until the recap has actually been delivered
+    sent_at = Column(DateTime, nullable=True, index=True)
+    delivery_attempts = Column(Integer, nullable=False, default=0)
+    delivery_claimed_at = Column(DateTime, nullable=True)
+    delivery_token = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     portfolio = relationship("Portfolio", back_populates="email_recaps")
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, LargeBinary, Numeric, UniqueConstraint
+from sqlalchemy.orm import deferred, relationship
+from datetime import datetime
+
+from ..database import Base
+from .types import CompactUUID, uuid7
+
+
+class HoldingSnapshot(Base):
+    __tablename__ = "holding_snapshots"
+    __table_args__ = (
+        UniqueConstraint("portfolio_id", "snapshot_date", name="uq_holding_snapshots_portfolio_date"),
+    )
+
+    id = Column(CompactUUID(), primary_key=True, default=uuid7)
+    portfolio_id = Column(CompactUUID(), ForeignKey("portfolios.id"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    total_value = Column(Numeric(precision=18, scale=2), nullable=True)
+    position_count = Column(Integer, nullable=False, default=0)
+    # Compressed column arrays, only loaded when a single snapshot is expanded
+    symbols = deferred(Column(LargeBinary, nullable=False))
+    quantities = deferred(Column(LargeBinary, nullable=False))
+    prices = deferred(Column(LargeBinary, nullable=False))
+    market_values = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    portfolio = relationship("Portfolio", back_populates="snapshots")
@@ -1,25 +1,27 @@
 from sqlalchemy import Column, String, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 
 from ..database import Base
+from .types import CompactUUID, uuid7
 
 
 class Portfolio(Base):
     __tablename__ = "portfolios"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(CompactUUID(), primary_key=True, default=uuid7)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     email_frequency = Column(String, nullable=True)
     email_instructions = Column(Text, nullable=True)
+    next_recap_at = Column(DateTime, nullable=True, index=True)
+    recap_claim_token = Column(String, nullable=True)
     file_path = Column(String, nullable=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(CompactUUID(), ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="portfolios")
     holdings = relationship("PortfolioHolding", back_populates="portfolio", cascade="all, delete-orphan")
-    email_recaps = relationship("EmailRecap", back_populates="portfolio", cascade="all, delete-orphan")
\ No newline at end of file
+    email_recaps = relationship("EmailRecap", back_populates="portfolio", cascade="all, delete-orphan")
+    snapshots = relationship("HoldingSnapshot", back_populates="portfolio", cascade="all, delete-orphan")
\ No newline at end of file
@@ -1,27 +1,48 @@
-from sqlalchemy import Column, String, Numeric, Boolean, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 
 from ..database import Base
+from .types import CompactUUID, ScaledInteger, uuid7
 
 
 class PortfolioHolding(Base):
     __tablename__ = "portfolio_holdings"
+    __table_args__ = (
+        # Lets the validator pull distinct pending securities straight from the index
+        Index("ix_portfolio_holdings_validation_status_security_id", "validation_status", "security_id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    symbol = Column(String, nullable=False)
-    name = Column(String, nullable=True)
-    quantity = Column(Numeric(precision=18, scale=8), nullable=True)
-    price = Column(Numeric(precision=18, scale=2), nullable=True)
-    market_value = Column(Numeric(precision=18, scale=2), nullable=True)
+    id = Column(CompactUUID(), primary_key=True, default=uuid7)
+    # The symbol lives once per symbol in securities
+    security_id = Column(Integer, ForeignKey("securities.id"), nullable=False, index=True)
+    # The owner's own name and sector; NULL falls back to the security's
+    name_override = Column("name", String, nullable=True)
+    sector_override = Column("sector", String, nullable=True)
+    # Integer micro-units of quantity and minor units (cents) of money; see ScaledInteger
+    quantity = Column(ScaledInteger(6), nullable=True)
+    price = Column(ScaledInteger(2), nullable=True)
+    market_value = Column(ScaledInteger(2), nullable=True)
     weight = Column(Numeric(precision=5, scale=2), nullable=True)
-    sector = Column(String, nullable=True)
     validated = Column(Boolean, default=False)
     validation_status = Column(String, nullable=True)
-    portfolio_id = Column(UUID(as_uuid=True), ForeignKey("portfolios.id"), nullable=False)
+    portfolio_id = Column(CompactUUID(), ForeignKey("portfolios.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    portfolio = relationship("Portfolio", back_populates="holdings")
\ No newline at end of file
+    portfolio = relationship("Portfolio", back_populates="holdings")
+    security = relationship("Security", lazy="joined", innerjoin=True)
+
+    # Read-only: a holding changes symbol by pointing at another security,
+    # never by renaming the one every other holding of the symbol shares
+    @property
+    def symbol(self):
+        return self.security.symbol
+
+    @property
+    def name(self):
+        return self.name_override if self.name_override is not None else self.security.name
+
+    @property
+    def sector(self):
+        return self.sector_override if self.sector_override is not None else self.security.sector
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String
+
+from ..database import Base
+
+
+class Security(Base):
+    """One row per listed symbol; holdings reference it by its small integer id.
+
+    Rows are never deleted or renamed, so a symbol's id is stable for the
+    life of the database and can be cached in process; see SecurityRegistry.
+    """
+
+    __tablename__ = "securities"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False, unique=True)
+    name = Column(String, nullable=True)
+    sector = Column(String, nullable=True)
@@ -0,0 +1,168 @@
+from decimal import ROUND_HALF_EVEN, Decimal
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import BigInteger, LargeBinary, TypeDecorator
+import os
+import time
+import uuid
+import zlib
+
+# Largest BIGINT, the bound on ScaledInteger units
+MAX_UNITS = 2 ** 63 - 1
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48 bits of Unix milliseconds, then random bits.
+
+    Keys created around the same time sort next to each other, so inserts
+    append to the right edge of primary key and foreign key indexes instead
+    of landing on random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as a zlib-compressed blob and inflated transparently on load"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, level: int = 6):
+        super().__init__()
+        self.level = level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), self.level)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Rows written before compression was introduced come back as plain text
+        if isinstance(value, str):
+            return value
+        value = bytes(value)
+        try:
+            return zlib.decompress(value).decode("utf-8")
+        except zlib.error:
+            return value.decode("utf-8")
+
+
+class ScaledInteger(TypeDecorator):
+    """Exact decimal stored as a BIGINT count of 10**-scale units.
+
+    With scale 6, 12.5 is stored as 12500000. Values bind from Decimal, int or
+    float (by its shortest repr, rounded half-even to the scale) and load as
+    Decimal with exactly ``scale`` places, so the API sees the same numbers
+    while SQL sums and multiplies plain integers. Expressions that need the
+    raw units should ``type_coerce`` the column to BigInteger. Values that
+    are not finite or whose units overflow BIGINT raise ValueError.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def __init__(self, scale: int):
+        super().__init__()
+        self.scale = scale
+
+    def to_units(self, value) -> int:
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        if not value.is_finite():
+            raise ValueError(f"{value} is not a finite number")
+        units = int(value.scaleb(self.scale).to_integral_value(ROUND_HALF_EVEN))
+        if abs(units) > MAX_UNITS:
+            raise ValueError(f"{value} is too large to store")
+        return units
+
+    def from_units(self, units) -> Decimal:
+        return Decimal(int(units)).scaleb(-self.scale)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.to_units(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.from_units(value)
+
+    def result_processor(self, dialect, coltype):
+        # Runs once per loaded value, so skip the generic TypeDecorator chain
+        exponent = -self.scale
+
+        def process(value):
+            if value is None:
+                return None
+            return Decimal(value).scaleb(exponent)
+
+        return process
+
+
+class CompactUUID(TypeDecorator):
+    """UUID key stored as PostgreSQL's native uuid, and as 16 raw bytes elsewhere.
+
+    On SQLite this replaces a 32-character string in every key and index
+    entry with a BLOB, which SQLite never applies numeric affinity to. Values
+    bind from uuid.UUID or its string forms and always load as uuid.UUID.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=bytes(value))
+
+    def bind_processor(self, dialect):
+        if dialect.name == "postgresql":
+            return super().bind_processor(dialect)
+
+        # Runs once per bound key; sqlite3 takes bytes as a BLOB as they are
+        def process(value):
+            if value is None:
+                return None
+            if not isinstance(value, uuid.UUID):
+                value = uuid.UUID(str(value))
+            return value.bytes
+
+        return process
+
+    def literal_processor(self, dialect):
+        if dialect.name == "postgresql":
+            return super().literal_processor(dialect)
+
+        def process(value):
+            return f"X'{uuid.UUID(str(value)).hex}'"
+
+        return process
+
+    def result_processor(self, dialect, coltype):
+        if dialect.name == "postgresql":
+            return super().result_processor(dialect, coltype)
+
+        # Runs once per loaded key, so skip the generic TypeDecorator chain
+        def process(value):
+            if value is None:
+                return None
+            return uuid.UUID(bytes=bytes(value))
+
+        return process
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String
+
+from ..database import Base
+from .types import CompactUUID
+
+
+class UserDirectory(Base):
+    """Email to user id for every user, kept in DATABASE_URL whatever shard the user lives on.
+
+    Sign-in starts from an email, before the user's shard is known, and
+    registration needs emails unique across all shards; everything else
+    finds the user's shard from the id alone.
+    """
+
+    __tablename__ = "user_directory"
+    # Routed to the directory database by TenantSession rather than to a tenant shard
+    __table_args__ = {"info": {"directory": True}}
+
+    email = Column(String, primary_key=True)
+    user_id = Column(CompactUUID(), nullable=False, unique=True)
@@ -0,0 +1,107 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from typing import List
+import uuid
+
+from ..instrumentation import TimedRoute
+from ..instrumentation.profiler import ProfileSession, Profiler
+from ..models.user import User
+from ..schemas.profile import ProfileSessionCreate, ProfileSessionResponse
+from ..auth import get_current_admin
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"], route_class=TimedRoute)
+
+
+def get_profiler(request: Request) -> Profiler:
+    profiler = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiler is disabled"
+        )
+    return profiler
+
+
+def get_session(session_id: uuid.UUID, profiler: Profiler = Depends(get_profiler)) -> ProfileSession:
+    session = profiler.get(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return session
+
+
+def session_response(profiler: Profiler, session: ProfileSession) -> ProfileSessionResponse:
+    return ProfileSessionResponse(
+        id=session.id,
+        route=session.route,
+        method=session.method,
+        requests=session.requests,
+        profiled=session.profiled,
+        token_requests=session.token_requests,
+        samples=session.samples,
+        active=session.active,
+        created_at=session.created_at,
+        expires_at=datetime.utcfromtimestamp(session.expires_at),
+        token=profiler.token(session)
+    )
+
+
+@router.post("/", response_model=ProfileSessionResponse)
+def create_profile(
+    profile_data: ProfileSessionCreate,
+    request: Request,
+    current_user: User = Depends(get_current_admin),
+    profiler: Profiler = Depends(get_profiler)
+):
+    method = profile_data.method.upper() if profile_data.method else None
+    if profile_data.route and profile_data.route not in request.app.openapi()["paths"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown route template: {profile_data.route}"
+        )
+
+    session = profiler.create(
+        requests=profile_data.requests,
+        ttl_seconds=profile_data.ttl_seconds,
+        route=profile_data.route,
+        method=method
+    )
+    return session_response(profiler, session)
+
+
+@router.get("/", response_model=List[ProfileSessionResponse])
+def get_profiles(
+    current_user: User = Depends(get_current_admin),
+    profiler: Profiler = Depends(get_profiler)
+):
+    return [session_response(profiler, session) for session in profiler.list()]
+
+
+@router.get("/{session_id}", response_model=ProfileSessionResponse)
+def get_profile(
+    current_user: User = Depends(get_current_admin),
+    profiler: Profiler = Depends(get_profiler),
+    session: ProfileSession = Depends(get_session)
+):
+    return session_response(profiler, session)
+
+
+@router.get("/{session_id}/collapsed", response_class=PlainTextResponse)
+def get_profile_stacks(
+    current_user: User = Depends(get_current_admin),
+    session: ProfileSession = Depends(get_session)
+):
+    return PlainTextResponse(session.collapsed())
+
+
+@router.delete("/{session_id}")
+def delete_profile(
+    current_user: User = Depends(get_current_admin),
+    profiler: Profiler = Depends(get_profiler),
+    session: ProfileSession = Depends(get_session)
+):
+    profiler.delete(session.id)
+    return {"message": "Profile deleted successfully"}
@@ -2,30 +2,36 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_db, use_tenant
+from ..instrumentation import TimedRoute
 from ..models.user import User
+from ..models.user_directory import UserDirectory
+from ..models.types import uuid7
 from ..schemas.user import UserCreate, UserLogin, UserResponse, Token, TokenRefresh
 from ..auth import create_access_token, create_refresh_token, verify_token, verify_password, get_password_hash
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TimedRoute)
 
 
 @router.post("/register", response_model=UserResponse)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    # Check if user already exists; the directory spans every shard
+    existing_user = db.get(UserDirectory, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    # Create new user
+    # Create new user on the shard its id hashes to
     hashed_password = get_password_hash(user_data.password)
     db_user = User(
+        id=uuid7(),
         email=user_data.email,
         hashed_password=hashed_password
     )
+    use_tenant(db, db_user.id)
+    db.add(UserDirectory(email=db_user.email, user_id=db_user.id))
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
@@ -35,8 +41,12 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    # Find user
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    # Find user: the directory names the id, the id names the shard
+    entry = db.get(UserDirectory, user_credentials.email)
+    user = None
+    if entry:
+        use_tenant(db, entry.user_id)
+        user = db.query(User).filter(User.id == entry.user_id).first()
     if not user or not verify_password(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,6 +70,7 @@ def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db)):
     user_id = verify_token(token_data.refresh_token, token_type="refresh")
 
     # Verify user still exists
+    use_tenant(db, user_id)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
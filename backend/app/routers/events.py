@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+import uuid
+
+from ..database import get_db
+from ..instrumentation import TimedRoute
+from ..models.user import User
+from ..models.portfolio import Portfolio
+from ..services.events import TooManySubscribers, event_bus, format_event
+from ..config import settings
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/api/portfolios", tags=["events"], route_class=TimedRoute)
+
+
+@router.get("/{portfolio_id}/events")
+async def stream_portfolio_events(
+    portfolio_id: uuid.UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Verify portfolio ownership
+    portfolio = db.query(Portfolio).filter(
+        Portfolio.id == portfolio_id,
+        Portfolio.user_id == current_user.id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+
+    # The stream can stay open for hours; don't hold a pooled connection for it
+    db.close()
+
+    try:
+        subscription = event_bus.subscribe(portfolio_id)
+    except TooManySubscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams",
+            headers={"Retry-After": str(settings.event_stream_heartbeat_seconds)}
+        )
+
+    async def stream():
+        try:
+            yield format_event("ready", {"portfolio_id": portfolio_id})
+            while True:
+                frame = await subscription.next_frame(settings.event_stream_heartbeat_seconds)
+                if frame is None or await request.is_disconnected():
+                    break
+                # An SSE comment keeps proxies from timing out an idle stream
+                yield frame or ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
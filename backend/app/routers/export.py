@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+import uuid
+
+from ..database import get_db
+from ..instrumentation import TimedRoute
+from ..models.user import User
+from ..models.portfolio import Portfolio
+from ..services.export import FILE_EXTENSIONS, MEDIA_TYPES, arrow_available, export_holdings
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/api/export", tags=["export"], route_class=TimedRoute)
+
+
+@router.get("/holdings")
+def export_user_holdings(
+    format: Literal["csv", "ndjson", "arrow"] = Query("csv"),
+    portfolio_id: Optional[uuid.UUID] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if portfolio_id is not None:
+        # Verify portfolio ownership
+        portfolio = db.query(Portfolio).filter(
+            Portfolio.id == portfolio_id,
+            Portfolio.user_id == current_user.id
+        ).first()
+
+        if not portfolio:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Portfolio not found"
+            )
+
+    if format == "arrow" and not arrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Arrow export requires pyarrow on the server"
+        )
+
+    # The stream reads through its own connection for as long as the client
+    # keeps downloading; don't hold the request's session for it too
+    db.close()
+
+    filename = f"holdings-{portfolio_id or 'all'}.{FILE_EXTENSIONS[format]}"
+    return StreamingResponse(
+        export_holdings(current_user.id, format, portfolio_id),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import BigInteger, func, type_coerce
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+from decimal import Decimal
+
+from ..database import get_db
+from ..instrumentation import TimedRoute
+from ..models.user import User
+from ..models.portfolio import Portfolio
+from ..models.portfolio_holding import PortfolioHolding
+from ..models.security import Security
+from ..schemas.exposure import ExposureResponse
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/api/exposure", tags=["exposure"], route_class=TimedRoute)
+
+UNCLASSIFIED_SECTOR = "Unclassified"
+
+QUANTITY_TYPE = PortfolioHolding.quantity.type
+MARKET_VALUE_TYPE = PortfolioHolding.market_value.type
+
+
+def _weight(value: int, total: int) -> Optional[Decimal]:
+    if not total:
+        return None
+    return (Decimal(value * 100) / total).quantize(Decimal("0.01"))
+
+
+@router.get("/", response_model=ExposureResponse)
+def get_exposure(
+    weighted: bool = False,
+    top: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Aggregate every holding the user owns in a single query grouped on the
+    # integer security id and the holding's sector, which its owner may have
+    # overridden. Sums stay in stored integer units until the response is built
+    sector = func.coalesce(PortfolioHolding.sector_override, Security.sector)
+    rows = db.query(
+        Security.symbol,
+        sector,
+        func.sum(type_coerce(PortfolioHolding.quantity, BigInteger)),
+        func.coalesce(func.sum(type_coerce(PortfolioHolding.market_value, BigInteger)), 0),
+        func.count(PortfolioHolding.id)
+    ).select_from(
+        PortfolioHolding
+    ).join(
+        Portfolio, Portfolio.id == PortfolioHolding.portfolio_id
+    ).join(
+        Security, Security.id == PortfolioHolding.security_id
+    ).filter(
+        Portfolio.user_id == current_user.id
+    ).group_by(
+        Security.id,
+        sector
+    ).all()
+
+    by_symbol: Dict[str, dict] = {}
+    by_sector: Dict[str, dict] = {}
+    total = 0
+
+    for symbol, sector, quantity, market_value, positions in rows:
+        # PostgreSQL sums BIGINT as NUMERIC
+        market_value = int(market_value)
+        total += market_value
+
+        entry = by_symbol.setdefault(symbol, {
+            "symbol": symbol,
+            "sector": sector,
+            "quantity": None,
+            "market_value": 0,
+            "positions": 0,
+            "_sector_value": None
+        })
+        if quantity is not None:
+            entry["quantity"] = (entry["quantity"] or 0) + int(quantity)
+        entry["market_value"] += market_value
+        entry["positions"] += positions
+        # A symbol reported under several sectors is listed under its largest one
+        if sector and (entry["_sector_value"] is None or market_value > entry["_sector_value"]):
+            entry["sector"] = sector
+            entry["_sector_value"] = market_value
+
+        sector_key = sector or UNCLASSIFIED_SECTOR
+        sector_entry = by_sector.setdefault(sector_key, {
+            "sector": sector_key,
+            "market_value": 0,
+            "positions": 0
+        })
+        sector_entry["market_value"] += market_value
+        sector_entry["positions"] += positions
+
+    symbols = sorted(by_symbol.values(), key=lambda item: item["market_value"], reverse=True)
+    sectors = sorted(by_sector.values(), key=lambda item: item["market_value"], reverse=True)
+
+    if top:
+        symbols = symbols[:top]
+        sectors = sectors[:top]
+
+    for item in symbols:
+        del item["_sector_value"]
+
+    if weighted:
+        for item in symbols + sectors:
+            item["weight"] = _weight(item["market_value"], total)
+
+    for item in symbols:
+        if item["quantity"] is not None:
+            item["quantity"] = QUANTITY_TYPE.from_units(item["quantity"])
+    for item in symbols + sectors:
+        item["market_value"] = MARKET_VALUE_TYPE.from_units(item["market_value"])
+
+    return {
+        "total_market_value": MARKET_VALUE_TYPE.from_units(total),
+        "by_symbol": symbols,
+        "by_sector": sectors
+    }
@@ -1,16 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime
 import uuid
 
 from ..database import get_db
+from ..instrumentation import TimedRoute
 from ..models.user import User
 from ..models.portfolio import Portfolio
 from ..models.portfolio_holding import PortfolioHolding
-from ..schemas.portfolio_holding import PortfolioHoldingCreate, PortfolioHoldingUpdate, PortfolioHoldingResponse
+from ..models.security import Security
+from ..models.types import uuid7
+from ..schemas.portfolio_holding import (
+    PortfolioHoldingCreate,
+    PortfolioHoldingUpdate,
+    PortfolioHoldingResponse,
+    HoldingBatchRequest,
+    HoldingBatchResponse,
+)
+from ..services.events import event_bus
+from ..services.holdings_cache import holdings_cache, mark_holdings_changed
+from ..services.securities import normalize_symbol, security_registry
 from ..auth import get_current_user
 
-router = APIRouter(prefix="/api/portfolios", tags=["holdings"])
+router = APIRouter(prefix="/api/portfolios", tags=["holdings"], route_class=TimedRoute)
+
+BATCH_ID_CHUNK_SIZE = 500
+
+# Fields a holding keeps as its own override of the security's
+OVERRIDE_FIELDS = ("name", "sector")
+
+# Same columns, in the same order, as PortfolioHoldingResponse
+holdings_table = PortfolioHolding.__table__
+securities_table = Security.__table__
+HOLDING_COLUMNS = (
+    holdings_table.c.id,
+    securities_table.c.symbol,
+    func.coalesce(holdings_table.c.name, securities_table.c.name).label("name"),
+    holdings_table.c.quantity,
+    holdings_table.c.price,
+    holdings_table.c.market_value,
+    holdings_table.c.weight,
+    func.coalesce(holdings_table.c.sector, securities_table.c.sector).label("sector"),
+    holdings_table.c.validated,
+    holdings_table.c.validation_status,
+    holdings_table.c.portfolio_id,
+    holdings_table.c.created_at,
+    holdings_table.c.updated_at,
+)
+HOLDING_FIELDS = [column.key for column in HOLDING_COLUMNS]
+
+
+def _pop_symbol(data: dict):
+    # Pops the symbol off a create or update payload and keys the name and
+    # sector it carries by the holding's override attributes
+    for field in OVERRIDE_FIELDS:
+        if field in data:
+            data[f"{field}_override"] = data.pop(field)
+    return data.pop("symbol", None)
 
 
 @router.get("/{portfolio_id}/holdings", response_model=List[PortfolioHoldingResponse])
@@ -31,11 +81,21 @@ def get_portfolio_holdings(
             detail="Portfolio not found"
         )
 
-    holdings = db.query(PortfolioHolding).filter(
-        PortfolioHolding.portfolio_id == portfolio_id
-    ).all()
+    # The ownership check already loaded the portfolio's version, so a cached
+    # list is served without another query or any serialization
+    body = holdings_cache.get(portfolio_id, portfolio.updated_at) if holdings_cache.enabled else None
+    if body is None:
+        # Typed rows straight to JSON: no ORM objects and no model validation
+        rows = db.execute(
+            select(*HOLDING_COLUMNS)
+            .join(securities_table, securities_table.c.id == holdings_table.c.security_id)
+            .where(holdings_table.c.portfolio_id == portfolio_id)
+        ).all()
+        body = to_json([dict(zip(HOLDING_FIELDS, row)) for row in rows])
+        if holdings_cache.enabled:
+            holdings_cache.put(portfolio_id, portfolio.updated_at, body)
 
-    return holdings
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/{portfolio_id}/holdings", response_model=PortfolioHoldingResponse)
@@ -57,14 +117,20 @@ def create_holding(
             detail="Portfolio not found"
         )
 
+    data = holding_data.dict()
+    symbol = _pop_symbol(data)
     db_holding = PortfolioHolding(
-        **holding_data.dict(),
+        **data,
+        security_id=security_registry.intern(db, [symbol])[normalize_symbol(symbol)],
         portfolio_id=portfolio_id
     )
     db.add(db_holding)
+    mark_holdings_changed(db, [portfolio_id])
     db.commit()
     db.refresh(db_holding)
 
+    event_bus.publish(portfolio_id, "holding.created", {"holding": PortfolioHoldingResponse.model_validate(db_holding)})
+
     return db_holding
 
 
@@ -99,14 +165,20 @@ def update_holding(
             detail="Holding not found"
         )
 
-    # Update holding with provided data
+    # Update holding with provided data; a new symbol points it at another security
     update_data = holding_data.dict(exclude_unset=True)
+    symbol = _pop_symbol(update_data)
+    if symbol:
+        holding.security_id = security_registry.intern(db, [symbol])[normalize_symbol(symbol)]
     for field, value in update_data.items():
         setattr(holding, field, value)
 
+    mark_holdings_changed(db, [portfolio_id])
     db.commit()
     db.refresh(holding)
 
+    event_bus.publish(portfolio_id, "holding.updated", {"holding": PortfolioHoldingResponse.model_validate(holding)})
+
     return holding
 
 
@@ -141,6 +213,128 @@ def delete_holding(
         )
 
     db.delete(holding)
+    mark_holdings_changed(db, [portfolio_id])
     db.commit()
 
-    return {"message": "Holding deleted successfully"}
\ No newline at end of file
+    event_bus.publish(portfolio_id, "holding.deleted", {"id": holding_id})
+
+    return {"message": "Holding deleted successfully"}
+
+
+@router.post("/{portfolio_id}/holdings/batch", response_model=HoldingBatchResponse)
+def batch_update_holdings(
+    portfolio_id: uuid.UUID,
+    batch: HoldingBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Verify portfolio ownership once for the whole batch
+    portfolio = db.query(Portfolio).filter(
+        Portfolio.id == portfolio_id,
+        Portfolio.user_id == current_user.id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+
+    # Resolve every referenced holding with one query per chunk of ids
+    referenced_ids = list({
+        operation.id for operation in batch.operations
+        if operation.op != "create" and operation.id is not None
+    })
+    live_ids = set()
+    for start in range(0, len(referenced_ids), BATCH_ID_CHUNK_SIZE):
+        live_ids.update(db.scalars(
+            select(PortfolioHolding.id).where(
+                PortfolioHolding.portfolio_id == portfolio_id,
+                PortfolioHolding.id.in_(referenced_ids[start:start + BATCH_ID_CHUNK_SIZE])
+            )
+        ))
+
+    now = datetime.utcnow()
+    inserts = []
+    updates = []
+    deletes = []
+    results = []
+    # Parallel to the inserts and updates that set a security; resolved in one go below
+    symbols = []
+    listed_rows = []
+
+    for index, operation in enumerate(batch.operations):
+        result = {"index": index, "op": operation.op, "id": operation.id, "status": "ok", "detail": None}
+        results.append(result)
+
+        try:
+            if operation.op == "create":
+                holding_data = PortfolioHoldingCreate(**operation.data).dict()
+                result["id"] = uuid7()
+                symbols.append(_pop_symbol(holding_data))
+                inserts.append({
+                    **holding_data,
+                    "id": result["id"],
+                    "portfolio_id": portfolio_id,
+                    "created_at": now,
+                    "updated_at": now
+                })
+                listed_rows.append(inserts[-1])
+                continue
+
+            if operation.id not in live_ids:
+                result["status"] = "error"
+                result["detail"] = "Holding not found"
+                continue
+
+            if operation.op == "update":
+                update_data = PortfolioHoldingUpdate(**operation.data).dict(exclude_unset=True)
+                symbol = _pop_symbol(update_data)
+                if symbol:
+                    symbols.append(symbol)
+                    listed_rows.append(update_data)
+                update_data.update({"id": operation.id, "updated_at": now})
+                updates.append(update_data)
+            else:
+                deletes.append(operation.id)
+                # Later operations in the same batch must not touch a deleted holding
+                live_ids.discard(operation.id)
+        except ValidationError as e:
+            result["status"] = "error"
+            result["detail"] = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+
+    if symbols:
+        security_ids = security_registry.intern(db, symbols)
+        for row, symbol in zip(listed_rows, symbols):
+            row["security_id"] = security_ids[normalize_symbol(symbol)]
+
+    if inserts:
+        db.execute(insert(PortfolioHolding), inserts)
+    if updates:
+        db.execute(update(PortfolioHolding), updates)
+    for start in range(0, len(deletes), BATCH_ID_CHUNK_SIZE):
+        db.execute(
+            delete(PortfolioHolding)
+            .where(PortfolioHolding.id.in_(deletes[start:start + BATCH_ID_CHUNK_SIZE]))
+            .execution_options(synchronize_session=False)
+        )
+    if inserts or updates or deletes:
+        mark_holdings_changed(db, [portfolio_id], now)
+    db.commit()
+
+    if inserts or updates or deletes:
+        event_bus.publish(portfolio_id, "holdings.changed", {
+            "created": [row["id"] for row in inserts],
+            "updated": [row["id"] for row in updates],
+            "deleted": deletes
+        })
+
+    return {
+        "created": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "results": results
+    }
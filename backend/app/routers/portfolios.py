@@ -4,12 +4,15 @@ from typing import List
 import uuid
 
 from ..database import get_db
+from ..instrumentation import TimedRoute
 from ..models.user import User
 from ..models.portfolio import Portfolio
 from ..schemas.portfolio import PortfolioCreate, PortfolioUpdate, PortfolioResponse
+from ..services.holdings_cache import holdings_cache
+from ..services.recap_scheduler import initial_recap_at
 from ..auth import get_current_user
 
-router = APIRouter(prefix="/api/portfolios", tags=["portfolios"])
+router = APIRouter(prefix="/api/portfolios", tags=["portfolios"], route_class=TimedRoute)
 
 
 @router.get("/", response_model=List[PortfolioResponse])
@@ -49,7 +52,8 @@ def create_portfolio(
 ):
     db_portfolio = Portfolio(
         **portfolio_data.dict(),
-        user_id=current_user.id
+        user_id=current_user.id,
+        next_recap_at=initial_recap_at(portfolio_data.email_frequency)
     )
     db.add(db_portfolio)
     db.commit()
@@ -81,6 +85,10 @@ def update_portfolio(
     for field, value in update_data.items():
         setattr(portfolio, field, value)
 
+    # Restart the recap schedule when the frequency changes
+    if "email_frequency" in update_data:
+        portfolio.next_recap_at = initial_recap_at(portfolio.email_frequency)
+
     db.commit()
     db.refresh(portfolio)
 
@@ -106,5 +114,6 @@ def delete_portfolio(
 
     db.delete(portfolio)
     db.commit()
+    holdings_cache.invalidate([portfolio_id])
 
     return {"message": "Portfolio deleted successfully"}
\ No newline at end of file
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from typing import List
 import uuid
 
 from ..database import get_db
+from ..instrumentation import TimedRoute
 from ..models.user import User
 from ..models.portfolio import Portfolio
 from ..models.email_recap import EmailRecap
-from ..schemas.email_recap import EmailRecapCreate, EmailRecapResponse
+from ..schemas.email_recap import EmailRecapCreate, EmailRecapSummary, EmailRecapResponse
+from ..services.recaps import get_or_build_recap
 from ..auth import get_current_user
 
-router = APIRouter(prefix="/api/portfolios", tags=["email-recaps"])
+router = APIRouter(prefix="/api/portfolios", tags=["email-recaps"], route_class=TimedRoute)
 
 
-@router.get("/{portfolio_id}/recaps", response_model=List[EmailRecapResponse])
+@router.get("/{portfolio_id}/recaps", response_model=List[EmailRecapSummary])
 def get_portfolio_recaps(
     portfolio_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
@@ -33,7 +35,7 @@ def get_portfolio_recaps(
 
     recaps = db.query(EmailRecap).filter(
         EmailRecap.portfolio_id == portfolio_id
-    ).order_by(EmailRecap.sent_at.desc()).all()
+    ).order_by(EmailRecap.created_at.desc()).all()
 
     return recaps
 
@@ -56,9 +58,11 @@ def get_latest_recap(
             detail="Portfolio not found"
         )
 
-    latest_recap = db.query(EmailRecap).filter(
+    latest_recap = db.query(EmailRecap).options(
+        undefer(EmailRecap.content)
+    ).filter(
         EmailRecap.portfolio_id == portfolio_id
-    ).order_by(EmailRecap.sent_at.desc()).first()
+    ).order_by(EmailRecap.created_at.desc()).first()
 
     if not latest_recap:
         raise HTTPException(
@@ -69,6 +73,41 @@ def get_latest_recap(
     return latest_recap
 
 
+@router.get("/{portfolio_id}/recaps/{recap_id}", response_model=EmailRecapResponse)
+def get_recap(
+    portfolio_id: uuid.UUID,
+    recap_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Verify portfolio ownership
+    portfolio = db.query(Portfolio).filter(
+        Portfolio.id == portfolio_id,
+        Portfolio.user_id == current_user.id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+
+    recap = db.query(EmailRecap).options(
+        undefer(EmailRecap.content)
+    ).filter(
+        EmailRecap.id == recap_id,
+        EmailRecap.portfolio_id == portfolio_id
+    ).first()
+
+    if not recap:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recap not found"
+        )
+
+    return recap
+
+
 @router.post("/{portfolio_id}/recaps", response_model=EmailRecapResponse)
 def create_recap(
     portfolio_id: uuid.UUID,
@@ -117,25 +156,11 @@ def generate_recap(
             detail="Portfolio not found"
         )
 
-    # TODO: Implement actual email recap generation logic
-    # For now, create a simple recap
-    recap_content = f"""
-    Portfolio Recap for {portfolio.name}
-
-    This is an automated recap of your portfolio performance.
-
-    Portfolio Details:
-    - Name: {portfolio.name}
-    - Description: {portfolio.description or 'No description provided'}
-
-    Generated automatically by Scout Portfolio Tracker.
-    """
+    # Nothing changed since the last recap: hand that one back instead of a duplicate
+    db_recap, created = get_or_build_recap(db, portfolio)
+    if not created:
+        return db_recap
 
-    db_recap = EmailRecap(
-        subject=f"Portfolio Recap: {portfolio.name}",
-        content=recap_content.strip(),
-        portfolio_id=portfolio_id
-    )
     db.add(db_recap)
     db.commit()
     db.refresh(db_recap)
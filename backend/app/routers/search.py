@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import uuid
+
+from ..database import get_db
+from ..instrumentation import TimedRoute
+from ..models.user import User
+from ..models.portfolio import Portfolio
+from ..schemas.email_recap import EmailRecapSearchResult
+from ..services.recap_search import search_recaps, search_supported
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/api/recaps", tags=["email-recaps"], route_class=TimedRoute)
+
+
+@router.get("/search", response_model=List[EmailRecapSearchResult])
+def search_recap_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    portfolio_id: Optional[uuid.UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if not search_supported(db.get_bind()):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Recap search is not available on this database"
+        )
+
+    if portfolio_id:
+        # Verify portfolio ownership
+        portfolio = db.query(Portfolio).filter(
+            Portfolio.id == portfolio_id,
+            Portfolio.user_id == current_user.id
+        ).first()
+
+        if not portfolio:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Portfolio not found"
+            )
+
+    return search_recaps(db, uuid.UUID(str(current_user.id)), q, portfolio_id=portfolio_id, limit=limit)
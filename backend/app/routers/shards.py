@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from ..instrumentation import TimedRoute
+from ..models.user import User
+from ..schemas.shard import ShardStatusResponse
+from ..services.rebalance import shard_stats
+from ..auth import get_current_admin
+
+router = APIRouter(prefix="/admin/shards", tags=["admin"], route_class=TimedRoute)
+
+
+@router.get("/", response_model=ShardStatusResponse)
+def list_shards(current_user: User = Depends(get_current_admin)):
+    # Counts every shard in turn; moving users is left to the offline
+    # `python -m app.services.rebalance` since it needs writes stopped
+    return shard_stats()
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session, undefer
+from typing import List, Optional
+from datetime import date
+import uuid
+
+from ..database import get_db
+from ..instrumentation import TimedRoute
+from ..models.user import User
+from ..models.portfolio import Portfolio
+from ..models.holding_snapshot import HoldingSnapshot
+from ..schemas.holding_snapshot import SnapshotPoint, SnapshotDetail
+from ..services.snapshots import decode_positions, get_value_series
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/api/portfolios", tags=["snapshots"], route_class=TimedRoute)
+
+
+@router.get("/{portfolio_id}/snapshots", response_model=List[SnapshotPoint])
+def get_portfolio_value_history(
+    portfolio_id: uuid.UUID,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Verify portfolio ownership
+    portfolio = db.query(Portfolio).filter(
+        Portfolio.id == portfolio_id,
+        Portfolio.user_id == current_user.id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+
+    return get_value_series(db, portfolio_id, start, end)
+
+
+@router.get("/{portfolio_id}/snapshots/{snapshot_date}", response_model=SnapshotDetail)
+def get_portfolio_snapshot(
+    portfolio_id: uuid.UUID,
+    snapshot_date: date,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Verify portfolio ownership
+    portfolio = db.query(Portfolio).filter(
+        Portfolio.id == portfolio_id,
+        Portfolio.user_id == current_user.id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+
+    snapshot = db.query(HoldingSnapshot).options(
+        undefer(HoldingSnapshot.symbols),
+        undefer(HoldingSnapshot.quantities),
+        undefer(HoldingSnapshot.prices),
+        undefer(HoldingSnapshot.market_values)
+    ).filter(
+        HoldingSnapshot.portfolio_id == portfolio_id,
+        HoldingSnapshot.snapshot_date == snapshot_date
+    ).first()
+
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Snapshot not found"
+        )
+
+    return {
+        "snapshot_date": snapshot.snapshot_date,
+        "total_value": snapshot.total_value,
+        "position_count": snapshot.position_count,
+        "positions": decode_positions(snapshot)
+    }
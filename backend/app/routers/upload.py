@@ -1,24 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from decimal import Decimal, InvalidOperation
 import uuid
 import os
 import csv
 from pathlib import Path
+from time import perf_counter
 
 from ..database import get_db
+from ..instrumentation import TimedRoute, span
+from ..instrumentation.metrics import IMPORT_DURATION, IMPORT_ROWS
 from ..models.user import User
 from ..models.portfolio import Portfolio
 from ..models.portfolio_holding import PortfolioHolding
+from ..services.events import event_bus
+from ..services.holdings_cache import mark_holdings_changed
+from ..services.securities import normalize_symbol, security_registry
 from ..auth import get_current_user
 
-router = APIRouter(prefix="/api/portfolios", tags=["file-upload"])
+router = APIRouter(prefix="/api/portfolios", tags=["file-upload"], route_class=TimedRoute)
 
 UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
 
 ALLOWED_EXTENSIONS = {".csv", ".xlsx", ".xls"}
 
+# Rows between import.progress events
+IMPORT_PROGRESS_ROWS = 1000
+
+# Skipped rows listed in an import's response; the count covers all of them
+MAX_REPORTED_SKIPS = 100
+
+AMOUNT_TYPES = {name: PortfolioHolding.__table__.c[name].type for name in ("quantity", "price", "market_value")}
+
 
 def get_file_extension(filename: str) -> str:
     return Path(filename).suffix.lower()
@@ -94,7 +110,8 @@ async def upload_portfolio_file(
             buffer.write(content)
 
         # Read and parse file
-        file_data = read_file_data(file_path)
+        with span("csv"):
+            file_data = read_file_data(file_path)
 
         # Return file preview data
         preview_data = {
@@ -122,6 +139,127 @@ async def upload_portfolio_file(
         )
 
 
+def _amount_field(column_name: str) -> Optional[str]:
+    if "quantity" in column_name or "shares" in column_name:
+        return "quantity"
+    if "price" in column_name and "market" not in column_name:
+        return "price"
+    if "market" in column_name and "value" in column_name:
+        return "market_value"
+    return None
+
+
+def _amount(cell: Any, field: str) -> Tuple[Optional[Decimal], bool]:
+    """A cell as a Decimal rounded to its column's scale, and whether that changed it.
+
+    Cells that are not numbers give None; ValueError if the column cannot
+    store the value.
+    """
+    try:
+        value = Decimal(str(cell).strip())
+    except InvalidOperation:
+        return None, False
+    column_type = AMOUNT_TYPES[field]
+    stored = column_type.from_units(column_type.to_units(value))
+    return stored, stored != value
+
+
+def import_holdings(
+    db: Session,
+    portfolio_id: uuid.UUID,
+    file_data: Dict[str, Any],
+    symbol_col: int,
+    name_col: Optional[int]
+) -> Dict[str, Any]:
+    """Replace a portfolio's holdings with the mapped file rows, publishing import.progress events.
+
+    Rows with an amount too large to store, or one that is not finite, are
+    skipped and reported rather than failing the whole import. Amounts with
+    more decimal places than their column keeps are rounded, and the rows
+    are counted in ``rows_rounded``.
+    """
+    # Clear existing holdings for this portfolio
+    db.query(PortfolioHolding).filter(
+        PortfolioHolding.portfolio_id == portfolio_id
+    ).delete()
+
+    # Process each row into a holding; symbols are resolved afterwards, all at once
+    holdings = []
+    symbols = []
+    skipped = []
+    rows_skipped = 0
+    rows_rounded = 0
+    headers = file_data["headers"]
+    total_rows = file_data["total_rows"]
+    amount_fields = {index: _amount_field(str(name).lower()) for index, name in enumerate(headers)}
+
+    for row_number, row in enumerate(file_data["rows"], start=1):
+        if len(row) <= symbol_col:
+            continue
+
+        symbol = row[symbol_col] if row[symbol_col] else None
+        name = row[name_col] if name_col is not None and len(row) > name_col and row[name_col] else None
+
+        if symbol and str(symbol).strip():
+            # Amounts come from columns with common names
+            amounts = {"quantity": None, "price": None, "market_value": None}
+            problem = None
+            rounded = False
+            for col_idx, field in amount_fields.items():
+                if field and col_idx < len(row) and row[col_idx]:
+                    try:
+                        value, changed = _amount(row[col_idx], field)
+                    except ValueError as e:
+                        problem = f"{headers[col_idx]}: {e}"
+                        continue
+                    if value is not None:
+                        amounts[field] = value
+                        rounded = rounded or changed
+
+            if problem:
+                rows_skipped += 1
+                if len(skipped) < MAX_REPORTED_SKIPS:
+                    skipped.append({"row": row_number, "symbol": str(symbol).strip(), "detail": problem})
+                continue
+            rows_rounded += rounded
+
+            symbols.append(symbol)
+            holdings.append({
+                **amounts,
+                "name_override": str(name).strip() if name else None,
+                "portfolio_id": portfolio_id,
+                "validated": False,
+                "validation_status": "pending"
+            })
+
+    # Interned symbols resolve from memory; only unseen ones cost a query per chunk
+    security_ids = security_registry.intern(db, symbols)
+    for holding, symbol in zip(holdings, symbols):
+        holding["security_id"] = security_ids[normalize_symbol(symbol)]
+
+    holdings_created = 0
+    for start in range(0, len(holdings), IMPORT_PROGRESS_ROWS):
+        chunk = holdings[start:start + IMPORT_PROGRESS_ROWS]
+        db.execute(insert(PortfolioHolding), chunk)
+        holdings_created += len(chunk)
+        IMPORT_ROWS.inc(len(chunk))
+        if holdings_created < len(holdings):
+            event_bus.publish(portfolio_id, "import.progress", {
+                "processed_rows": holdings_created,
+                "total_rows": total_rows,
+                "holdings_created": holdings_created
+            })
+
+    mark_holdings_changed(db, [portfolio_id])
+    db.commit()
+    return {
+        "holdings_created": holdings_created,
+        "rows_rounded": rows_rounded,
+        "rows_skipped": rows_skipped,
+        "skipped": skipped
+    }
+
+
 @router.post("/{portfolio_id}/process-holdings")
 async def process_portfolio_holdings(
     portfolio_id: uuid.UUID,
@@ -149,7 +287,8 @@ async def process_portfolio_holdings(
 
     try:
         # Read the uploaded file
-        file_data = read_file_data(Path(portfolio.file_path))
+        with span("csv"):
+            file_data = read_file_data(Path(portfolio.file_path))
 
         # Extract column mappings
         symbol_col = column_mapping.get("tickerColumn")
@@ -161,66 +300,28 @@ async def process_portfolio_holdings(
                 detail="Symbol/Ticker column mapping is required"
             )
 
-        # Clear existing holdings for this portfolio
-        db.query(PortfolioHolding).filter(
-            PortfolioHolding.portfolio_id == portfolio_id
-        ).delete()
-
-        # Process each row and create holdings
-        holdings_created = 0
-        headers = file_data["headers"]
+        event_bus.publish(portfolio_id, "import.started", {"total_rows": file_data["total_rows"]})
 
-        for row in file_data["rows"]:
-            if len(row) <= symbol_col:
-                continue
-
-            symbol = row[symbol_col] if row[symbol_col] else None
-            name = row[name_col] if name_col is not None and len(row) > name_col and row[name_col] else None
-
-            if symbol and str(symbol).strip():
-                # Try to extract other common columns
-                quantity = None
-                price = None
-                market_value = None
-
-                # Look for common column names
-                for col_idx, col_name in enumerate(headers):
-                    if col_idx < len(row) and row[col_idx]:
-                        col_name_lower = str(col_name).lower()
-                        try:
-                            if "quantity" in col_name_lower or "shares" in col_name_lower:
-                                quantity = float(row[col_idx])
-                            elif "price" in col_name_lower and "market" not in col_name_lower:
-                                price = float(row[col_idx])
-                            elif "market" in col_name_lower and "value" in col_name_lower:
-                                market_value = float(row[col_idx])
-                        except (ValueError, TypeError):
-                            pass
-
-                # Create holding
-                holding = PortfolioHolding(
-                    symbol=str(symbol).upper().strip(),
-                    name=str(name).strip() if name else None,
-                    quantity=quantity,
-                    price=price,
-                    market_value=market_value,
-                    portfolio_id=portfolio_id,
-                    validated=False,
-                    validation_status="pending"
-                )
-
-                db.add(holding)
-                holdings_created += 1
+        # Run the import off the event loop so other requests and event streams keep being served
+        started = perf_counter()
+        result = await run_in_threadpool(
+            import_holdings, db, portfolio_id, file_data, symbol_col, name_col
+        )
+        IMPORT_DURATION.observe(perf_counter() - started)
 
-        db.commit()
+        event_bus.publish(portfolio_id, "import.completed", {
+            "holdings_created": result["holdings_created"],
+            "rows_skipped": result["rows_skipped"]
+        })
 
         return {
-            "message": f"Successfully processed {holdings_created} holdings",
-            "holdings_created": holdings_created
+            "message": f"Successfully processed {result['holdings_created']} holdings",
+            **result
         }
 
     except Exception as e:
         db.rollback()
+        event_bus.publish(portfolio_id, "import.failed", {"detail": str(e)})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing holdings: {str(e)}"
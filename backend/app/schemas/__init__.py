@@ -1,7 +1,19 @@
 from .user import UserCreate, UserLogin, UserResponse, Token
 from .portfolio import PortfolioCreate, PortfolioUpdate, PortfolioResponse
-from .portfolio_holding import PortfolioHoldingCreate, PortfolioHoldingUpdate, PortfolioHoldingResponse
-from .email_recap import EmailRecapCreate, EmailRecapResponse
+from .portfolio_holding import (
+    PortfolioHoldingCreate,
+    PortfolioHoldingUpdate,
+    PortfolioHoldingResponse,
+    HoldingBatchOperation,
+    HoldingBatchRequest,
+    HoldingBatchResult,
+    HoldingBatchResponse,
+)
+from .email_recap import EmailRecapCreate, EmailRecapSummary, EmailRecapResponse, EmailRecapSearchResult
+from .holding_snapshot import SnapshotPoint, SnapshotPosition, SnapshotDetail
+from .exposure import SectorExposure, SymbolExposure, ExposureResponse
+from .profile import ProfileSessionCreate, ProfileSessionResponse
+from .shard import ShardStats, ShardStatusResponse
 
 __all__ = [
     "UserCreate",
@@ -14,6 +26,22 @@ __all__ = [
     "PortfolioHoldingCreate",
     "PortfolioHoldingUpdate",
     "PortfolioHoldingResponse",
+    "HoldingBatchOperation",
+    "HoldingBatchRequest",
+    "HoldingBatchResult",
+    "HoldingBatchResponse",
     "EmailRecapCreate",
+    "EmailRecapSummary",
     "EmailRecapResponse",
+    "EmailRecapSearchResult",
+    "SnapshotPoint",
+    "SnapshotPosition",
+    "SnapshotDetail",
+    "SectorExposure",
+    "SymbolExposure",
+    "ExposureResponse",
+    "ProfileSessionCreate",
+    "ProfileSessionResponse",
+    "ShardStats",
+    "ShardStatusResponse",
 ]
\ No newline at end of file
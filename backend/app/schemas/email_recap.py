@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 from datetime import datetime
 import uuid
 
@@ -8,13 +9,25 @@ class EmailRecapCreate(BaseModel):
     content: str
 
 
-class EmailRecapResponse(BaseModel):
+class EmailRecapSummary(BaseModel):
     id: uuid.UUID
     subject: str
-    content: str
     portfolio_id: uuid.UUID
-    sent_at: datetime
+    sent_at: Optional[datetime]
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class EmailRecapResponse(EmailRecapSummary):
+    content: str
+
+
+class EmailRecapSearchResult(BaseModel):
+    id: uuid.UUID
+    subject: str
+    portfolio_id: uuid.UUID
+    created_at: datetime
+    snippet: str
+    score: float
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from decimal import Decimal
+
+
+class SectorExposure(BaseModel):
+    sector: str
+    market_value: Decimal
+    positions: int
+    weight: Optional[Decimal] = None
+
+
+class SymbolExposure(BaseModel):
+    symbol: str
+    sector: Optional[str]
+    quantity: Optional[Decimal]
+    market_value: Decimal
+    positions: int
+    weight: Optional[Decimal] = None
+
+
+class ExposureResponse(BaseModel):
+    total_market_value: Decimal
+    by_symbol: List[SymbolExposure]
+    by_sector: List[SectorExposure]
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from decimal import Decimal
+from datetime import date
+
+
+class SnapshotPoint(BaseModel):
+    snapshot_date: date
+    total_value: Optional[Decimal]
+    position_count: int
+
+
+class SnapshotPosition(BaseModel):
+    symbol: str
+    quantity: Optional[float]
+    price: Optional[float]
+    market_value: Optional[float]
+
+
+class SnapshotDetail(SnapshotPoint):
+    positions: List[SnapshotPosition]
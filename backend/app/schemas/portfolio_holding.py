@@ -1,31 +1,72 @@
-from pydantic import BaseModel
-from typing import Optional
-from decimal import Decimal
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from typing import Optional, List, Dict, Any, Literal
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 import uuid
 
+from ..models.portfolio_holding import PortfolioHolding
+
+# Amounts are stored as BIGINT units (see ScaledInteger): 6 places for
+# quantities and 2 for money, within 18 digits so they always fit
+AMOUNT_FIELDS = ("quantity", "price", "market_value")
+_AMOUNT_TYPES = {name: PortfolioHolding.__table__.c[name].type for name in AMOUNT_FIELDS}
+
+
+def _round_amount(value: Any, info: ValidationInfo) -> Any:
+    """Round an amount half-to-even to its column's scale, as it will be stored.
+
+    Runs before the Decimal checks, so max_digits only limits the range.
+    Values that are not numbers are left for those checks to reject.
+    """
+    if value is None:
+        return None
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        return value
+    if not amount.is_finite():
+        return value
+    column_type = _AMOUNT_TYPES[info.field_name]
+    return column_type.from_units(column_type.to_units(amount))
+
+
+def _check_symbol(value: Optional[str]) -> Optional[str]:
+    """The symbol without surrounding whitespace; a blank one is rejected"""
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        raise ValueError("symbol must not be blank")
+    return value
+
 
 class PortfolioHoldingCreate(BaseModel):
     symbol: str
     name: Optional[str] = None
-    quantity: Optional[Decimal] = None
-    price: Optional[Decimal] = None
-    market_value: Optional[Decimal] = None
-    weight: Optional[Decimal] = None
+    quantity: Optional[Decimal] = Field(None, max_digits=18)
+    price: Optional[Decimal] = Field(None, max_digits=18)
+    market_value: Optional[Decimal] = Field(None, max_digits=18)
+    weight: Optional[Decimal] = Field(None, max_digits=5, decimal_places=2)
     sector: Optional[str] = None
 
+    check_symbol = field_validator("symbol")(_check_symbol)
+    round_amounts = field_validator(*AMOUNT_FIELDS, mode="before")(_round_amount)
+
 
 class PortfolioHoldingUpdate(BaseModel):
     symbol: Optional[str] = None
     name: Optional[str] = None
-    quantity: Optional[Decimal] = None
-    price: Optional[Decimal] = None
-    market_value: Optional[Decimal] = None
-    weight: Optional[Decimal] = None
+    quantity: Optional[Decimal] = Field(None, max_digits=18)
+    price: Optional[Decimal] = Field(None, max_digits=18)
+    market_value: Optional[Decimal] = Field(None, max_digits=18)
+    weight: Optional[Decimal] = Field(None, max_digits=5, decimal_places=2)
     sector: Optional[str] = None
     validated: Optional[bool] = None
     validation_status: Optional[str] = None
 
+    check_symbol = field_validator("symbol")(_check_symbol)
+    round_amounts = field_validator(*AMOUNT_FIELDS, mode="before")(_round_amount)
+
 
 class PortfolioHoldingResponse(BaseModel):
     id: uuid.UUID
@@ -43,4 +84,30 @@ class PortfolioHoldingResponse(BaseModel):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class HoldingBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[uuid.UUID] = None
+    data: Dict[str, Any] = {}
+
+
+class HoldingBatchRequest(BaseModel):
+    operations: List[HoldingBatchOperation] = Field(..., max_length=5000)
+
+
+class HoldingBatchResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[uuid.UUID]
+    status: str
+    detail: Optional[str] = None
+
+
+class HoldingBatchResponse(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[HoldingBatchResult]
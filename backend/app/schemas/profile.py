@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+class ProfileSessionCreate(BaseModel):
+    route: Optional[str] = None
+    method: Optional[str] = None
+    requests: int = Field(10, ge=1, le=1000)
+    ttl_seconds: int = Field(600, ge=1, le=86400)
+
+
+class ProfileSessionResponse(BaseModel):
+    id: uuid.UUID
+    route: Optional[str]
+    method: Optional[str]
+    requests: int
+    profiled: int
+    token_requests: int
+    samples: int
+    active: bool
+    created_at: datetime
+    expires_at: datetime
+    token: str
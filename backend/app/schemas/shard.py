@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Dict
+
+
+class ShardStats(BaseModel):
+    url: str
+    users: int
+    portfolios: int
+    holdings: int
+    # Users the ring assigns to another shard; non-zero until a rebalance runs
+    misplaced_users: int
+    ring_share: float
+
+
+class ShardStatusResponse(BaseModel):
+    shards: Dict[str, ShardStats]
+    vnodes: int
+    directory_entries: int
@@ -0,0 +1,232 @@
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import math
+import threading
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.routing import compile_path
+
+from ..auth.jwt_handler import verify_token
+from ..config import settings
+from ..instrumentation.metrics import ADMISSION_DECISIONS
+
+AUTH = "auth"
+IMPORT = "import"
+EXPORT = "export"
+READ = "read"
+
+# First match wins; anything unlisted is READ. None means never limited:
+# probes, the admin tools needed to diagnose an overload, and event streams,
+# which stay open for hours and are capped by the event bus instead.
+ROUTE_CLASSES = [
+    (None, None, "/health"),
+    (None, None, "/metrics"),
+    (None, None, "/admin/{path:path}"),
+    (None, "GET", "/api/portfolios/{portfolio_id}/events"),
+    (AUTH, None, "/auth/{path:path}"),
+    (IMPORT, "POST", "/api/portfolios/{portfolio_id}/upload-holdings"),
+    (IMPORT, "POST", "/api/portfolios/{portfolio_id}/process-holdings"),
+    (IMPORT, "POST", "/api/portfolios/{portfolio_id}/holdings/batch"),
+    (IMPORT, "POST", "/api/portfolios/{portfolio_id}/recaps/generate"),
+    (EXPORT, "GET", "/api/export/holdings"),
+]
+_COMPILED = [(route_class, method, compile_path(path)[0]) for route_class, method, path in ROUTE_CLASSES]
+
+# Shedding is about the next second or two, not the client's budget
+SHED_RETRY_AFTER_SECONDS = 1
+
+ACCEPTED = "accepted"
+RATE_LIMITED = "rate_limited"
+SHED = "shed"
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    for route_class, route_method, regex in _COMPILED:
+        if (route_method is None or route_method == method) and regex.match(path):
+            return route_class
+    return READ
+
+
+class RouteClassLimit:
+    """Per-client rate and burst, plus how many of these a worker runs at once"""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_in_flight: Optional[int] = None):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Spend a token; 0 on success, otherwise seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Decides, before any request work starts, whether to run a request.
+
+    A request is shed with 503 while the worker already has ``max_in_flight``
+    requests running, or its route class is at its own concurrency limit, so
+    the worker never queues more than it can finish. Otherwise the client's
+    token bucket for the route class must have a token, or the request gets
+    429. Both carry Retry-After. Buckets are kept for the ``max_clients``
+    most recently seen clients.
+    """
+
+    def __init__(self, limits: Dict[str, RouteClassLimit], max_in_flight: int, max_clients: int = 100_000):
+        self.limits = limits
+        self.max_in_flight = max_in_flight
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._in_flight: Counter = Counter()
+        self._total_in_flight = 0
+        self._decisions: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def admit(self, route_class: str, client: str) -> Optional[Tuple[int, int]]:
+        """None if admitted (call ``release`` when done), else (status code, Retry-After seconds)"""
+        limit = self.limits[route_class]
+        with self._lock:
+            if self._total_in_flight >= self.max_in_flight or (
+                limit.max_in_flight is not None and self._in_flight[route_class] >= limit.max_in_flight
+            ):
+                return self._reject(route_class, SHED, 503, SHED_RETRY_AFTER_SECONDS)
+
+            if limit.rate > 0:
+                wait = self._bucket(route_class, client, limit).take(time.monotonic())
+                if wait:
+                    return self._reject(route_class, RATE_LIMITED, 429, math.ceil(wait))
+
+            self._in_flight[route_class] += 1
+            self._total_in_flight += 1
+            self._decisions[route_class, ACCEPTED] += 1
+        ADMISSION_DECISIONS.labels(route_class, ACCEPTED).inc()
+        return None
+
+    def release(self, route_class: str):
+        with self._lock:
+            self._in_flight[route_class] -= 1
+            self._total_in_flight -= 1
+
+    def _bucket(self, route_class: str, client: str, limit: RouteClassLimit) -> TokenBucket:
+        key = (route_class, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(limit.rate, limit.burst, time.monotonic())
+            if len(self._buckets) > self.max_clients:
+                # The least recently seen client's bucket has most likely refilled anyway
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _reject(self, route_class: str, decision: str, status_code: int, retry_after: int) -> Tuple[int, int]:
+        self._decisions[route_class, decision] += 1
+        ADMISSION_DECISIONS.labels(route_class, decision).inc()
+        return status_code, max(retry_after, 1)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "in_flight": self._total_in_flight,
+                "clients": len(self._buckets),
+                "classes": {
+                    route_class: {
+                        "in_flight": self._in_flight[route_class],
+                        **{decision: self._decisions[route_class, decision] for decision in (ACCEPTED, RATE_LIMITED, SHED)}
+                    }
+                    for route_class in self.limits
+                }
+            }
+
+
+@lru_cache(maxsize=10_000)
+def _user_for_token(token: str) -> Optional[str]:
+    # The key only picks whose bucket to charge, and a token names the same user
+    # even after it expires, so results are cached; endpoints still verify it
+    try:
+        return f"user:{verify_token(token)}"
+    except HTTPException:
+        return None
+
+
+def client_key(scope, route_class: str) -> str:
+    """The signed-in user for API calls; the address for sign-in and anonymous calls"""
+    if route_class != AUTH:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                user = _user_for_token(token) if scheme.lower() == "bearer" else None
+                if user is not None:
+                    return user
+                break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware answering 429/503 before the request reaches routing or its body is read"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = self.controller.admit(route_class, client_key(scope, route_class))
+        if rejection is not None:
+            status_code, retry_after = rejection
+            response = JSONResponse(
+                {"detail": "Too many requests" if status_code == 429 else "Server is busy, try again shortly"},
+                status_code=status_code,
+                headers={"Retry-After": str(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
+
+
+admission = AdmissionController(
+    {
+        AUTH: RouteClassLimit(
+            settings.admission_auth_per_minute, settings.admission_auth_burst, settings.admission_auth_max_in_flight
+        ),
+        IMPORT: RouteClassLimit(
+            settings.admission_import_per_minute, settings.admission_import_burst, settings.admission_import_max_in_flight
+        ),
+        EXPORT: RouteClassLimit(
+            settings.admission_export_per_minute, settings.admission_export_burst, settings.admission_export_max_in_flight
+        ),
+        READ: RouteClassLimit(settings.admission_read_per_minute, settings.admission_read_burst),
+    },
+    max_in_flight=settings.admission_max_in_flight,
+    max_clients=settings.admission_max_clients
+)
@@ -0,0 +1,305 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import smtplib
+import threading
+import time
+import uuid
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from ..database import shard_engines, shard_session
+from ..models.email_recap import EmailRecap
+from ..models.portfolio import Portfolio
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+# A claimed recap that was neither sent nor released is picked up again after this long
+CLAIM_LEASE = timedelta(minutes=10)
+
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+recaps_table = EmailRecap.__table__
+
+
+def smtp_connection_factory(
+    host: str,
+    port: int = 25,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    use_tls: bool = False,
+    timeout: float = 30
+) -> Callable[[], smtplib.SMTP]:
+    def connect() -> smtplib.SMTP:
+        connection = smtplib.SMTP(host, port, timeout=timeout)
+        if use_tls:
+            connection.starttls()
+        if username:
+            connection.login(username, password or "")
+        return connection
+
+    return connect
+
+
+class PooledSMTPConnection:
+    """A persistent SMTP session that reconnects lazily after failures"""
+
+    def __init__(self, connect: Callable[[], smtplib.SMTP]):
+        self._connect = connect
+        self._connection: Optional[smtplib.SMTP] = None
+
+    def send(self, message: EmailMessage):
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            self._connection.send_message(message)
+        except TRANSIENT_ERRORS:
+            self.reset()
+            raise
+
+    def reset(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class SMTPConnectionPool:
+    """A fixed number of persistent SMTP sessions shared by delivery workers"""
+
+    def __init__(self, connect: Callable[[], smtplib.SMTP], size: int = 4):
+        self.size = size
+        self._closed = False
+        self._connections: Queue = Queue()
+        for _ in range(size):
+            self._connections.put(PooledSMTPConnection(connect))
+
+    def acquire(self) -> PooledSMTPConnection:
+        return self._connections.get()
+
+    def release(self, connection: PooledSMTPConnection):
+        if self._closed:
+            connection.close()
+        else:
+            self._connections.put(connection)
+
+    def close(self):
+        """Close the idle connections; ones still checked out are closed when released"""
+        self._closed = True
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except Empty:
+                break
+
+
+def build_message(subject: str, content: str, recipient: str, sender: str) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = recipient
+    message.set_content(content)
+    return message
+
+
+def send_with_retries(
+    connection: PooledSMTPConnection,
+    message: EmailMessage,
+    retries: int = 3,
+    backoff_seconds: float = 0.5
+):
+    """Send one message, retrying transient failures with exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            connection.send(message)
+            return
+        except smtplib.SMTPResponseException as e:
+            # 4xx replies are temporary; 5xx replies will not succeed on retry
+            if e.smtp_code < 400 or e.smtp_code >= 500 or attempt == retries:
+                raise
+        except TRANSIENT_ERRORS:
+            if attempt == retries:
+                raise
+        time.sleep(backoff_seconds * (2 ** attempt))
+
+
+def claim_pending_recaps(db: Session, limit: int, max_attempts: int) -> List[Tuple[uuid.UUID, str, str, str]]:
+    """Claim up to ``limit`` unsent recaps and return (id, subject, content, recipient) rows"""
+    now = datetime.utcnow()
+    claimable = (
+        recaps_table.c.sent_at.is_(None),
+        recaps_table.c.delivery_attempts < max_attempts,
+        (recaps_table.c.delivery_claimed_at.is_(None)) | (recaps_table.c.delivery_claimed_at < now - CLAIM_LEASE)
+    )
+
+    candidate_ids = db.execute(
+        select(recaps_table.c.id)
+        .where(*claimable)
+        .order_by(recaps_table.c.created_at)
+        .limit(limit)
+    ).scalars().all()
+
+    if not candidate_ids:
+        return []
+
+    # The claimable conditions are re-checked inside the UPDATE, so rows
+    # claimed concurrently by another worker are left alone
+    token = uuid.uuid4().hex
+    db.execute(
+        update(recaps_table)
+        .where(recaps_table.c.id.in_(candidate_ids), *claimable)
+        .values(
+            delivery_token=token,
+            delivery_claimed_at=now,
+            delivery_attempts=recaps_table.c.delivery_attempts + 1
+        )
+    )
+    db.commit()
+
+    return db.execute(
+        select(EmailRecap.id, EmailRecap.subject, EmailRecap.content, User.email)
+        .join(Portfolio, Portfolio.id == EmailRecap.portfolio_id)
+        .join(User, User.id == Portfolio.user_id)
+        .where(EmailRecap.delivery_token == token)
+    ).all()
+
+
+def deliver_pending_recaps(
+    pool: SMTPConnectionPool,
+    sender: str,
+    batch_size: int = 500,
+    max_attempts: int = 5,
+    retries: int = 3,
+    backoff_seconds: float = 0.5,
+    max_batches: Optional[int] = None,
+    shard: Optional[str] = None
+) -> Dict[str, Any]:
+    """Send one shard's unsent recaps over the connection pool and record their real sent_at"""
+    started = time.perf_counter()
+    sent = 0
+    failed = 0
+    batches = 0
+
+    def deliver(rows) -> Tuple[List[dict], int]:
+        delivered = []
+        errors = 0
+        connection = pool.acquire()
+        try:
+            for recap_id, subject, content, recipient in rows:
+                try:
+                    send_with_retries(
+                        connection,
+                        build_message(subject, content, recipient, sender),
+                        retries=retries,
+                        backoff_seconds=backoff_seconds
+                    )
+                    delivered.append({"b_id": recap_id, "b_sent_at": datetime.utcnow()})
+                except (smtplib.SMTPException, OSError):
+                    errors += 1
+                    logger.warning("Delivery of recap %s to %s failed", recap_id, recipient, exc_info=True)
+        finally:
+            pool.release(connection)
+        return delivered, errors
+
+    db = shard_session(shard)
+    try:
+        with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="smtp-worker") as executor:
+            while max_batches is None or batches < max_batches:
+                rows = claim_pending_recaps(db, batch_size, max_attempts)
+                if not rows:
+                    break
+                batches += 1
+
+                # One slice per pooled connection, each sent over a single session
+                slices = [rows[index::pool.size] for index in range(pool.size)]
+                delivered = []
+                for batch_delivered, batch_errors in executor.map(deliver, [rows for rows in slices if rows]):
+                    delivered.extend(batch_delivered)
+                    failed += batch_errors
+
+                if delivered:
+                    db.execute(
+                        update(recaps_table)
+                        .where(recaps_table.c.id == bindparam("b_id"))
+                        .values(sent_at=bindparam("b_sent_at"), delivery_token=None),
+                        delivered
+                    )
+                    db.commit()
+                sent += len(delivered)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "sent": sent,
+        "failed": failed,
+        "batches": batches,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "messages_per_second": round(sent / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+class EmailDeliveryWorker(threading.Thread):
+    """Background thread that keeps an SMTP pool open and drains the recap queue"""
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        sender: str,
+        interval_seconds: float = 30,
+        batch_size: int = 500,
+        max_attempts: int = 5
+    ):
+        super().__init__(name="email-delivery", daemon=True)
+        self.pool = pool
+        self.sender = sender
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        # Latest run per shard
+        self.last_run: Dict[str, Dict[str, Any]] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for shard in shard_engines:
+                try:
+                    result = self.last_run[shard] = deliver_pending_recaps(
+                        self.pool,
+                        self.sender,
+                        batch_size=self.batch_size,
+                        max_attempts=self.max_attempts,
+                        shard=shard
+                    )
+                    if result["sent"] or result["failed"]:
+                        logger.info(
+                            "Sent %s recaps on shard %s (%s failed) at %s msg/s",
+                            result["sent"],
+                            shard,
+                            result["failed"],
+                            result["messages_per_second"]
+                        )
+                except Exception:
+                    logger.exception("Email delivery run failed on shard %s", shard)
+
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
+        self.pool.close()
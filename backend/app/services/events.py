@@ -0,0 +1,160 @@
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import itertools
+import json
+import threading
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+
+from ..config import settings
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """One client's bounded queue of encoded SSE frames, owned by its event loop"""
+
+    def __init__(self, portfolio_id: uuid.UUID, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.portfolio_id = portfolio_id
+        self.dropped = 0
+        self.loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def put(self, frame: Optional[str]):
+        """Queue a frame; must run on the subscription's own loop"""
+        # A slow client loses its oldest events rather than growing without bound
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(frame)
+
+    async def next_frame(self, timeout: float) -> Optional[str]:
+        """The next frame, "" when ``timeout`` passes without one, or None once the bus closes"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return ""
+
+
+class EventBus:
+    """In-process publish/subscribe of portfolio events for server-sent event streams.
+
+    Each event is JSON-encoded once and the same frame is queued for every
+    subscriber, so fan-out cost is one enqueue per connection. Connection
+    counts are capped globally and per portfolio.
+    """
+
+    def __init__(self, max_subscribers: int = 1000, max_subscribers_per_portfolio: int = 20, queue_size: int = 256):
+        self.max_subscribers = max_subscribers
+        self.max_subscribers_per_portfolio = max_subscribers_per_portfolio
+        self.queue_size = queue_size
+        self._subscribers: Dict[uuid.UUID, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._event_ids = itertools.count(1)
+        self._count = 0
+        self._published = 0
+        self._deliveries = 0
+        self._rejected = 0
+        self._dropped = 0
+        self._fanout_seconds = 0.0
+        self._max_fanout_seconds = 0.0
+
+    def subscribe(self, portfolio_id: uuid.UUID) -> Subscription:
+        """Register a stream on the running event loop; raises TooManySubscribers at capacity"""
+        subscription = Subscription(portfolio_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            subscribers = self._subscribers.setdefault(portfolio_id, set())
+            if self._count >= self.max_subscribers or len(subscribers) >= self.max_subscribers_per_portfolio:
+                self._rejected += 1
+                if not subscribers:
+                    del self._subscribers[portfolio_id]
+                raise TooManySubscribers()
+            subscribers.add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.portfolio_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.portfolio_id]
+            self._count -= 1
+            self._dropped += subscription.dropped
+
+    def publish(self, portfolio_id: uuid.UUID, event_type: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """Send an event to every stream of a portfolio and return how many received it"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(portfolio_id, ()))
+            event_id = next(self._event_ids)
+            self._published += 1
+        if not subscribers:
+            return 0
+
+        started = time.perf_counter()
+        frame = format_event(event_type, {"portfolio_id": portfolio_id, **(data or {})}, event_id)
+        self._offer(subscribers, frame)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._deliveries += len(subscribers)
+            self._fanout_seconds += elapsed
+            self._max_fanout_seconds = max(self._max_fanout_seconds, elapsed)
+        return len(subscribers)
+
+    def close(self):
+        """End every open stream, e.g. on shutdown"""
+        with self._lock:
+            subscriptions = [subscription for subscribers in self._subscribers.values() for subscription in subscribers]
+        self._offer(subscriptions, None)
+
+    @staticmethod
+    def _offer(subscriptions: List[Subscription], frame: Optional[str]):
+        # One thread-safe wakeup per event loop instead of one per subscriber
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, targets in by_loop.items():
+            loop.call_soon_threadsafe(_put_all, targets, frame)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connections": self._count,
+                "portfolios": len(self._subscribers),
+                "published": self._published,
+                "deliveries": self._deliveries,
+                "rejected": self._rejected,
+                "dropped": self._dropped + sum(
+                    subscription.dropped for subscribers in self._subscribers.values() for subscription in subscribers
+                ),
+                "fanout_us_per_delivery": round(self._fanout_seconds / self._deliveries * 1e6, 2) if self._deliveries else 0.0,
+                "max_fanout_ms": round(self._max_fanout_seconds * 1000, 3)
+            }
+
+
+def _put_all(subscriptions: List[Subscription], frame: Optional[str]):
+    for subscription in subscriptions:
+        subscription.put(frame)
+
+
+def format_event(event_type: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(jsonable_encoder(data), separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+event_bus = EventBus(
+    max_subscribers=settings.event_stream_max_connections,
+    max_subscribers_per_portfolio=settings.event_stream_max_per_portfolio,
+    queue_size=settings.event_stream_queue_size
+)
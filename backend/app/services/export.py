@@ -0,0 +1,159 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import csv
+import io
+import json
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+from ..database import shard_engines, shard_for
+from ..models.portfolio import Portfolio
+from ..models.portfolio_holding import PortfolioHolding
+from ..models.security import Security
+
+# Rows fetched from the cursor and encoded per chunk; each chunk is one write
+# to the client, so memory stays flat however large the export is
+CHUNK_ROWS = 5000
+
+EXPORT_COLUMNS = (
+    PortfolioHolding.id,
+    PortfolioHolding.portfolio_id,
+    Security.symbol,
+    func.coalesce(PortfolioHolding.name_override, Security.name).label("name"),
+    PortfolioHolding.quantity,
+    PortfolioHolding.price,
+    PortfolioHolding.market_value,
+    PortfolioHolding.weight,
+    func.coalesce(PortfolioHolding.sector_override, Security.sector).label("sector"),
+    PortfolioHolding.validated,
+    PortfolioHolding.validation_status,
+    PortfolioHolding.created_at,
+    PortfolioHolding.updated_at,
+)
+COLUMN_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+FILE_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "arrow": "arrows"}
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def holdings_query(user_id: uuid.UUID, portfolio_id: Optional[uuid.UUID] = None) -> Select:
+    statement = select(*EXPORT_COLUMNS).join(
+        Portfolio, Portfolio.id == PortfolioHolding.portfolio_id
+    ).join(
+        Security, Security.id == PortfolioHolding.security_id
+    ).where(
+        Portfolio.user_id == user_id
+    )
+    if portfolio_id is not None:
+        statement = statement.where(PortfolioHolding.portfolio_id == portfolio_id)
+    # portfolio_id is indexed, so ordering by it needs no sort of the whole result
+    return statement.order_by(PortfolioHolding.portfolio_id)
+
+
+def row_chunks(engine: Engine, statement: Select, chunk_rows: int = CHUNK_ROWS) -> Iterator[List[Sequence[Any]]]:
+    """Rows in lists of ``chunk_rows``, read through a server-side cursor where the driver has one"""
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_rows).execute(statement)
+        for partition in result.partitions():
+            yield partition
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # UUID and Decimal; Decimals as strings keep their exact value, as in the JSON API
+    return str(value)
+
+
+def encode_csv(chunks: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMN_NAMES)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def encode_ndjson(chunks: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    encode = json.JSONEncoder(default=_json_default, separators=(",", ":")).encode
+    for rows in chunks:
+        yield "".join(encode(dict(zip(COLUMN_NAMES, row))) + "\n" for row in rows).encode()
+
+
+def encode_arrow(chunks: Iterator[List[Sequence[Any]]]) -> Iterator[bytes]:
+    """Arrow IPC stream format: a schema message, then one record batch per chunk"""
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("portfolio_id", pa.string()),
+        ("symbol", pa.string()),
+        ("name", pa.string()),
+        ("quantity", pa.decimal128(18, 6)),
+        ("price", pa.decimal128(18, 2)),
+        ("market_value", pa.decimal128(18, 2)),
+        ("weight", pa.decimal128(5, 2)),
+        ("sector", pa.string()),
+        ("validated", pa.bool_()),
+        ("validation_status", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+    uuid_columns = {COLUMN_NAMES.index("id"), COLUMN_NAMES.index("portfolio_id")}
+
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    yield drain()
+    for rows in chunks:
+        columns = []
+        for index, values in enumerate(zip(*rows)):
+            if index in uuid_columns:
+                values = [str(value) for value in values]
+            columns.append(pa.array(values, type=schema.field(index).type))
+        writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+        yield drain()
+    writer.close()
+    yield drain()
+
+
+ENCODERS: Dict[str, Callable[[Iterator[List[Sequence[Any]]]], Iterator[bytes]]] = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+    "arrow": encode_arrow,
+}
+
+
+def export_holdings(
+    user_id: uuid.UUID,
+    export_format: str,
+    portfolio_id: Optional[uuid.UUID] = None,
+    chunk_rows: int = CHUNK_ROWS
+) -> Iterator[bytes]:
+    engine = shard_engines[shard_for(user_id)]
+    return ENCODERS[export_format](row_chunks(engine, holdings_query(user_id, portfolio_id), chunk_rows))
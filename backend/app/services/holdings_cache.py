@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import threading
+import uuid
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..instrumentation.metrics import HOLDINGS_CACHE_BYTES, HOLDINGS_CACHE_LOOKUPS
+from ..models.portfolio import Portfolio
+
+# Keeps IN-list parameter counts well below SQLite's bound-variable limit
+PORTFOLIO_CHUNK_SIZE = 500
+
+# Rough per-entry cost beyond the body: key, version, dict slot
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class HoldingsCache:
+    """Encoded holdings-list responses per portfolio, LRU-evicted to stay under ``max_bytes``.
+
+    An entry is only served for the portfolio version it was built from: the
+    portfolio's updated_at, which every holdings write bumps through
+    ``mark_holdings_changed``. Readers get the version from the ownership
+    check they make anyway, so a write in any worker process makes every
+    worker's entry stale without cross-process messaging.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[uuid.UUID, Tuple[Any, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, portfolio_id: uuid.UUID, version: Any) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(portfolio_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(portfolio_id)
+                self._hits += 1
+                hit = entry[1]
+            else:
+                if entry is not None:
+                    self._remove(portfolio_id)
+                self._misses += 1
+                hit = None
+        HOLDINGS_CACHE_LOOKUPS.labels("hit" if hit is not None else "miss").inc()
+        return hit
+
+    def put(self, portfolio_id: uuid.UUID, version: Any, body: bytes):
+        size = len(body) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if portfolio_id in self._entries:
+                self._remove(portfolio_id)
+            self._entries[portfolio_id] = (version, body)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            HOLDINGS_CACHE_BYTES.set(self._bytes)
+
+    def invalidate(self, portfolio_ids: Iterable[uuid.UUID]):
+        with self._lock:
+            for portfolio_id in portfolio_ids:
+                if portfolio_id in self._entries:
+                    self._remove(portfolio_id)
+            HOLDINGS_CACHE_BYTES.set(self._bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            HOLDINGS_CACHE_BYTES.set(0)
+
+    def _remove(self, portfolio_id: uuid.UUID):
+        _, body = self._entries.pop(portfolio_id)
+        self._bytes -= len(body) + ENTRY_OVERHEAD_BYTES
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions
+            }
+
+
+def mark_holdings_changed(db: Session, portfolio_ids: Iterable[uuid.UUID], now: Optional[datetime] = None):
+    """Bump updated_at on portfolios whose holdings are being written, in the writer's transaction.
+
+    Every path that inserts, updates or deletes holdings calls this before it
+    commits, so cached holdings lists for those portfolios stop matching.
+    """
+    portfolio_ids = list(portfolio_ids)
+    now = now or datetime.utcnow()
+    for start in range(0, len(portfolio_ids), PORTFOLIO_CHUNK_SIZE):
+        db.execute(
+            update(Portfolio)
+            .where(Portfolio.id.in_(portfolio_ids[start:start + PORTFOLIO_CHUNK_SIZE]))
+            .values(updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    # Only saves memory; the new version already makes these entries unusable
+    holdings_cache.invalidate(portfolio_ids)
+
+
+holdings_cache = HoldingsCache(max_bytes=settings.holdings_cache_max_bytes)
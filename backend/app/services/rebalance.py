@@ -0,0 +1,242 @@
+"""Move users onto the shard the hash ring assigns them, and keep the user directory in step.
+
+Adding or removing an entry in SHARD_URLS changes the ring, so some users
+then live on a shard that no longer owns them. Run this after changing
+SHARD_URLS and before starting workers with the new setting:
+
+    python -m app.services.rebalance status
+    python -m app.services.rebalance rebalance [--dry-run]
+    python -m app.services.rebalance repair-directory
+
+Each user moves in two transactions: their rows are copied to the new shard
+and committed, then deleted from the old one. A run that stops between the
+two leaves a complete copy on each shard; the next run removes the copy on
+the new shard and moves the user again, so runs are safe to repeat. The
+app must not be writing while a rebalance runs.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import json
+import uuid
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..database import engine, for_each_shard, init_db, shard_engines, shard_for, shard_ring, shard_session
+from ..models.email_recap import EmailRecap
+from ..models.holding_snapshot import HoldingSnapshot
+from ..models.portfolio import Portfolio
+from ..models.portfolio_holding import PortfolioHolding
+from ..models.security import Security
+from ..models.user import User
+from ..models.user_directory import UserDirectory
+from .securities import security_registry
+
+# Rows per executemany when copying a user's data
+COPY_CHUNK_ROWS = 5000
+
+# Keeps IN-list parameter counts well below SQLite's bound-variable limit
+PORTFOLIO_CHUNK_SIZE = 500
+
+users_table = User.__table__
+portfolios_table = Portfolio.__table__
+holdings_table = PortfolioHolding.__table__
+recaps_table = EmailRecap.__table__
+snapshots_table = HoldingSnapshot.__table__
+directory_table = UserDirectory.__table__
+securities_table = Security.__table__
+
+
+def misplaced_users(db: Session, shard: str) -> List[uuid.UUID]:
+    """Ids of the users on ``shard`` that the ring assigns elsewhere"""
+    return [user_id for user_id in db.scalars(select(users_table.c.id)) if shard_for(user_id) != shard]
+
+
+def _chunks(values: List[Any], size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _insert(db: Session, table, rows: List[Dict[str, Any]]):
+    for chunk in _chunks(rows, COPY_CHUNK_ROWS):
+        db.execute(insert(table), chunk)
+
+
+def _rows(db: Session, statement) -> List[Dict[str, Any]]:
+    return [dict(row) for row in db.execute(statement).mappings()]
+
+
+def delete_user_data(db: Session, user_id: uuid.UUID):
+    """Delete a user and everything they own from the session's shard; the caller commits"""
+    portfolio_ids = list(db.scalars(select(portfolios_table.c.id).where(portfolios_table.c.user_id == user_id)))
+    for chunk in _chunks(portfolio_ids, PORTFOLIO_CHUNK_SIZE):
+        for table in (holdings_table, recaps_table, snapshots_table):
+            db.execute(delete(table).where(table.c.portfolio_id.in_(chunk)))
+    db.execute(delete(portfolios_table).where(portfolios_table.c.user_id == user_id))
+    db.execute(delete(users_table).where(users_table.c.id == user_id))
+
+
+def copy_user_data(source: Session, target: Session, user_id: uuid.UUID) -> Dict[str, int]:
+    """Copy a user and everything they own from one shard to another; the caller commits ``target``.
+
+    Security ids are numbered per shard, so holdings are re-pointed at the
+    target's securities by symbol, creating any it lacks. The symbol
+    master's name and sector come along where the target has none.
+    """
+    counts = {}
+    _insert(target, users_table, _rows(source, select(users_table).where(users_table.c.id == user_id)))
+    counts["users"] = 1
+
+    portfolios = _rows(source, select(portfolios_table).where(portfolios_table.c.user_id == user_id))
+    _insert(target, portfolios_table, portfolios)
+    counts["portfolios"] = len(portfolios)
+    portfolio_ids = [portfolio["id"] for portfolio in portfolios]
+
+    holdings = []
+    symbols = []
+    listings: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for chunk in _chunks(portfolio_ids, PORTFOLIO_CHUNK_SIZE):
+        for row in _rows(source, select(
+            holdings_table,
+            securities_table.c.symbol,
+            securities_table.c.name.label("security_name"),
+            securities_table.c.sector.label("security_sector")
+        ).join(
+            securities_table, securities_table.c.id == holdings_table.c.security_id
+        ).where(
+            holdings_table.c.portfolio_id.in_(chunk)
+        )):
+            symbols.append(row.pop("symbol"))
+            listings[symbols[-1]] = (row.pop("security_name"), row.pop("security_sector"))
+            holdings.append(row)
+    security_ids = security_registry.intern(target, symbols)
+    for holding, symbol in zip(holdings, symbols):
+        holding["security_id"] = security_ids[symbol]
+    _insert(target, holdings_table, holdings)
+    listed = [
+        {"b_id": security_ids[symbol], "b_name": name, "b_sector": sector}
+        for symbol, (name, sector) in listings.items() if name or sector
+    ]
+    for chunk in _chunks(listed, COPY_CHUNK_ROWS):
+        target.execute(
+            update(securities_table)
+            .where(securities_table.c.id == bindparam("b_id"))
+            .values(
+                name=func.coalesce(securities_table.c.name, bindparam("b_name")),
+                sector=func.coalesce(securities_table.c.sector, bindparam("b_sector"))
+            ),
+            chunk
+        )
+    counts["holdings"] = len(holdings)
+
+    for name, table in (("email_recaps", recaps_table), ("holding_snapshots", snapshots_table)):
+        copied = 0
+        for chunk in _chunks(portfolio_ids, PORTFOLIO_CHUNK_SIZE):
+            rows = _rows(source, select(table).where(table.c.portfolio_id.in_(chunk)))
+            _insert(target, table, rows)
+            copied += len(rows)
+        counts[name] = copied
+    return counts
+
+
+def move_user(user_id: uuid.UUID, source_shard: str, target_shard: str) -> Dict[str, int]:
+    source = shard_session(source_shard)
+    target = shard_session(target_shard)
+    try:
+        # Left behind by a run that stopped after copying but before deleting
+        delete_user_data(target, user_id)
+        counts = copy_user_data(source, target, user_id)
+        target.commit()
+        delete_user_data(source, user_id)
+        source.commit()
+        return counts
+    finally:
+        source.close()
+        target.close()
+
+
+def rebalance(dry_run: bool = False) -> Dict[str, Any]:
+    """Move every misplaced user to the shard the ring assigns them"""
+    moves: List[Tuple[uuid.UUID, str, str]] = [
+        (user_id, shard, shard_for(user_id))
+        for shard, user_ids in for_each_shard(lambda db: misplaced_users(db, db.info["shard"])).items()
+        for user_id in user_ids
+    ]
+    moved: Dict[str, int] = {}
+    if not dry_run:
+        for user_id, source_shard, target_shard in moves:
+            for name, count in move_user(user_id, source_shard, target_shard).items():
+                moved[name] = moved.get(name, 0) + count
+
+    paths: Dict[str, int] = {}
+    for _, source_shard, target_shard in moves:
+        path = f"{source_shard}->{target_shard}"
+        paths[path] = paths.get(path, 0) + 1
+    return {"users": len(moves), "paths": paths, "moved": moved, "dry_run": dry_run}
+
+
+def repair_directory() -> Dict[str, int]:
+    """Make user_directory match the users on the shards.
+
+    Registration writes the directory entry and the user in different
+    databases, so a failure between the two commits can leave one without
+    the other. Users missing an entry get one, entries pointing at a
+    different id are corrected, and entries with no user are removed.
+    """
+    users: Dict[str, uuid.UUID] = {}
+    for shard_users in for_each_shard(
+        lambda db: db.execute(select(users_table.c.email, users_table.c.id)).all()
+    ).values():
+        users.update(shard_users)
+
+    with engine.begin() as connection:
+        entries = dict(connection.execute(select(directory_table.c.email, directory_table.c.user_id)).all())
+        missing = [{"email": email, "user_id": user_id} for email, user_id in users.items() if email not in entries]
+        stale = [email for email, user_id in entries.items() if users.get(email, user_id) != user_id]
+        orphaned = [email for email in entries if email not in users]
+        for chunk in _chunks(stale + orphaned, PORTFOLIO_CHUNK_SIZE):
+            connection.execute(delete(directory_table).where(directory_table.c.email.in_(chunk)))
+        for chunk in _chunks(missing + [{"email": email, "user_id": users[email]} for email in stale], COPY_CHUNK_ROWS):
+            connection.execute(insert(directory_table), chunk)
+    return {"added": len(missing), "corrected": len(stale), "removed": len(orphaned)}
+
+
+def shard_stats() -> Dict[str, Any]:
+    """Per-shard row counts and misplaced users, with each shard's share of the ring"""
+    def count(db: Session) -> Dict[str, Any]:
+        return {
+            "users": db.scalar(select(func.count()).select_from(users_table)),
+            "portfolios": db.scalar(select(func.count()).select_from(portfolios_table)),
+            "holdings": db.scalar(select(func.count()).select_from(holdings_table)),
+            "misplaced_users": len(misplaced_users(db, db.info["shard"]))
+        }
+
+    shares = shard_ring.shares()
+    shards = for_each_shard(count)
+    for shard, stats in shards.items():
+        stats["ring_share"] = shares[shard]
+        stats["url"] = shard_engines[shard].url.render_as_string(hide_password=True)
+    with engine.connect() as connection:
+        directory_entries = connection.scalar(select(func.count()).select_from(directory_table))
+    return {"shards": shards, "vnodes": shard_ring.vnodes, "directory_entries": directory_entries}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.services.rebalance", description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["status", "rebalance", "repair-directory"], nargs="?", default="status")
+    parser.add_argument("--dry-run", action="store_true", help="List the moves without making them")
+    args = parser.parse_args(argv)
+
+    # A newly added shard starts out empty
+    init_db()
+    if args.command == "rebalance":
+        result = rebalance(dry_run=args.dry_run)
+    elif args.command == "repair-directory":
+        result = repair_directory()
+    else:
+        result = shard_stats()
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+import uuid
+
+from sqlalchemy import and_, bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..database import shard_engines, shard_session
+from ..models.email_recap import EmailRecap
+from ..models.portfolio import Portfolio
+from ..models.types import uuid7
+from .recaps import latest_recap_fingerprints, portfolio_fingerprints, render_recap
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_INTERVALS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+    "monthly": timedelta(days=30),
+}
+
+# How long a portfolio whose recap failed waits before it is retried
+RETRY_DELAY = timedelta(minutes=15)
+
+# Selections a scheduler re-reads after losing every row of a batch to another one
+CLAIM_ATTEMPTS = 5
+
+portfolios_table = Portfolio.__table__
+
+
+def initial_recap_at(email_frequency: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """First scheduled recap time for a portfolio, or None if it is not subscribed"""
+    interval = FREQUENCY_INTERVALS.get(email_frequency or "")
+    if interval is None:
+        return None
+    return (now or datetime.utcnow()) + interval
+
+
+def next_recap_after(email_frequency: str, scheduled_at: datetime, now: datetime) -> datetime:
+    # Keep the original time of day, but never schedule into the past after downtime
+    interval = FREQUENCY_INTERVALS[email_frequency]
+    next_at = scheduled_at + interval
+    if next_at <= now:
+        next_at = now + interval
+    return next_at
+
+
+def recap_backlog(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    now = now or datetime.utcnow()
+    due, oldest = db.execute(
+        select(func.count(portfolios_table.c.id), func.min(portfolios_table.c.next_recap_at))
+        .where(portfolios_table.c.next_recap_at <= now)
+    ).one()
+
+    return {
+        "due": due,
+        "oldest_due_at": oldest,
+        "lag_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0.0
+    }
+
+
+def schedule_unscheduled(db: Session, now: datetime) -> int:
+    """Give subscribed portfolios without a schedule an immediate first slot"""
+    result = db.execute(
+        update(portfolios_table)
+        .where(
+            portfolios_table.c.next_recap_at.is_(None),
+            portfolios_table.c.email_frequency.in_(list(FREQUENCY_INTERVALS))
+        )
+        .values(next_recap_at=now, updated_at=portfolios_table.c.updated_at)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def claim_due_portfolios(db: Session, now: datetime, limit: int) -> List[uuid.UUID]:
+    """Atomically advance the schedule of up to ``limit`` due portfolios and return their ids.
+
+    Each row is claimed with a compare-and-set on its current next_recap_at, so
+    concurrent schedulers never claim the same slot twice. An empty list means
+    nothing is due.
+    """
+    for _ in range(CLAIM_ATTEMPTS):
+        due = db.execute(
+            select(
+                portfolios_table.c.id,
+                portfolios_table.c.email_frequency,
+                portfolios_table.c.next_recap_at
+            )
+            .where(
+                portfolios_table.c.next_recap_at <= now,
+                portfolios_table.c.email_frequency.in_(list(FREQUENCY_INTERVALS))
+            )
+            .order_by(portfolios_table.c.next_recap_at)
+            .limit(limit)
+        ).all()
+
+        if not due:
+            return []
+
+        token = uuid.uuid4().hex
+        db.execute(
+            update(portfolios_table)
+            .where(and_(
+                portfolios_table.c.id == bindparam("b_id"),
+                portfolios_table.c.next_recap_at == bindparam("b_scheduled_at")
+            ))
+            .values(
+                next_recap_at=bindparam("b_next_at"),
+                recap_claim_token=token,
+                updated_at=portfolios_table.c.updated_at
+            ),
+            [
+                {
+                    "b_id": portfolio_id,
+                    "b_scheduled_at": scheduled_at,
+                    "b_next_at": next_recap_after(frequency, scheduled_at, now)
+                }
+                for portfolio_id, frequency, scheduled_at in due
+            ]
+        )
+        db.commit()
+
+        claimed = list(db.execute(
+            select(portfolios_table.c.id).where(
+                portfolios_table.c.id.in_([row.id for row in due]),
+                portfolios_table.c.recap_claim_token == token
+            )
+        ).scalars())
+
+        # Another scheduler took this whole batch first; look again
+        if claimed:
+            return claimed
+
+    return []
+
+
+def generate_recaps(portfolio_ids: List[uuid.UUID], shard: Optional[str] = None) -> Tuple[int, int]:
+    """Generate and store recaps for already-claimed portfolios on one shard.
+
+    Returns (generated, skipped); portfolios whose fingerprint matches their
+    latest recap are skipped.
+    """
+    db = shard_session(shard)
+    try:
+        portfolios = db.query(Portfolio).filter(Portfolio.id.in_(portfolio_ids)).all()
+        fingerprints = portfolio_fingerprints(db, portfolios)
+        previous = latest_recap_fingerprints(db, list(fingerprints))
+        now = datetime.utcnow()
+        recaps = []
+        for portfolio in portfolios:
+            fingerprint = fingerprints[portfolio.id]
+            if previous.get(portfolio.id) == fingerprint:
+                continue
+            subject, content = render_recap(portfolio)
+            recaps.append({
+                "id": uuid7(),
+                "subject": subject,
+                "content": content,
+                "fingerprint": fingerprint,
+                "portfolio_id": portfolio.id,
+                "created_at": now
+            })
+        if recaps:
+            db.execute(insert(EmailRecap), recaps)
+        db.commit()
+        return len(recaps), len(portfolios) - len(recaps)
+    except Exception:
+        db.rollback()
+        # Put the claimed portfolios back in the queue after a short delay
+        db.execute(
+            update(portfolios_table)
+            .where(portfolios_table.c.id.in_(portfolio_ids))
+            .values(next_recap_at=datetime.utcnow() + RETRY_DELAY, updated_at=portfolios_table.c.updated_at)
+        )
+        db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def run_due_recaps(
+    batch_size: int = 1000,
+    max_workers: int = 4,
+    time_budget_seconds: Optional[float] = None,
+    now: Optional[datetime] = None,
+    shard: Optional[str] = None
+) -> Dict[str, Any]:
+    """Generate recaps for every due portfolio on one shard, within an optional time budget"""
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    generated = 0
+    skipped = 0
+    failed = 0
+    batches = 0
+
+    db = shard_session(shard)
+    try:
+        schedule_unscheduled(db, now)
+        lag_before = recap_backlog(db, now)["lag_seconds"]
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="recap-worker") as executor:
+            while time_budget_seconds is None or time.perf_counter() - started < time_budget_seconds:
+                claimed = claim_due_portfolios(db, now, batch_size * max_workers)
+                if not claimed:
+                    break
+                batches += 1
+
+                chunk_size = max(1, -(-len(claimed) // max_workers))
+                futures = [
+                    executor.submit(generate_recaps, claimed[start:start + chunk_size], shard)
+                    for start in range(0, len(claimed), chunk_size)
+                ]
+                for future, start in zip(futures, range(0, len(claimed), chunk_size)):
+                    try:
+                        batch_generated, batch_skipped = future.result()
+                        generated += batch_generated
+                        skipped += batch_skipped
+                    except Exception:
+                        failed += len(claimed[start:start + chunk_size])
+                        logger.exception("Recap generation failed for a batch")
+
+        backlog = recap_backlog(db, now)
+    finally:
+        db.close()
+
+    return {
+        "generated": generated,
+        "skipped": skipped,
+        "failed": failed,
+        "batches": batches,
+        "backlog": backlog["due"],
+        "lag_seconds": lag_before,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+class RecapScheduler(threading.Thread):
+    """Background thread that periodically generates recaps for due portfolios"""
+
+    def __init__(
+        self,
+        interval_seconds: float = 60,
+        batch_size: int = 1000,
+        max_workers: int = 4,
+        time_budget_seconds: Optional[float] = None
+    ):
+        super().__init__(name="recap-scheduler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.time_budget_seconds = time_budget_seconds
+        # Latest run per shard
+        self.last_run: Dict[str, Dict[str, Any]] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for shard in shard_engines:
+                try:
+                    result = self.last_run[shard] = run_due_recaps(
+                        batch_size=self.batch_size,
+                        max_workers=self.max_workers,
+                        time_budget_seconds=self.time_budget_seconds,
+                        shard=shard
+                    )
+                    if result["generated"] or result["backlog"]:
+                        logger.info(
+                            "Generated %s recaps on shard %s (%s unchanged, %s failed), backlog %s, lag %ss",
+                            result["generated"],
+                            shard,
+                            result["skipped"],
+                            result["failed"],
+                            result["backlog"],
+                            result["lag_seconds"]
+                        )
+                except Exception:
+                    logger.exception("Recap scheduler run failed on shard %s", shard)
+
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
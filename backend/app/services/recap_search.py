@@ -0,0 +1,195 @@
+from typing import Any, Dict, List, Optional
+import html
+import re
+import uuid
+
+from sqlalchemy import Float, String, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models.email_recap import EmailRecap
+
+# The FTS5 index reads recap text through a view, so bodies stay compressed in
+# email_recaps. Search rows are keyed by an INTEGER PRIMARY KEY mapping table
+# because email_recaps' implicit rowid may change on VACUUM.
+#
+# The view and triggers call scout_inflate() and scout_key_token(), which
+# create_database_engine registers on every connection the app opens. Any
+# other connection (the sqlite3 shell, a script with its own engine) must
+# register them too before it writes to email_recaps, or the triggers fail
+# with "no such function".
+SEARCH_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS email_recaps_search_keys (
+        search_rowid INTEGER PRIMARY KEY,
+        recap_id NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS email_recaps_search_content AS
+    SELECT
+        k.search_rowid AS search_rowid,
+        scout_key_token(p.user_id) AS owner,
+        scout_key_token(r.portfolio_id) AS portfolio,
+        r.subject AS subject,
+        scout_inflate(r.content) AS content
+    FROM email_recaps_search_keys k
+    JOIN email_recaps r ON r.id = k.recap_id
+    JOIN portfolios p ON p.id = r.portfolio_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS email_recaps_fts USING fts5(
+        owner, portfolio, subject, content,
+        content='email_recaps_search_content',
+        content_rowid='search_rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS email_recaps_search_insert AFTER INSERT ON email_recaps BEGIN
+        INSERT INTO email_recaps_search_keys (recap_id) VALUES (new.id);
+        INSERT INTO email_recaps_fts (rowid, owner, portfolio, subject, content)
+        SELECT
+            k.search_rowid,
+            (SELECT scout_key_token(user_id) FROM portfolios WHERE id = new.portfolio_id),
+            scout_key_token(new.portfolio_id),
+            new.subject,
+            scout_inflate(new.content)
+        FROM email_recaps_search_keys k WHERE k.recap_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS email_recaps_search_delete AFTER DELETE ON email_recaps BEGIN
+        INSERT INTO email_recaps_fts (email_recaps_fts, rowid, owner, portfolio, subject, content)
+        SELECT
+            'delete',
+            k.search_rowid,
+            (SELECT scout_key_token(user_id) FROM portfolios WHERE id = old.portfolio_id),
+            scout_key_token(old.portfolio_id),
+            old.subject,
+            scout_inflate(old.content)
+        FROM email_recaps_search_keys k WHERE k.recap_id = old.id;
+        DELETE FROM email_recaps_search_keys WHERE recap_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS email_recaps_search_update AFTER UPDATE OF subject, content ON email_recaps BEGIN
+        INSERT INTO email_recaps_fts (email_recaps_fts, rowid, owner, portfolio, subject, content)
+        SELECT
+            'delete',
+            k.search_rowid,
+            (SELECT scout_key_token(user_id) FROM portfolios WHERE id = old.portfolio_id),
+            scout_key_token(old.portfolio_id),
+            old.subject,
+            scout_inflate(old.content)
+        FROM email_recaps_search_keys k WHERE k.recap_id = old.id;
+        INSERT INTO email_recaps_fts (rowid, owner, portfolio, subject, content)
+        SELECT
+            k.search_rowid,
+            (SELECT scout_key_token(user_id) FROM portfolios WHERE id = new.portfolio_id),
+            scout_key_token(new.portfolio_id),
+            new.subject,
+            scout_inflate(new.content)
+        FROM email_recaps_search_keys k WHERE k.recap_id = new.id;
+    END
+    """,
+]
+
+SEARCH_QUERY = text("""
+    SELECT
+        r.id,
+        r.portfolio_id,
+        r.subject,
+        r.created_at,
+        snippet(email_recaps_fts, 3, :mark_open, :mark_close, '...', :snippet_tokens) AS snippet,
+        bm25(email_recaps_fts, 0.0, 0.0, 2.0, 1.0) AS score
+    FROM email_recaps_fts
+    JOIN email_recaps_search_keys k ON k.search_rowid = email_recaps_fts.rowid
+    JOIN email_recaps r ON r.id = k.recap_id
+    WHERE email_recaps_fts MATCH :match
+    ORDER BY score
+    LIMIT :limit
+""").columns(
+    id=EmailRecap.__table__.c.id.type,
+    portfolio_id=EmailRecap.__table__.c.portfolio_id.type,
+    subject=String,
+    created_at=EmailRecap.__table__.c.created_at.type,
+    snippet=String,
+    score=Float
+)
+
+SNIPPET_TOKENS = 16
+
+# Control characters never appear in recap text, so the match markers survive
+# escaping and are swapped for <mark> tags afterwards
+MARK_OPEN = "\x02"
+MARK_CLOSE = "\x03"
+
+
+def render_snippet(snippet: Optional[str]) -> str:
+    """HTML-escape a snippet's recap text and wrap its matches in <mark>"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(MARK_OPEN, "<mark>").replace(MARK_CLOSE, "</mark>")
+
+
+def search_supported(engine: Engine) -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+def install_recap_search(engine: Engine) -> int:
+    """Create the FTS5 index and sync triggers, indexing any recaps not yet covered"""
+    if not search_supported(engine):
+        return 0
+
+    with engine.begin() as connection:
+        for statement in SEARCH_SCHEMA:
+            connection.exec_driver_sql(statement)
+
+        backfilled = connection.exec_driver_sql("""
+            INSERT INTO email_recaps_search_keys (recap_id)
+            SELECT id FROM email_recaps
+            WHERE id NOT IN (SELECT recap_id FROM email_recaps_search_keys)
+        """).rowcount
+
+        if backfilled:
+            connection.exec_driver_sql("INSERT INTO email_recaps_fts (email_recaps_fts) VALUES ('rebuild')")
+
+    return backfilled
+
+
+def build_match_expression(query: str, user_id: uuid.UUID, portfolio_id: Optional[uuid.UUID] = None) -> Optional[str]:
+    # Terms are quoted so user input can never be parsed as FTS5 syntax
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+
+    expression = f'owner : "{user_id.hex}"'
+    if portfolio_id:
+        expression += f' AND portfolio : "{portfolio_id.hex}"'
+    return expression + " AND {subject content} : (" + " AND ".join(f'"{term}"' for term in terms) + ")"
+
+
+def search_recaps(
+    db: Session,
+    user_id: uuid.UUID,
+    query: str,
+    portfolio_id: Optional[uuid.UUID] = None,
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """Ranked recap matches within the user's portfolios, best first"""
+    match = build_match_expression(query, user_id, portfolio_id)
+    if match is None:
+        return []
+
+    rows = db.execute(
+        SEARCH_QUERY,
+        {
+            "match": match,
+            "limit": limit,
+            "snippet_tokens": SNIPPET_TOKENS,
+            "mark_open": MARK_OPEN,
+            "mark_close": MARK_CLOSE
+        }
+    ).mappings().all()
+
+    # bm25() scores are negative with the best match lowest; flip them for callers
+    return [{**row, "snippet": render_snippet(row["snippet"]), "score": -row["score"]} for row in rows]
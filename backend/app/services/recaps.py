@@ -0,0 +1,145 @@
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+from ..models.portfolio import Portfolio
+from ..models.portfolio_holding import PortfolioHolding
+from ..models.security import Security
+from ..models.email_recap import EmailRecap
+
+# Bump whenever the templates change so unchanged portfolios still get the new layout
+TEMPLATE_VERSION = "1"
+
+FINGERPRINT_CHUNK_SIZE = 500
+
+
+class CompiledTemplate:
+    """A str.format-style template parsed once into literal and field parts"""
+
+    def __init__(self, source: str):
+        self.parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(source)
+        ]
+
+    def render(self, **values) -> str:
+        return "".join(
+            literal + (str(values[field]) if field is not None else "")
+            for literal, field in self.parts
+        )
+
+
+SUBJECT_TEMPLATE = CompiledTemplate("Portfolio Recap: {name}")
+CONTENT_TEMPLATE = CompiledTemplate("""Portfolio Recap for {name}
+
+    This is an automated recap of your portfolio performance.
+
+    Portfolio Details:
+    - Name: {name}
+    - Description: {description}
+
+    Generated automatically by Scout Portfolio Tracker.""")
+
+
+def render_recap(portfolio: Portfolio) -> Tuple[str, str]:
+    """Return the (subject, content) of a recap for a portfolio.
+
+    The body is a fixed template filled with the portfolio's name and
+    description; it does not summarize holdings or performance.
+    """
+    values = {
+        "name": portfolio.name,
+        "description": portfolio.description or "No description provided"
+    }
+    return SUBJECT_TEMPLATE.render(**values), CONTENT_TEMPLATE.render(**values)
+
+
+def portfolio_fingerprints(db: Session, portfolios: Iterable[Portfolio]) -> Dict[uuid.UUID, str]:
+    """Hash each portfolio's recap settings and holdings, reading holdings in one query per chunk"""
+    portfolios = list(portfolios)
+    digests = {}
+
+    for portfolio in portfolios:
+        digest = hashlib.sha256()
+        for value in (
+            TEMPLATE_VERSION,
+            portfolio.name,
+            portfolio.description,
+            portfolio.email_frequency,
+            portfolio.email_instructions
+        ):
+            digest.update(repr(value).encode("utf-8"))
+        digests[portfolio.id] = digest
+
+    holdings: Dict[uuid.UUID, list] = {portfolio.id: [] for portfolio in portfolios}
+    portfolio_ids = list(holdings)
+    for start in range(0, len(portfolio_ids), FINGERPRINT_CHUNK_SIZE):
+        rows = db.execute(
+            select(
+                PortfolioHolding.portfolio_id,
+                Security.symbol,
+                func.coalesce(PortfolioHolding.name_override, Security.name),
+                PortfolioHolding.quantity,
+                PortfolioHolding.price,
+                PortfolioHolding.market_value,
+                PortfolioHolding.weight,
+                func.coalesce(PortfolioHolding.sector_override, Security.sector)
+            ).join(
+                Security, Security.id == PortfolioHolding.security_id
+            ).where(PortfolioHolding.portfolio_id.in_(portfolio_ids[start:start + FINGERPRINT_CHUNK_SIZE]))
+        ).all()
+        for portfolio_id, *values in rows:
+            holdings[portfolio_id].append(repr(values))
+
+    for portfolio_id, rows in holdings.items():
+        # Row order from the database is not stable across re-imports
+        for row in sorted(rows):
+            digests[portfolio_id].update(row.encode("utf-8"))
+
+    return {portfolio_id: digest.hexdigest() for portfolio_id, digest in digests.items()}
+
+
+def latest_recap_fingerprints(db: Session, portfolio_ids: List[uuid.UUID]) -> Dict[uuid.UUID, str]:
+    newer = aliased(EmailRecap)
+    latest_created = (
+        select(func.max(newer.created_at))
+        .where(newer.portfolio_id == EmailRecap.portfolio_id)
+        .scalar_subquery()
+    )
+
+    fingerprints = {}
+    for start in range(0, len(portfolio_ids), FINGERPRINT_CHUNK_SIZE):
+        fingerprints.update(db.execute(
+            select(EmailRecap.portfolio_id, EmailRecap.fingerprint).where(
+                EmailRecap.portfolio_id.in_(portfolio_ids[start:start + FINGERPRINT_CHUNK_SIZE]),
+                EmailRecap.created_at == latest_created
+            )
+        ).all())
+    return fingerprints
+
+
+def build_recap(portfolio: Portfolio, fingerprint: Optional[str] = None) -> EmailRecap:
+    subject, content = render_recap(portfolio)
+    return EmailRecap(
+        subject=subject,
+        content=content,
+        fingerprint=fingerprint,
+        portfolio_id=portfolio.id
+    )
+
+
+def get_or_build_recap(db: Session, portfolio: Portfolio) -> Tuple[EmailRecap, bool]:
+    """Return (recap, created): the latest recap if nothing changed since it, else a new unsaved one"""
+    fingerprint = portfolio_fingerprints(db, [portfolio])[portfolio.id]
+
+    latest_recap = db.query(EmailRecap).filter(
+        EmailRecap.portfolio_id == portfolio.id
+    ).order_by(EmailRecap.created_at.desc()).first()
+
+    if latest_recap and latest_recap.fingerprint == fingerprint:
+        return latest_recap, False
+
+    return build_recap(portfolio, fingerprint), True
@@ -0,0 +1,149 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Set
+import time
+import uuid
+
+from sqlalchemy import BigInteger, bindparam, case, func, select, type_coerce, update
+from sqlalchemy.orm import Session
+
+from ..models.portfolio_holding import PortfolioHolding
+from .holdings_cache import mark_holdings_changed
+from .securities import security_registry
+
+# Keeps IN-list parameter counts well below SQLite's bound-variable limit
+SYMBOL_CHUNK_SIZE = 500
+PORTFOLIO_CHUNK_SIZE = 500
+
+holdings_table = PortfolioHolding.__table__
+
+QUANTITY_TYPE = holdings_table.c.quantity.type
+PRICE_TYPE = holdings_table.c.price.type
+MARKET_VALUE_TYPE = holdings_table.c.market_value.type
+
+# quantity units x price units -> market value units. The product is a BIGINT,
+# which bounds a single holding's market value at about 92 billion
+MARKET_VALUE_DIVISOR = 10 ** (QUANTITY_TYPE.scale + PRICE_TYPE.scale - MARKET_VALUE_TYPE.scale)
+
+
+def _units(column):
+    # The stored integer, so arithmetic on it is integer arithmetic
+    return type_coerce(column, BigInteger)
+
+
+def _divide_rounded(numerator, divisor: int):
+    # Integer division rounding half away from zero; // truncates toward zero
+    # on both SQLite and PostgreSQL, so the half-divisor is added with the sign
+    half = divisor // 2
+    return case(
+        (numerator < 0, (numerator - half) // divisor),
+        else_=(numerator + half) // divisor
+    )
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _normalize_prices(prices: Dict[str, Decimal]) -> Dict[str, Decimal]:
+    normalized = {}
+    for symbol, price in prices.items():
+        if symbol and str(symbol).strip() and price is not None:
+            normalized[str(symbol).upper().strip()] = Decimal(str(price))
+    return normalized
+
+
+def recompute_weights(db: Session, portfolio_ids: Iterable[uuid.UUID]) -> int:
+    """Recompute holding weights (percent of portfolio market value) for the given portfolios.
+
+    Portfolios whose total market value is zero or unknown get NULL weights.
+    """
+    portfolio_ids = list(portfolio_ids)
+    totals = []
+    # No market value to weigh against; weights from before would be stale
+    unweighable = []
+
+    for chunk in _chunks(portfolio_ids, PORTFOLIO_CHUNK_SIZE):
+        rows = db.execute(
+            select(holdings_table.c.portfolio_id, func.sum(_units(holdings_table.c.market_value)))
+            .where(holdings_table.c.portfolio_id.in_(chunk))
+            .group_by(holdings_table.c.portfolio_id)
+        ).all()
+        for portfolio_id, total in rows:
+            if total:
+                totals.append({"b_portfolio_id": portfolio_id, "b_total": int(total)})
+            else:
+                unweighable.append(portfolio_id)
+
+    for chunk in _chunks(unweighable, PORTFOLIO_CHUNK_SIZE):
+        db.execute(
+            update(holdings_table)
+            .where(holdings_table.c.portfolio_id.in_(chunk))
+            .values(weight=None)
+        )
+
+    if totals:
+        # One statement, executed once per portfolio with its precomputed total
+        db.execute(
+            update(holdings_table)
+            .where(holdings_table.c.portfolio_id == bindparam("b_portfolio_id"))
+            .values(weight=_units(holdings_table.c.market_value) * 100 / bindparam("b_total", type_=BigInteger)),
+            totals
+        )
+
+    return len(totals) + len(unweighable)
+
+
+def revalue_holdings(db: Session, prices: Dict[str, Decimal]) -> Dict[str, float]:
+    """Apply a batch of {symbol: price} quotes to every holding of those symbols.
+
+    Symbols resolve to security ids through the intern cache, so prices and
+    market values are rewritten with set-based UPDATEs driven by the integer
+    security_id index, then weights are recomputed for each affected portfolio.
+    Quotes for symbols nobody holds are skipped.
+    """
+    started = time.perf_counter()
+    prices = _normalize_prices(prices)
+    symbols = list(prices)
+    security_ids = security_registry.ids(db, symbols)
+    now = datetime.utcnow()
+
+    holdings_updated = 0
+    affected_portfolios: Set[uuid.UUID] = set()
+
+    for chunk in _chunks(list(security_ids), SYMBOL_CHUNK_SIZE):
+        # One set-based UPDATE per security, executed as a single executemany;
+        # prices bind as integer units so the market value is integer math
+        price_units = bindparam("b_price", type_=BigInteger)
+        result = db.execute(
+            update(holdings_table)
+            .where(holdings_table.c.security_id == bindparam("b_security_id"))
+            .values(
+                price=price_units,
+                market_value=_divide_rounded(_units(holdings_table.c.quantity) * price_units, MARKET_VALUE_DIVISOR),
+                updated_at=now
+            ),
+            [
+                {"b_security_id": security_ids[symbol], "b_price": PRICE_TYPE.to_units(prices[symbol])}
+                for symbol in chunk
+            ]
+        )
+        holdings_updated += result.rowcount
+
+        affected_portfolios.update(db.execute(
+            select(holdings_table.c.portfolio_id)
+            .where(holdings_table.c.security_id.in_([security_ids[symbol] for symbol in chunk]))
+            .distinct()
+        ).scalars())
+
+    portfolios_reweighted = recompute_weights(db, affected_portfolios)
+    mark_holdings_changed(db, affected_portfolios, now)
+    db.commit()
+
+    return {
+        "symbols": len(symbols),
+        "holdings_updated": holdings_updated,
+        "portfolios_reweighted": portfolios_reweighted,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+import threading
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.security import Security
+
+# Keeps IN-list parameter counts well below SQLite's bound-variable limit
+SYMBOL_CHUNK_SIZE = 500
+
+securities_table = Security.__table__
+
+
+def normalize_symbol(symbol: Any) -> str:
+    return str(symbol).upper().strip()
+
+
+def _insert_missing(db: Session):
+    # Another worker may add the same symbol between our read and our insert
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(securities_table).on_conflict_do_nothing(index_elements=["symbol"])
+    if dialect == "sqlite":
+        return sqlite.insert(securities_table).on_conflict_do_nothing(index_elements=["symbol"])
+    return insert(securities_table)
+
+
+class SecurityRegistry:
+    """Symbol to securities.id, interned in process memory for the ``max_entries`` most recent symbols.
+
+    Each shard numbers its securities independently, so entries are kept
+    per database.
+
+    ``intern`` resolves a whole import in a few IN-list queries and only
+    touches the database for symbols it has not seen; a warm import resolves
+    every row from memory. Securities created in a transaction are only
+    cached once it commits, so a rolled-back import cannot leave ids behind
+    that do not exist.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Engine, str], int]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def intern(self, db: Session, symbols: Iterable[Any]) -> Dict[str, int]:
+        """Securities ids for the symbols, keyed by normalized symbol, creating missing ones.
+
+        New securities start without a name or sector. Only the symbol master
+        fills those in (see validate_pending_holdings); a user's name or
+        sector stays on their own holding.
+        """
+        wanted = list(dict.fromkeys(normalize_symbol(symbol) for symbol in symbols))
+        security_ids = self._lookup(db, wanted)
+
+        missing = [symbol for symbol in wanted if symbol not in security_ids]
+        if missing:
+            created = dict(db.execute(
+                _insert_missing(db).returning(securities_table.c.symbol, securities_table.c.id),
+                [{"symbol": symbol} for symbol in missing]
+            ).all())
+            # Symbols another worker inserted first return no row here
+            raced = [symbol for symbol in missing if symbol not in created]
+            if raced:
+                created.update(self._select(db, raced))
+            security_ids.update(created)
+            self._pending(db).update(created)
+            with self._lock:
+                self._created += len(created)
+
+        return {symbol: security_ids[symbol] for symbol in wanted}
+
+    def ids(self, db: Session, symbols: Iterable[Any]) -> Dict[str, int]:
+        """Securities ids of the symbols that have one, keyed by normalized symbol; creates nothing"""
+        return self._lookup(db, list({normalize_symbol(symbol) for symbol in symbols}))
+
+    def _lookup(self, db: Session, symbols: List[str]) -> Dict[str, int]:
+        pending = db.info.get("pending_securities", {})
+        bind = db.get_bind()
+        security_ids: Dict[str, int] = {}
+        unknown = []
+        with self._lock:
+            for symbol in symbols:
+                security_id = pending.get(symbol) or self._entries.get((bind, symbol))
+                if security_id is None:
+                    unknown.append(symbol)
+                    continue
+                if (bind, symbol) in self._entries:
+                    self._entries.move_to_end((bind, symbol))
+                security_ids[symbol] = security_id
+            self._hits += len(security_ids)
+            self._misses += len(unknown)
+
+        if unknown:
+            found = self._select(db, unknown)
+            security_ids.update(found)
+            # Rows this transaction wrote itself are not safe to cache until it commits
+            self._put(bind, {symbol: security_id for symbol, security_id in found.items() if symbol not in pending})
+        return security_ids
+
+    def _select(self, db: Session, symbols: List[str]) -> Dict[str, int]:
+        found = {}
+        for start in range(0, len(symbols), SYMBOL_CHUNK_SIZE):
+            found.update(db.execute(
+                select(securities_table.c.symbol, securities_table.c.id)
+                .where(securities_table.c.symbol.in_(symbols[start:start + SYMBOL_CHUNK_SIZE]))
+            ).all())
+        return found
+
+    def _pending(self, db: Session) -> Dict[str, int]:
+        return db.info.setdefault("pending_securities", {})
+
+    def _put(self, bind: Engine, entries: Dict[str, int]):
+        if not entries or self.max_entries <= 0:
+            return
+        with self._lock:
+            for symbol, entry in entries.items():
+                self._entries[bind, symbol] = entry
+                self._entries.move_to_end((bind, symbol))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def committed(self, db: Session):
+        pending = db.info.pop("pending_securities", None)
+        if pending:
+            self._put(db.get_bind(), pending)
+
+    def discard(self, db: Session):
+        db.info.pop("pending_securities", None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "created": self._created
+            }
+
+
+security_registry = SecurityRegistry(max_entries=settings.securities_cache_max_entries)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_created_securities(session):
+    security_registry.committed(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_created_securities(session, transaction):
+    # Runs after after_commit, and also for rollbacks and closes that never commit
+    if transaction.parent is None:
+        security_registry.discard(session)
@@ -0,0 +1,193 @@
+from array import array
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+import logging
+import time
+import uuid
+import zlib
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..models.holding_snapshot import HoldingSnapshot
+from ..models.portfolio import Portfolio
+from ..models.portfolio_holding import PortfolioHolding
+from ..models.security import Security
+from ..models.types import uuid7
+
+SYMBOL_SEPARATOR = "\x1f"
+INSERT_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _pack_floats(values: List[Optional[Decimal]]) -> bytes:
+    # Missing values are stored as NaN so every column keeps one slot per position
+    column = array("d", (float(value) if value is not None else float("nan") for value in values))
+    return zlib.compress(column.tobytes())
+
+
+def _unpack_floats(blob: bytes) -> List[Optional[float]]:
+    column = array("d")
+    column.frombytes(zlib.decompress(blob))
+    return [None if value != value else value for value in column]
+
+
+def encode_positions(positions: List[tuple]) -> Dict[str, Any]:
+    """Encode (symbol, quantity, price, market_value) rows as compressed columns"""
+    symbols = [position[0] for position in positions]
+    market_values = [position[3] for position in positions]
+    total_value = sum((value for value in market_values if value is not None), Decimal("0"))
+
+    return {
+        "position_count": len(positions),
+        "total_value": total_value,
+        "symbols": zlib.compress(SYMBOL_SEPARATOR.join(symbols).encode("utf-8")),
+        "quantities": _pack_floats([position[1] for position in positions]),
+        "prices": _pack_floats([position[2] for position in positions]),
+        "market_values": _pack_floats(market_values)
+    }
+
+
+def decode_positions(snapshot: HoldingSnapshot) -> List[Dict[str, Any]]:
+    if not snapshot.position_count:
+        return []
+
+    symbols = zlib.decompress(snapshot.symbols).decode("utf-8").split(SYMBOL_SEPARATOR)
+    return [
+        {"symbol": symbol, "quantity": quantity, "price": price, "market_value": market_value}
+        for symbol, quantity, price, market_value in zip(
+            symbols,
+            _unpack_floats(snapshot.quantities),
+            _unpack_floats(snapshot.prices),
+            _unpack_floats(snapshot.market_values)
+        )
+    ]
+
+
+def take_daily_snapshots(db: Session, snapshot_date: Optional[date] = None) -> Dict[str, Any]:
+    """Append one snapshot per portfolio for the given day.
+
+    Holdings are streamed once, ordered by portfolio, and portfolios that
+    already have a snapshot for the day are skipped, so re-running is safe.
+    A portfolio without holdings gets an empty snapshot, so its value series
+    shows a zero for the day rather than a gap.
+    """
+    started = time.perf_counter()
+    snapshot_date = snapshot_date or datetime.utcnow().date()
+
+    existing = set(db.execute(
+        select(HoldingSnapshot.portfolio_id).where(HoldingSnapshot.snapshot_date == snapshot_date)
+    ).scalars())
+
+    # Outer joins give a portfolio without holdings one row of NULLs
+    rows = db.execute(
+        select(
+            Portfolio.id,
+            Security.symbol,
+            PortfolioHolding.quantity,
+            PortfolioHolding.price,
+            PortfolioHolding.market_value
+        )
+        .select_from(Portfolio)
+        .outerjoin(PortfolioHolding, PortfolioHolding.portfolio_id == Portfolio.id)
+        .outerjoin(Security, Security.id == PortfolioHolding.security_id)
+        .order_by(Portfolio.id, Security.symbol)
+        .execution_options(yield_per=INSERT_BATCH_SIZE * 10)
+    )
+
+    pending = []
+    written = 0
+    positions_written = 0
+    bytes_written = 0
+    now = datetime.utcnow()
+
+    def flush():
+        nonlocal written
+        if pending:
+            db.execute(insert(HoldingSnapshot), pending)
+            written += len(pending)
+            pending.clear()
+
+    def add_snapshot(portfolio_id: uuid.UUID, positions: List[tuple]):
+        nonlocal positions_written, bytes_written
+        if portfolio_id in existing:
+            return
+        encoded = encode_positions(positions)
+        bytes_written += sum(len(encoded[column]) for column in ("symbols", "quantities", "prices", "market_values"))
+        positions_written += len(positions)
+        pending.append({
+            "id": uuid7(),
+            "portfolio_id": portfolio_id,
+            "snapshot_date": snapshot_date,
+            "created_at": now,
+            **encoded
+        })
+        if len(pending) >= INSERT_BATCH_SIZE:
+            flush()
+
+    current_portfolio = None
+    positions: List[tuple] = []
+    for portfolio_id, symbol, quantity, price, market_value in rows:
+        if portfolio_id != current_portfolio:
+            if current_portfolio is not None:
+                add_snapshot(current_portfolio, positions)
+            current_portfolio = portfolio_id
+            positions = []
+        if symbol is not None:
+            positions.append((symbol, quantity, price, market_value))
+
+    if current_portfolio is not None:
+        add_snapshot(current_portfolio, positions)
+    flush()
+    db.commit()
+
+    return {
+        "snapshot_date": snapshot_date.isoformat(),
+        "snapshots_written": written,
+        "positions": positions_written,
+        "compressed_bytes": bytes_written,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def get_value_series(
+    db: Session,
+    portfolio_id: uuid.UUID,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Daily total value for a portfolio, read from snapshot headers only"""
+    query = select(
+        HoldingSnapshot.snapshot_date,
+        HoldingSnapshot.total_value,
+        HoldingSnapshot.position_count
+    ).where(HoldingSnapshot.portfolio_id == portfolio_id)
+
+    if start:
+        query = query.where(HoldingSnapshot.snapshot_date >= start)
+    if end:
+        query = query.where(HoldingSnapshot.snapshot_date <= end)
+
+    rows = db.execute(query.order_by(HoldingSnapshot.snapshot_date)).all()
+    return [
+        {"snapshot_date": snapshot_date, "total_value": total_value, "position_count": position_count}
+        for snapshot_date, total_value, position_count in rows
+    ]
+
+
+if __name__ == "__main__":
+    from ..database import for_each_shard
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    for shard, result in for_each_shard(take_daily_snapshots).items():
+        logger.info(
+            "Wrote %s snapshots (%s positions, %s bytes) for %s on shard %s in %sms",
+            result["snapshots_written"],
+            result["positions"],
+            result["compressed_bytes"],
+            result["snapshot_date"],
+            shard,
+            result["elapsed_ms"]
+        )
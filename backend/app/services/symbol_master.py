@@ -0,0 +1,166 @@
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import csv
+import mmap
+import os
+import struct
+import tempfile
+
+# Index layout: header, then fixed-width records sorted by symbol, then a
+# string heap holding "name<US>sector" for each record.
+INDEX_MAGIC = b"SCOUTSM1"
+HEADER = struct.Struct("<8sII")  # magic, record count, symbol width
+RECORD_TAIL = struct.Struct("<IH")  # heap offset, heap length
+SYMBOL_WIDTH = 16
+FIELD_SEPARATOR = "\x1f"
+
+SYMBOL_COLUMNS = ("symbol", "ticker")
+NAME_COLUMNS = ("name", "company", "security name", "description")
+SECTOR_COLUMNS = ("sector", "industry")
+
+
+def _find_column(headers, candidates) -> Optional[int]:
+    lowered = [str(header).strip().lower() for header in headers]
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered.index(candidate)
+    return None
+
+
+def _symbol_key(symbol) -> Optional[bytes]:
+    """Index key for a symbol, or None for one the fixed-width index can't hold.
+
+    Truncating or dropping characters instead would let distinct symbols
+    share a key, so non-ASCII and over-width symbols are never listed.
+    """
+    try:
+        key = str(symbol).upper().strip().encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    if not key or len(key) > SYMBOL_WIDTH:
+        return None
+    return key
+
+
+def build_symbol_index(csv_path: Path, index_path: Path) -> int:
+    """Build a sorted, memory-mappable symbol index from a reference CSV"""
+    entries: Dict[bytes, bytes] = {}
+
+    with open(csv_path, "r", newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        headers = next(reader, None)
+        if not headers:
+            raise ValueError("Symbol master file is empty")
+
+        symbol_col = _find_column(headers, SYMBOL_COLUMNS)
+        name_col = _find_column(headers, NAME_COLUMNS)
+        sector_col = _find_column(headers, SECTOR_COLUMNS)
+        if symbol_col is None:
+            raise ValueError("Symbol master file needs a symbol or ticker column")
+
+        for row in reader:
+            key = _symbol_key(row[symbol_col]) if len(row) > symbol_col else None
+            if key is None:
+                continue
+            name = row[name_col].strip() if name_col is not None and len(row) > name_col else ""
+            sector = row[sector_col].strip() if sector_col is not None and len(row) > sector_col else ""
+            entries[key] = f"{name}{FIELD_SEPARATOR}{sector}".encode("utf-8")[:0xFFFF]
+
+    keys = sorted(entries)
+    records = bytearray()
+    heap = bytearray()
+    for key in keys:
+        value = entries[key]
+        records += key.ljust(SYMBOL_WIDTH, b"\0")
+        records += RECORD_TAIL.pack(len(heap), len(value))
+        heap += value
+
+    # A private temp file per build, so processes rebuilding at the same time
+    # never write into each other's file; the rename is atomic either way
+    with tempfile.NamedTemporaryFile(
+        dir=index_path.parent, prefix=index_path.name + ".", suffix=".tmp", delete=False
+    ) as index_file:
+        try:
+            index_file.write(HEADER.pack(INDEX_MAGIC, len(keys), SYMBOL_WIDTH))
+            index_file.write(records)
+            index_file.write(heap)
+        except BaseException:
+            os.unlink(index_file.name)
+            raise
+    try:
+        os.replace(index_file.name, index_path)
+    except BaseException:
+        os.unlink(index_file.name)
+        raise
+
+    return len(keys)
+
+
+class SymbolMaster:
+    """Read-only symbol reference backed by a memory-mapped sorted index.
+
+    The mapping is shared between processes through the page cache, so every
+    worker can open it without holding its own copy of the listing.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._file = open(self.index_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, self.symbol_width = HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Not a symbol master index: {self.index_path}")
+
+        self._record_size = self.symbol_width + RECORD_TAIL.size
+        self._heap_start = HEADER.size + self.count * self._record_size
+
+    @classmethod
+    def from_csv(cls, csv_path: Path, index_path: Optional[Path] = None) -> "SymbolMaster":
+        """Open the index for a reference CSV, rebuilding it when the CSV is newer"""
+        csv_path = Path(csv_path)
+        index_path = Path(index_path) if index_path else csv_path.with_suffix(".idx")
+
+        if not index_path.exists() or index_path.stat().st_mtime < csv_path.stat().st_mtime:
+            build_symbol_index(csv_path, index_path)
+
+        return cls(index_path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key_at(self, position: int) -> bytes:
+        offset = HEADER.size + position * self._record_size
+        return self._mm[offset:offset + self.symbol_width]
+
+    def lookup(self, symbol: str) -> Optional[Tuple[str, str]]:
+        """Return (name, sector) for a symbol, or None if it is not listed"""
+        key = _symbol_key(symbol)
+        if key is None:
+            return None
+        key = key.ljust(self.symbol_width, b"\0")
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low >= self.count or self._key_at(low) != key:
+            return None
+
+        offset = HEADER.size + low * self._record_size + self.symbol_width
+        heap_offset, heap_length = RECORD_TAIL.unpack_from(self._mm, offset)
+        start = self._heap_start + heap_offset
+        name, sector = self._mm[start:start + heap_length].decode("utf-8").split(FIELD_SEPARATOR, 1)
+        return name, sector
+
+    def lookup_many(self, symbols: Iterable[str]) -> Dict[str, Optional[Tuple[str, str]]]:
+        return {symbol: self.lookup(symbol) for symbol in set(symbols)}
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
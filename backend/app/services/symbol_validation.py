@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import and_, bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from ..database import shard_engines, shard_session
+from ..models.portfolio_holding import PortfolioHolding
+from ..models.security import Security
+from .holdings_cache import mark_holdings_changed
+from .symbol_master import SymbolMaster
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_VERIFIED = "verified"
+STATUS_INVALID = "invalid"
+
+holdings_table = PortfolioHolding.__table__
+securities_table = Security.__table__
+
+
+def validate_pending_holdings(
+    db: Session,
+    master: SymbolMaster,
+    batch_size: int = 5000,
+    max_batches: Optional[int] = None
+) -> Dict[str, Any]:
+    """Validate pending holdings against the symbol master in bulk batches.
+
+    Each batch takes up to ``batch_size`` distinct securities with pending
+    holdings and settles every pending holding of those securities with one
+    set-based UPDATE per security. Listed securities get their name and
+    sector filled in where missing, once for all their holdings, and their
+    holdings are marked verified; holdings of unlisted ones are marked invalid.
+    """
+    started = time.perf_counter()
+    verified = 0
+    invalid = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        security_ids = db.execute(
+            select(holdings_table.c.security_id)
+            .where(holdings_table.c.validation_status == STATUS_PENDING)
+            .distinct()
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not security_ids:
+            break
+
+        symbols = dict(db.execute(
+            select(securities_table.c.symbol, securities_table.c.id)
+            .where(securities_table.c.id.in_(security_ids))
+        ).all())
+        listings = master.lookup_many(list(symbols))
+        now = datetime.utcnow()
+        listed = []
+        unlisted = []
+
+        for symbol, listing in listings.items():
+            if listing:
+                name, sector = listing
+                listed.append({"b_security_id": symbols[symbol], "b_name": name or None, "b_sector": sector or None})
+            else:
+                unlisted.append({"b_security_id": symbols[symbol]})
+
+        mark_holdings_changed(db, db.execute(
+            select(holdings_table.c.portfolio_id)
+            .where(holdings_table.c.security_id.in_(security_ids), holdings_table.c.validation_status == STATUS_PENDING)
+            .distinct()
+        ).scalars().all(), now)
+
+        pending_for_security = and_(
+            holdings_table.c.security_id == bindparam("b_security_id"),
+            holdings_table.c.validation_status == STATUS_PENDING
+        )
+
+        if listed:
+            db.execute(
+                update(securities_table)
+                .where(securities_table.c.id == bindparam("b_security_id"))
+                .values(
+                    name=func.coalesce(securities_table.c.name, bindparam("b_name")),
+                    sector=func.coalesce(securities_table.c.sector, bindparam("b_sector"))
+                ),
+                listed
+            )
+            result = db.execute(
+                update(holdings_table)
+                .where(pending_for_security)
+                .values(validated=True, validation_status=STATUS_VERIFIED, updated_at=now),
+                [{"b_security_id": row["b_security_id"]} for row in listed]
+            )
+            verified += result.rowcount
+
+        if unlisted:
+            result = db.execute(
+                update(holdings_table)
+                .where(pending_for_security)
+                .values(validated=False, validation_status=STATUS_INVALID, updated_at=now),
+                unlisted
+            )
+            invalid += result.rowcount
+
+        db.commit()
+        batches += 1
+
+    elapsed = time.perf_counter() - started
+    processed = verified + invalid
+
+    return {
+        "processed": processed,
+        "verified": verified,
+        "invalid": invalid,
+        "batches": batches,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_second": round(processed / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+class SymbolValidator(threading.Thread):
+    """Background thread that periodically drains the pending-validation backlog"""
+
+    def __init__(self, master: SymbolMaster, interval_seconds: float = 30, batch_size: int = 5000):
+        super().__init__(name="symbol-validator", daemon=True)
+        self.master = master
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for shard in shard_engines:
+                db = shard_session(shard)
+                try:
+                    result = validate_pending_holdings(db, self.master, batch_size=self.batch_size)
+                    if result["processed"]:
+                        logger.info(
+                            "Validated %s holdings on shard %s (%s rows/s)",
+                            result["processed"], shard, result["rows_per_second"]
+                        )
+                except Exception:
+                    db.rollback()
+                    logger.exception("Symbol validation run failed on shard %s", shard)
+                finally:
+                    db.close()
+
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self.join(timeout)
+        self.master.close()
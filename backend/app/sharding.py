@@ -0,0 +1,54 @@
+from bisect import bisect
+from hashlib import blake2b
+from typing import Dict, Iterable
+import uuid
+
+
+def _point(data: bytes) -> int:
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring placing each user on one of the named shards.
+
+    Every shard owns ``vnodes`` points on the ring and a user belongs to the
+    first point after the hash of their id. Adding a shard only takes
+    over the users just before its points, roughly 1/N of them, and placement
+    depends on shard names alone, never on their order or URLs.
+    """
+
+    def __init__(self, names: Iterable[str], vnodes: int = 64):
+        self.names = sorted(set(names))
+        if not self.names:
+            raise ValueError("A hash ring needs at least one shard")
+        self.vnodes = vnodes
+        points = sorted(
+            (_point(f"{name}#{index}".encode("utf-8")), name)
+            for name in self.names
+            for index in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [name for _, name in points]
+
+    def owner(self, user_id: uuid.UUID) -> str:
+        if len(self.names) == 1:
+            return self.names[0]
+        index = bisect(self._hashes, _point(user_id.bytes))
+        return self._owners[index % len(self._owners)]
+
+    def shares(self) -> Dict[str, float]:
+        """Fraction of the hash space each shard owns"""
+        space = 2 ** 64
+        shares = dict.fromkeys(self.names, 0)
+        previous = self._hashes[-1] - space
+        for point, name in zip(self._hashes, self._owners):
+            shares[name] += point - previous
+            previous = point
+        return {name: round(owned / space, 4) for name, owned in shares.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
@@ -0,0 +1,632 @@
+"""Benchmark the API in-process against synthetic data and compare with a JSON baseline.
+
+    python -m benchmarks.run                         # 10k-row CSVs, compare with benchmarks/baseline.json
+    python -m benchmarks.run --rows 10000 --rows 1000000
+    python -m benchmarks.run --update-baseline       # record these results as the new baseline
+    python -m benchmarks.run --startup-iterations 0  # skip the fresh-process startup scenarios
+
+Exits with status 1 when a scenario regresses past --threshold.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "latest.json"
+
+# Metric -> whether a larger value is worse. Only the best round's median is
+# gated: on shared machines tail percentiles, and even a single round's median,
+# swing by 30-50% between runs without any code change.
+REGRESSION_METRICS = {
+    "best_p50_ms": True,
+}
+
+# Latency changes smaller than this are noise, whatever their ratio
+MIN_REGRESSION_MS = 2.0
+
+# Recaps written per call in the recap_insert scenario
+RECAP_INSERT_ROWS = 1000
+
+# Holdings written per call in holding_insert, and keys read per call in holding_lookup
+HOLDING_INSERT_ROWS = 10000
+HOLDING_LOOKUPS = 1000
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+
+def summarize(rounds: List[List[float]], units_per_op: Optional[int] = None) -> Dict[str, Any]:
+    durations = sorted(duration for samples in rounds for duration in samples)
+    total = sum(durations)
+    summary = {
+        "iterations": len(durations),
+        "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 3),
+        "mean_ms": round(total / len(durations) * 1000, 3),
+        "best_p50_ms": round(min(percentile(sorted(samples), 0.50) for samples in rounds) * 1000, 3),
+        "throughput_per_second": round(len(durations) / total, 2) if total else 0.0,
+    }
+    if units_per_op:
+        summary["rows_per_second"] = round(units_per_op * len(durations) / total, 1) if total else 0.0
+    return summary
+
+
+def measure(
+    operation: Callable[[], Any],
+    iterations: int,
+    rounds: int = 1,
+    before: Optional[Callable[[], Any]] = None
+) -> List[List[float]]:
+    """Time ``rounds`` x ``iterations`` calls after one warm-up; ``before`` runs untimed ahead of each call"""
+    if before:
+        before()
+    operation()
+
+    results = []
+    for _ in range(rounds):
+        durations = []
+        for _ in range(iterations):
+            if before:
+                before()
+            started = time.perf_counter()
+            operation()
+            durations.append(time.perf_counter() - started)
+        results.append(durations)
+    return results
+
+
+def collect(operation: Callable[[], float], iterations: int, rounds: int = 1) -> List[List[float]]:
+    """Like measure(), for operations that time themselves and return seconds"""
+    operation()
+    return [[operation() for _ in range(iterations)] for _ in range(rounds)]
+
+
+def expect(response, status_code: int = 200):
+    if response.status_code != status_code:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def run_suite(args) -> Dict[str, Dict[str, Any]]:
+    # Imported here so DATABASE_URL and the working directory are set first
+    from fastapi.testclient import TestClient
+    from sqlalchemy import delete, func, select, text, update
+    from sqlalchemy.exc import OperationalError
+
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.email_recap import EmailRecap
+    from app.models.holding_snapshot import HoldingSnapshot
+    from app.models.portfolio import Portfolio
+    from app.models.portfolio_holding import PortfolioHolding
+    from app.services.email_delivery import SMTPConnectionPool, deliver_pending_recaps, smtp_connection_factory
+    from app.services.export import arrow_available
+    from app.services.holdings_cache import holdings_cache
+    from app.services.recap_scheduler import run_due_recaps
+    from app.services.revaluation import revalue_holdings
+    from app.services.snapshots import take_daily_snapshots
+    from app.services.symbol_master import SymbolMaster
+    from app.services.symbol_validation import STATUS_PENDING, validate_pending_holdings
+    from . import startup, synthetic
+    from .smtp_server import SMTPStandIn
+
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def record(name: str, summary: Dict[str, Any]):
+        results[name] = summary
+        print(
+            f"{name:<26} best p50 {summary['best_p50_ms']:>9.2f} ms  p50 {summary['p50_ms']:>9.2f} ms  p95 {summary['p95_ms']:>10.2f} ms  "
+            f"p99 {summary['p99_ms']:>10.2f} ms  {summary['throughput_per_second']:>8.2f} ops/s"
+            + (f"  {summary['rows_per_second']:>10.0f} rows/s" if "rows_per_second" in summary else "")
+        )
+
+    if args.startup_iterations:
+        # Fresh interpreters, so these include everything a new worker pays for
+        record("startup_import", summarize(collect(
+            startup.import_seconds,
+            args.startup_iterations,
+            args.rounds
+        )))
+        record("startup_first_response", summarize(collect(
+            startup.first_response_seconds,
+            args.startup_iterations,
+            args.rounds
+        )))
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            user_ids = synthetic.create_users(db, args.users)
+            portfolio_ids = synthetic.create_portfolios(db, user_ids, args.portfolios_per_user, seed=args.seed)
+            recaps = synthetic.create_recap_history(db, portfolio_ids, args.recap_history, seed=args.seed)
+        finally:
+            db.close()
+        print(f"Seeded {len(user_ids)} users, {len(portfolio_ids)} portfolios, {recaps} recaps")
+
+        credentials = {"email": "bench-0@example.com", "password": synthetic.BENCHMARK_PASSWORD}
+        record("login", summarize(measure(
+            lambda: expect(client.post("/auth/login", json=credentials)),
+            args.iterations,
+            args.rounds
+        )))
+
+        tokens = expect(client.post("/auth/login", json=credentials)).json()
+        client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+
+        for rows in args.rows:
+            portfolio_id = expect(client.post("/api/portfolios/", json={"name": f"Benchmark {rows}"})).json()["id"]
+            csv_file = synthetic.holdings_csv(rows, seed=args.seed)
+            mapping = {"tickerColumn": 0, "nameColumn": 1}
+
+            record(f"upload[{rows}]", summarize(measure(
+                lambda: expect(client.post(
+                    f"/api/portfolios/{portfolio_id}/upload-holdings",
+                    files={"file": ("holdings.csv", csv_file, "text/csv")}
+                )),
+                args.heavy_iterations,
+                args.rounds
+            ), units_per_op=rows))
+
+            record(f"process_holdings[{rows}]", summarize(measure(
+                lambda: expect(client.post(f"/api/portfolios/{portfolio_id}/process-holdings", json=mapping)),
+                args.heavy_iterations,
+                args.rounds
+            ), units_per_op=rows))
+
+            record(f"holdings_list[{rows}]", summarize(measure(
+                lambda: expect(client.get(f"/api/portfolios/{portfolio_id}/holdings")),
+                args.heavy_iterations if rows > 100000 else args.iterations,
+                args.rounds
+            ), units_per_op=rows))
+
+            # Every call misses the cache: the query and encoding path on its own
+            record(f"holdings_list_uncached[{rows}]", summarize(measure(
+                lambda: expect(client.get(f"/api/portfolios/{portfolio_id}/holdings")),
+                args.heavy_iterations if rows > 100000 else args.iterations,
+                args.rounds,
+                before=holdings_cache.clear
+            ), units_per_op=rows))
+
+            # Grouped sums over every holding the user owns
+            record(f"exposure[{rows}]", summarize(measure(
+                lambda: expect(client.get("/api/exposure/", params={"weighted": "true"})),
+                args.heavy_iterations if rows > 100000 else args.iterations,
+                args.rounds
+            ), units_per_op=rows))
+
+            # Quote batch covering every symbol in the portfolio: market values and weights in SQL
+            quotes = {synthetic.symbol_for(index): Decimal(index % 90000 + 100) / 100 for index in range(rows)}
+
+            def revalue():
+                db = SessionLocal()
+                try:
+                    revalue_holdings(db, quotes)
+                finally:
+                    db.close()
+
+            record(f"revalue[{rows}]", summarize(measure(
+                revalue,
+                args.heavy_iterations,
+                args.rounds
+            ), units_per_op=rows))
+
+            # Every holding back to pending, then one validator pass against a memory-mapped listing
+            master_path = Path(f"symbols-{rows}.csv")
+            master_path.write_bytes(synthetic.symbol_master_csv(rows, seed=args.seed))
+            master = SymbolMaster.from_csv(master_path)
+
+            def mark_pending():
+                db = SessionLocal()
+                try:
+                    db.execute(
+                        update(PortfolioHolding)
+                        .where(PortfolioHolding.portfolio_id == uuid.UUID(portfolio_id))
+                        .values(validated=False, validation_status=STATUS_PENDING)
+                    )
+                    db.commit()
+                finally:
+                    db.close()
+
+            def validate():
+                db = SessionLocal()
+                try:
+                    validate_pending_holdings(db, master)
+                finally:
+                    db.close()
+
+            try:
+                record(f"validate[{rows}]", summarize(measure(
+                    validate,
+                    args.heavy_iterations,
+                    args.rounds,
+                    before=mark_pending
+                ), units_per_op=rows))
+            finally:
+                master.close()
+
+            for export_format in ["csv", "ndjson"] + (["arrow"] if arrow_available() else []):
+                record(f"export_{export_format}[{rows}]", summarize(measure(
+                    lambda: expect(client.get(
+                        "/api/export/holdings",
+                        params={"format": export_format, "portfolio_id": portfolio_id}
+                    )),
+                    args.heavy_iterations,
+                    args.rounds
+                ), units_per_op=rows))
+
+        # Bulk inserts with uuid7 keys, which append to the right edge of the key indexes
+        portfolio_id = expect(client.post("/api/portfolios/", json={"name": "Benchmark keys"})).json()["id"]
+
+        def insert_holdings():
+            db = SessionLocal()
+            try:
+                synthetic.create_holdings(db, uuid.UUID(portfolio_id), HOLDING_INSERT_ROWS, seed=args.seed)
+            finally:
+                db.close()
+
+        record(f"holding_insert[{HOLDING_INSERT_ROWS}]", summarize(measure(
+            insert_holdings,
+            args.heavy_iterations,
+            args.rounds
+        ), units_per_op=HOLDING_INSERT_ROWS))
+
+        # Point reads by primary key, in random order across every holding seeded so far
+        db = SessionLocal()
+        try:
+            holding_ids = db.scalars(select(PortfolioHolding.id)).all()
+        finally:
+            db.close()
+        lookup_keys = random.Random(args.seed).sample(holding_ids, min(HOLDING_LOOKUPS, len(holding_ids)))
+
+        def look_up_holdings():
+            db = SessionLocal()
+            try:
+                for key in lookup_keys:
+                    db.execute(select(PortfolioHolding.quantity).where(PortfolioHolding.id == key)).scalar_one()
+            finally:
+                db.close()
+
+        record(f"holding_lookup[{len(lookup_keys)}]", summarize(measure(
+            look_up_holdings,
+            args.iterations,
+            args.rounds
+        ), units_per_op=len(lookup_keys)))
+
+        # On-disk size of the holdings table and each of its indexes, from SQLite's dbstat
+        db = SessionLocal()
+        try:
+            sizes = dict(db.execute(text(
+                "SELECT name, SUM(pgsize) FROM dbstat"
+                " WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'portfolio_holdings')"
+                " GROUP BY name"
+            )).all())
+        except OperationalError:
+            # Not SQLite, or SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+            sizes = {}
+        finally:
+            db.close()
+        if sizes:
+            results["holding_storage"] = {
+                "holdings": len(holding_ids),
+                "bytes": sizes,
+                "bytes_per_holding": {name: round(size / len(holding_ids), 1) for name, size in sizes.items()},
+            }
+            for name, size in sorted(sizes.items()):
+                print(f"{'holding_storage':<26} {name:<52} {size / 2 ** 20:>8.2f} MiB  {size / len(holding_ids):>6.1f} bytes per holding")
+        else:
+            print("holding_storage: skipped, dbstat is not available on this database")
+
+        # Full-text search over every seeded recap, filtered to the signed-in user's
+        record(f"recap_search[{recaps}]", summarize(measure(
+            lambda: expect(client.get("/api/recaps/search", params={"q": "dividend outlook"})),
+            args.iterations,
+            args.rounds
+        )))
+
+        # Inserts keep the search index in step through triggers
+        search_portfolio = portfolio_ids[0]
+
+        def insert_recaps():
+            db = SessionLocal()
+            try:
+                synthetic.create_recap_history(db, [search_portfolio], RECAP_INSERT_ROWS, seed=args.seed)
+            finally:
+                db.close()
+
+        record(f"recap_insert[{RECAP_INSERT_ROWS}]", summarize(measure(
+            insert_recaps,
+            args.heavy_iterations,
+            args.rounds
+        ), units_per_op=RECAP_INSERT_ROWS))
+
+        # Recap generation for a portfolio with history; the description changes
+        # before every call so each one renders a new recap instead of reusing the last
+        portfolio_id = expect(client.post("/api/portfolios/", json={"name": "Benchmark recaps"})).json()["id"]
+        expect(client.post(
+            f"/api/portfolios/{portfolio_id}/upload-holdings",
+            files={"file": ("holdings.csv", synthetic.holdings_csv(args.recap_holdings, seed=args.seed), "text/csv")}
+        ))
+        expect(client.post(f"/api/portfolios/{portfolio_id}/process-holdings", json={"tickerColumn": 0, "nameColumn": 1}))
+
+        db = SessionLocal()
+        try:
+            synthetic.create_recap_history(db, [uuid.UUID(portfolio_id)], args.recap_history, seed=args.seed)
+        finally:
+            db.close()
+
+        revision = iter(range(1, 1 << 30))
+        record("recap_generate", summarize(measure(
+            lambda: expect(client.post(f"/api/portfolios/{portfolio_id}/recaps/generate")),
+            args.iterations,
+            args.rounds,
+            before=lambda: expect(client.put(
+                f"/api/portfolios/{portfolio_id}",
+                json={"description": f"Revision {next(revision)}"}
+            ))
+        )))
+
+        # Snapshot storage per day, reading the history back, and the daily run over every portfolio
+        portfolio_id = expect(client.post("/api/portfolios/", json={"name": "Benchmark snapshots"})).json()["id"]
+        db = SessionLocal()
+        try:
+            synthetic.create_snapshot_history(
+                db, uuid.UUID(portfolio_id), args.snapshot_positions, args.snapshot_days, seed=args.seed
+            )
+            snapshot_bytes = db.scalar(
+                select(func.sum(
+                    func.length(HoldingSnapshot.symbols) + func.length(HoldingSnapshot.quantities)
+                    + func.length(HoldingSnapshot.prices) + func.length(HoldingSnapshot.market_values)
+                )).where(HoldingSnapshot.portfolio_id == uuid.UUID(portfolio_id))
+            )
+            portfolio_count = db.scalar(select(func.count()).select_from(Portfolio))
+        finally:
+            db.close()
+        results["snapshot_storage"] = {
+            "snapshots": args.snapshot_days,
+            "positions": args.snapshot_positions,
+            "bytes_per_snapshot": round(snapshot_bytes / args.snapshot_days, 1),
+        }
+        print(
+            f"{'snapshot_storage':<26} {results['snapshot_storage']['bytes_per_snapshot']:.0f} bytes per snapshot "
+            f"of {args.snapshot_positions} positions"
+        )
+
+        record(f"snapshot_series[{args.snapshot_days}]", summarize(measure(
+            lambda: expect(client.get(f"/api/portfolios/{portfolio_id}/snapshots")),
+            args.iterations,
+            args.rounds
+        ), units_per_op=args.snapshot_days))
+
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        record(f"snapshot_day[{args.snapshot_positions}]", summarize(measure(
+            lambda: expect(client.get(f"/api/portfolios/{portfolio_id}/snapshots/{yesterday}")),
+            args.iterations,
+            args.rounds
+        ), units_per_op=args.snapshot_positions))
+
+        # A new day per call, so no portfolio is skipped as already snapshotted
+        snapshot_dates = (date.today() + timedelta(days=offset) for offset in range(1, 1 << 20))
+
+        def take_snapshots():
+            db = SessionLocal()
+            try:
+                take_daily_snapshots(db, next(snapshot_dates))
+            finally:
+                db.close()
+
+        record(f"snapshot_take[{portfolio_count}]", summarize(measure(
+            take_snapshots,
+            args.heavy_iterations,
+            args.rounds
+        ), units_per_op=portfolio_count))
+
+        # One scheduler run over --scheduler-portfolios due daily portfolios. Their
+        # recaps are deleted first, so every portfolio renders instead of being skipped
+        db = SessionLocal()
+        try:
+            scheduler_user = synthetic.create_users(db, 1, prefix="scheduler")[0]
+            synthetic.create_portfolios(db, [scheduler_user], args.scheduler_portfolios, seed=args.seed, email_frequency="daily")
+        finally:
+            db.close()
+        scheduler_portfolios = select(Portfolio.id).where(Portfolio.user_id == scheduler_user)
+
+        def make_due():
+            db = SessionLocal()
+            try:
+                db.execute(delete(EmailRecap).where(EmailRecap.portfolio_id.in_(scheduler_portfolios)))
+                db.execute(
+                    update(Portfolio)
+                    .where(Portfolio.user_id == scheduler_user)
+                    .values(next_recap_at=datetime.utcnow() - timedelta(minutes=1))
+                )
+                db.commit()
+            finally:
+                db.close()
+
+        record(f"recap_scheduler[{args.scheduler_portfolios}]", summarize(measure(
+            run_due_recaps,
+            args.heavy_iterations,
+            args.rounds,
+            before=make_due
+        ), units_per_op=args.scheduler_portfolios))
+
+        # Delivery of --delivery-recaps recaps over a pool of persistent connections to an
+        # in-process SMTP stand-in; the warm-up pass also drains recaps earlier scenarios left unsent
+        portfolio_id = expect(client.post("/api/portfolios/", json={"name": "Benchmark delivery"})).json()["id"]
+        db = SessionLocal()
+        try:
+            synthetic.create_recap_history(db, [uuid.UUID(portfolio_id)], args.delivery_recaps, seed=args.seed)
+        finally:
+            db.close()
+
+        def mark_unsent():
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(EmailRecap)
+                    .where(EmailRecap.portfolio_id == uuid.UUID(portfolio_id))
+                    .values(sent_at=None, delivery_attempts=0, delivery_claimed_at=None, delivery_token=None)
+                )
+                db.commit()
+            finally:
+                db.close()
+
+        with SMTPStandIn() as stand_in:
+            pool = SMTPConnectionPool(
+                smtp_connection_factory(stand_in.host, stand_in.port),
+                size=args.delivery_connections
+            )
+            try:
+                record(f"recap_delivery[{args.delivery_recaps}]", summarize(measure(
+                    lambda: deliver_pending_recaps(pool, "Benchmark <recaps@example.com>"),
+                    args.heavy_iterations,
+                    args.rounds,
+                    before=mark_unsent
+                ), units_per_op=args.delivery_recaps))
+            finally:
+                pool.close()
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Describe every metric that is worse than the baseline by more than ``threshold``"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, larger_is_worse in REGRESSION_METRICS.items():
+            if metric not in current or not previous.get(metric):
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric]
+            if not larger_is_worse:
+                change = -change
+            if metric.endswith("_ms") and abs(current[metric] - previous[metric]) < MIN_REGRESSION_MS:
+                continue
+            if change > threshold:
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]} -> {current[metric]} ({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append", help="CSV size to benchmark (repeatable, default 10000)")
+    parser.add_argument("--iterations", type=int, default=20, help="timed calls per round for fast endpoints")
+    parser.add_argument("--heavy-iterations", type=int, default=3, help="timed calls per round for row-scaled endpoints")
+    parser.add_argument("--startup-iterations", type=int, default=3, help="fresh worker processes per round (0 skips startup)")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per scenario; the best round median is compared")
+    parser.add_argument("--users", type=int, default=200, help="synthetic users to seed")
+    parser.add_argument("--portfolios-per-user", type=int, default=5)
+    parser.add_argument("--recap-history", type=int, default=30, help="past recaps per portfolio")
+    parser.add_argument("--recap-holdings", type=int, default=200, help="holdings in the recap benchmark portfolio")
+    parser.add_argument("--snapshot-days", type=int, default=365, help="days of snapshot history for the snapshot scenarios")
+    parser.add_argument("--snapshot-positions", type=int, default=100, help="positions per snapshot in that history")
+    parser.add_argument("--scheduler-portfolios", type=int, default=2000, help="due portfolios per recap scheduler run")
+    parser.add_argument("--delivery-recaps", type=int, default=1000, help="recaps sent per delivery run")
+    parser.add_argument("--delivery-connections", type=int, default=4, help="pooled SMTP connections for the delivery run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="database to benchmark against (default: a fresh temporary SQLite file)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed fractional regression (default 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    args = parser.parse_args(argv)
+    args.rows = args.rows or [10000]
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    baseline_path = args.baseline.resolve()
+    output_path = args.output.resolve()
+
+    workdir = tempfile.mkdtemp(prefix="scout-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(workdir) / 'bench.db'}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    os.environ.setdefault("RECAP_SCHEDULER_ENABLED", "false")
+    # One synthetic user issues every request; per-user limits would throttle it
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    os.environ.pop("SMTP_HOST", None)
+    os.environ.pop("SYMBOL_MASTER_PATH", None)
+
+    # Uploads land in ./uploads, so run inside the scratch directory
+    previous_cwd = os.getcwd()
+    sys.path.insert(0, str(BENCHMARK_DIR.parent))
+    os.chdir(workdir)
+    try:
+        results = run_suite(args)
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        },
+        "config": {
+            "rows": args.rows,
+            "iterations": args.iterations,
+            "heavy_iterations": args.heavy_iterations,
+            "rounds": args.rounds,
+            "startup_iterations": args.startup_iterations,
+            "users": args.users,
+            "portfolios_per_user": args.portfolios_per_user,
+            "recap_history": args.recap_history,
+            "snapshot_days": args.snapshot_days,
+            "snapshot_positions": args.snapshot_positions,
+            "scheduler_portfolios": args.scheduler_portfolios,
+            "delivery_recaps": args.delivery_recaps,
+            "delivery_connections": args.delivery_connections,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output_path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {output_path}")
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline updated at {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"No regressions beyond {args.threshold:.0%} against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
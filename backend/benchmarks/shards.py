@@ -0,0 +1,203 @@
+"""Import throughput against 1, 2 and 4 SQLite shards on one machine.
+
+    python -m benchmarks.shards                          # 4 workers, shard counts 1, 2 and 4
+    python -m benchmarks.shards --workers 8 --shards 1 --shards 8
+
+Each worker is its own process importing CSVs into its own user's portfolio,
+as separate API workers would. Users are picked so every shard gets the
+same number of workers, so with one shard every import queues on the same
+write lock and with N shards only workers/N of them do.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from .startup import BACKEND_DIR, _environment
+
+
+def _setup(workers: int):
+    """Create the schema and one user and portfolio per worker, spread evenly over the shards"""
+    from sqlalchemy import insert
+
+    from app.database import init_db, shard_engines, shard_for, shard_session
+    from app.models.portfolio import Portfolio
+    from app.models.types import uuid7
+    from app.models.user import User
+    from app.models.user_directory import UserDirectory
+    from app.auth import get_password_hash
+
+    init_db()
+    shards = list(shard_engines)
+    hashed_password = get_password_hash("benchmark-password")
+    directory = shard_session(None)
+    assignments = []
+    try:
+        for index in range(workers):
+            shard = shards[index % len(shards)]
+            user_id = uuid7()
+            while shard_for(user_id) != shard:
+                user_id = uuid7()
+            portfolio_id = uuid7()
+            email = f"shard-bench-{index}@example.com"
+            db = shard_session(shard)
+            try:
+                db.execute(insert(User), [{"id": user_id, "email": email, "hashed_password": hashed_password}])
+                db.execute(insert(Portfolio), [{"id": portfolio_id, "name": f"Shard benchmark {index}", "user_id": user_id}])
+                db.commit()
+            finally:
+                db.close()
+            directory.execute(insert(UserDirectory), [{"email": email, "user_id": user_id}])
+            assignments.append({"shard": shard, "user_id": str(user_id), "portfolio_id": str(portfolio_id)})
+        directory.commit()
+    finally:
+        directory.close()
+    print(json.dumps(assignments))
+
+
+def _worker(user_id: str, portfolio_id: str, rows: int, imports: int, seed: int):
+    """One warm-up import, then ``imports`` timed ones once the parent writes a line to stdin"""
+    import uuid
+
+    from app.database import shard_for, shard_session
+    from app.routers.upload import import_holdings, read_file_data
+    from . import synthetic
+
+    csv_path = Path(f"worker-{portfolio_id}.csv")
+    csv_path.write_bytes(synthetic.holdings_csv(rows, seed=seed))
+    file_data = read_file_data(csv_path)
+
+    db = shard_session(shard_for(uuid.UUID(user_id)))
+    try:
+        import_holdings(db, uuid.UUID(portfolio_id), file_data, 0, 1)
+        print("ready", flush=True)
+        sys.stdin.readline()
+
+        started = time.time()
+        imported = 0
+        for _ in range(imports):
+            imported += import_holdings(db, uuid.UUID(portfolio_id), file_data, 0, 1)["holdings_created"]
+        finished = time.time()
+    finally:
+        db.close()
+    print(json.dumps({"started": started, "finished": finished, "rows": imported}), flush=True)
+
+
+def measure(shard_count: int, args) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="scout-shards-"))
+    env = _environment(None)
+    env.update({
+        # The directory gets its own file so every shard count pays the same for it
+        "DATABASE_URL": f"sqlite:///{workdir / 'directory.db'}",
+        "SHARD_URLS": json.dumps({
+            f"shard{index}": f"sqlite:///{workdir / f'shard{index}.db'}?timeout=120" for index in range(shard_count)
+        }),
+        "SECRET_KEY": "benchmark-secret-key",
+        "RECAP_SCHEDULER_ENABLED": "false",
+        "ADMISSION_ENABLED": "false",
+    })
+    env.pop("SMTP_HOST", None)
+    env.pop("SYMBOL_MASTER_PATH", None)
+    module = [sys.executable, "-m", "benchmarks.shards"]
+
+    try:
+        setup = subprocess.run(
+            module + ["--setup", "--workers", str(args.workers)],
+            env=env, cwd=workdir, capture_output=True, text=True, check=True
+        )
+        assignments = json.loads(setup.stdout.strip().splitlines()[-1])
+
+        processes = [
+            subprocess.Popen(
+                module + [
+                    "--worker", assignment["user_id"], assignment["portfolio_id"],
+                    "--rows", str(args.rows), "--imports", str(args.imports), "--seed", str(args.seed)
+                ],
+                env=env, cwd=workdir, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+            )
+            for assignment in assignments
+        ]
+        try:
+            for process in processes:
+                if process.stdout.readline().strip() != "ready":
+                    raise RuntimeError(f"Benchmark worker exited with {process.wait()}")
+            for process in processes:
+                process.stdin.write("go\n")
+                process.stdin.flush()
+            reports = [json.loads(process.stdout.readline()) for process in processes]
+        finally:
+            for process in processes:
+                process.wait()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed = max(report["finished"] for report in reports) - min(report["started"] for report in reports)
+    rows = sum(report["rows"] for report in reports)
+    return {
+        "shards": shard_count,
+        "workers": args.workers,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, action="append", help="shard count to measure (repeatable, default 1, 2, 4)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent importing processes")
+    parser.add_argument("--rows", type=int, default=2000, help="rows per imported CSV")
+    parser.add_argument("--imports", type=int, default=10, help="timed imports per worker")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the results here as JSON")
+    parser.add_argument("--setup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", nargs=2, metavar=("USER_ID", "PORTFOLIO_ID"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.shards = args.shards or [1, 2, 4]
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.setup:
+        _setup(args.workers)
+        return 0
+    if args.worker:
+        _worker(*args.worker, rows=args.rows, imports=args.imports, seed=args.seed)
+        return 0
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    results = []
+    for shard_count in args.shards:
+        result = measure(shard_count, args)
+        result["speedup"] = round(result["rows_per_second"] / results[0]["rows_per_second"], 2) if results else 1.0
+        results.append(result)
+        print(
+            f"{shard_count} shard(s), {args.workers} workers: {result['rows_per_second']} rows/s "
+            f"({result['rows']} rows in {result['seconds']}s, x{result['speedup']})"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "config": {"workers": args.workers, "rows": args.rows, "imports": args.imports, "seed": args.seed},
+            "results": results,
+        }, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
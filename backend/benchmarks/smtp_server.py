@@ -0,0 +1,90 @@
+"""An in-process SMTP stand-in for delivery tests and benchmarks.
+
+It speaks just enough SMTP for smtplib (EHLO, HELO, MAIL, RCPT, DATA,
+RSET, NOOP and QUIT) and keeps every accepted message in memory. A
+``reply`` callback can answer a message's DATA with an error instead,
+so callers can script temporary (4xx) and permanent (5xx) failures.
+"""
+from typing import Callable, List, Optional, Tuple
+import socketserver
+import threading
+
+# (attempt number across all messages, raw message) -> None to accept, or (code, text) to refuse
+ReplyPolicy = Callable[[int, bytes], Optional[Tuple[int, str]]]
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, code: int, text: str):
+        self.wfile.write(f"{code} {text}\r\n".encode("ascii"))
+
+    def handle(self):
+        stand_in: "SMTPStandIn" = self.server.stand_in
+        self.reply(220, "localhost SMTP stand-in ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.wfile.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif command in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                self.reply(250, "OK")
+            elif command == b"DATA":
+                self.reply(354, "End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data_line in self.rfile:
+                    if data_line == b".\r\n":
+                        break
+                    # Undo the sender's dot-stuffing
+                    lines.append(data_line[1:] if data_line.startswith(b".") else data_line)
+                code, text = stand_in.receive(b"".join(lines))
+                self.reply(code, text)
+            elif command == b"QUIT":
+                self.reply(221, "Bye")
+                return
+            else:
+                self.reply(502, "Command not implemented")
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPStandIn:
+    """A threaded SMTP server on a free local port; use as a context manager"""
+
+    def __init__(self, reply: Optional[ReplyPolicy] = None, host: str = "127.0.0.1"):
+        self.reply = reply
+        self.messages: List[bytes] = []
+        self.attempts = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingSMTPServer((host, 0), _SMTPHandler)
+        self._server.stand_in = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-stand-in", daemon=True)
+
+    def receive(self, message: bytes) -> Tuple[int, str]:
+        with self._lock:
+            self.attempts += 1
+            attempt = self.attempts
+        refusal = self.reply(attempt, message) if self.reply else None
+        if refusal:
+            return refusal
+        with self._lock:
+            self.messages.append(message)
+        return 250, "OK: queued"
+
+    def start(self) -> "SMTPStandIn":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SMTPStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
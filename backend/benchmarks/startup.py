@@ -0,0 +1,78 @@
+"""Worker startup cost: import time and time to first response, each in a fresh process"""
+from pathlib import Path
+from typing import Dict, Optional
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SCRIPT = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "import app.main\n"
+    "print(time.perf_counter() - started)\n"
+)
+
+
+def _environment(env: Optional[Dict[str, str]]) -> Dict[str, str]:
+    environment = dict(os.environ if env is None else env)
+    environment["PYTHONPATH"] = str(BACKEND_DIR) + (
+        os.pathsep + environment["PYTHONPATH"] if environment.get("PYTHONPATH") else ""
+    )
+    return environment
+
+
+def import_seconds(env: Optional[Dict[str, str]] = None) -> float:
+    """Seconds spent in ``import app.main``, as measured inside a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        env=_environment(env),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_response_seconds(env: Optional[Dict[str, str]] = None, timeout: float = 60.0) -> float:
+    """Seconds from spawning a uvicorn worker to its first successful /health response"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_environment(env),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}: {process.stderr.read().decode()[-500:]}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"No response from {url} within {timeout}s")
+            time.sleep(0.005)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -0,0 +1,200 @@
+"""Deterministic synthetic data for the benchmark suite"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+import random
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.auth import get_password_hash
+from app.database import shard_engines, shard_for
+from app.models.email_recap import EmailRecap
+from app.models.holding_snapshot import HoldingSnapshot
+from app.models.portfolio import Portfolio
+from app.models.portfolio_holding import PortfolioHolding
+from app.models.types import uuid7
+from app.models.user import User
+from app.models.user_directory import UserDirectory
+from app.services.securities import security_registry
+from app.services.snapshots import encode_positions
+
+SECTORS = [
+    "Technology", "Healthcare", "Financials", "Energy", "Industrials",
+    "Consumer Discretionary", "Consumer Staples", "Utilities", "Materials", "Real Estate"
+]
+
+RECAP_WORDS = [
+    "earnings", "guidance", "dividend", "yield", "volatility", "rebalance", "sector",
+    "outlook", "revenue", "margin", "allocation", "drawdown", "momentum", "valuation"
+]
+
+INSERT_CHUNK_SIZE = 10000
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def symbol_for(index: int) -> str:
+    # Base-26 tickers: A..Z, AA..ZZ, AAA.. so every row gets a distinct symbol
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def holdings_csv(rows: int, seed: int = 0) -> bytes:
+    """A broker-style holdings export with ``rows`` positions"""
+    rng = random.Random(seed)
+    lines = ["Symbol,Name,Quantity,Price,Market Value,Sector"]
+    for index in range(rows):
+        symbol = symbol_for(index)
+        quantity = rng.randint(1, 5000)
+        price = round(rng.uniform(1, 900), 2)
+        lines.append(
+            f"{symbol},{symbol} Holdings Inc,{quantity},{price},{round(quantity * price, 2)},{rng.choice(SECTORS)}"
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def symbol_master_csv(symbols: int, seed: int = 0) -> bytes:
+    """A reference listing of the first ``symbols`` tickers; every tenth one is left out so it validates as invalid"""
+    rng = random.Random(seed)
+    lines = ["Symbol,Name,Sector"]
+    for index in range(symbols):
+        if index % 10 != 9:
+            symbol = symbol_for(index)
+            lines.append(f"{symbol},{symbol} Holdings Inc,{rng.choice(SECTORS)}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def create_users(db: Session, count: int, prefix: str = "bench") -> List[uuid.UUID]:
+    # Hashing is deliberately slow, so every synthetic user shares one hash
+    hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+    users = [
+        {"id": uuid7(), "email": f"{prefix}-{index}@example.com", "hashed_password": hashed_password}
+        for index in range(count)
+    ]
+    directory = [{"email": user["email"], "user_id": user["id"]} for user in users]
+    for start in range(0, len(directory), INSERT_CHUNK_SIZE):
+        db.execute(insert(UserDirectory), directory[start:start + INSERT_CHUNK_SIZE])
+    # Each user on the shard the ring assigns them
+    for shard, shard_engine in shard_engines.items():
+        shard_users = [user for user in users if shard_for(user["id"]) == shard]
+        for start in range(0, len(shard_users), INSERT_CHUNK_SIZE):
+            db.execute(
+                insert(User), shard_users[start:start + INSERT_CHUNK_SIZE], bind_arguments={"bind": shard_engine}
+            )
+    db.commit()
+    return [user["id"] for user in users]
+
+
+def create_portfolios(
+    db: Session,
+    user_ids: List[uuid.UUID],
+    per_user: int,
+    seed: int = 0,
+    email_frequency: Optional[str] = None
+) -> List[uuid.UUID]:
+    """Insert ``per_user`` portfolios per user, on a random recap schedule unless ``email_frequency`` is given"""
+    rng = random.Random(seed)
+    portfolios = [
+        {
+            "id": uuid7(),
+            "name": f"Portfolio {index}",
+            "description": rng.choice([None, "Long-term growth", "Income", "Speculative"]),
+            "email_frequency": email_frequency or rng.choice([None, "daily", "weekly", "monthly"]),
+            "user_id": user_id
+        }
+        for user_id in user_ids
+        for index in range(per_user)
+    ]
+    for start in range(0, len(portfolios), INSERT_CHUNK_SIZE):
+        db.execute(insert(Portfolio), portfolios[start:start + INSERT_CHUNK_SIZE])
+    db.commit()
+    return [portfolio["id"] for portfolio in portfolios]
+
+
+def create_holdings(db: Session, portfolio_id: uuid.UUID, rows: int, seed: int = 0) -> List[uuid.UUID]:
+    """Insert ``rows`` holdings keyed by uuid7, as an import would, and return their ids"""
+    rng = random.Random(seed)
+    symbols = [symbol_for(index) for index in range(rows)]
+    security_ids = security_registry.intern(db, symbols)
+    now = datetime.utcnow()
+    holdings = []
+    for symbol in symbols:
+        quantity = Decimal(rng.randint(1, 5000))
+        price = Decimal(rng.randint(100, 90000)) / 100
+        holdings.append({
+            "id": uuid7(),
+            "security_id": security_ids[symbol],
+            "quantity": quantity,
+            "price": price,
+            "market_value": quantity * price,
+            "validated": False,
+            "portfolio_id": portfolio_id,
+            "created_at": now,
+            "updated_at": now
+        })
+    for start in range(0, len(holdings), INSERT_CHUNK_SIZE):
+        db.execute(insert(PortfolioHolding), holdings[start:start + INSERT_CHUNK_SIZE])
+    db.commit()
+    return [holding["id"] for holding in holdings]
+
+
+def create_recap_history(db: Session, portfolio_ids: List[uuid.UUID], per_portfolio: int, seed: int = 0) -> int:
+    """Insert ``per_portfolio`` past recaps per portfolio, one day apart"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    recaps = []
+    inserted = 0
+    for portfolio_id in portfolio_ids:
+        for day in range(per_portfolio):
+            created_at = now - timedelta(days=per_portfolio - day)
+            recaps.append({
+                "id": uuid7(),
+                "subject": f"Portfolio Recap: {created_at:%Y-%m-%d}",
+                "content": "\n".join(
+                    " ".join(rng.choice(RECAP_WORDS) for _ in range(12)) for _ in range(20)
+                ),
+                "portfolio_id": portfolio_id,
+                "created_at": created_at,
+                "sent_at": created_at
+            })
+            if len(recaps) == INSERT_CHUNK_SIZE:
+                db.execute(insert(EmailRecap), recaps)
+                inserted += len(recaps)
+                recaps = []
+    if recaps:
+        db.execute(insert(EmailRecap), recaps)
+        inserted += len(recaps)
+    db.commit()
+    return inserted
+
+
+def create_snapshot_history(db: Session, portfolio_id: uuid.UUID, positions: int, days: int, seed: int = 0) -> int:
+    """Insert ``days`` daily snapshots ending yesterday, with prices drifting a little each day"""
+    rng = random.Random(seed)
+    symbols = [symbol_for(index) for index in range(positions)]
+    quantities = [Decimal(rng.randint(1, 5000)) for _ in symbols]
+    prices = [rng.uniform(1, 900) for _ in symbols]
+    today = date.today()
+    snapshots = []
+    for day in range(days):
+        prices = [price * rng.uniform(0.98, 1.02) for price in prices]
+        rounded = [Decimal(f"{price:.2f}") for price in prices]
+        snapshots.append({
+            "id": uuid7(),
+            "portfolio_id": portfolio_id,
+            "snapshot_date": today - timedelta(days=days - day),
+            **encode_positions([
+                (symbol, quantity, price, quantity * price)
+                for symbol, quantity, price in zip(symbols, quantities, rounded)
+            ])
+        })
+    for start in range(0, len(snapshots), INSERT_CHUNK_SIZE):
+        db.execute(insert(HoldingSnapshot), snapshots[start:start + INSERT_CHUNK_SIZE])
+    db.commit()
+    return len(snapshots)
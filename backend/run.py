@@ -1,10 +1,60 @@
+"""Start the API.
+
+    python run.py                          # development: one process with auto-reload
+    python run.py --production             # one worker per CPU, forked from a preloaded app
+    python run.py --production --workers 8 --max-requests 20000
+
+In production mode send the supervisor SIGHUP for a rolling restart and
+SIGUSR1 to log worker status.
+"""
+import argparse
+import sys
+
 import uvicorn
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--production", action="store_true", help="run the multi-worker supervisor instead of the reloader")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per available CPU)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="import the app in each worker, so SIGHUP picks up new code")
+    parser.add_argument("--max-requests", type=int, default=0, help="recycle a worker after this many requests (0: never)")
+    parser.add_argument("--max-requests-jitter", type=int, help="random extra requests per worker (default: 10%% of --max-requests)")
+    parser.add_argument("--timeout", type=float, default=30, help="kill a worker whose event loop misses heartbeats this long")
+    parser.add_argument("--graceful-timeout", type=float, default=30, help="seconds a stopping worker gets to finish requests")
+    parser.add_argument("--status-file", help="write worker status JSON here every heartbeat")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    uvicorn.run(
+    args = parse_args()
+
+    if not args.production:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level=args.log_level
+        )
+        sys.exit(0)
+
+    from app.launcher import Supervisor
+
+    sys.exit(Supervisor(
         "app.main:app",
-        host="127.0.0.1",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        preload=args.preload,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        timeout=args.timeout,
+        graceful_timeout=args.graceful_timeout,
+        status_file=args.status_file,
+        log_level=args.log_level
+    ).run())
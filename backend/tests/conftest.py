@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Settings are read when app.config is imported, so the test database and the
+# scratch working directory (uploads land in ./uploads) are set up first
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WORKDIR = tempfile.mkdtemp(prefix="scout-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(WORKDIR) / 'test.db'}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ["RECAP_SCHEDULER_ENABLED"] = "false"
+os.environ["ADMISSION_ENABLED"] = "false"
+os.environ.pop("SMTP_HOST", None)
+os.environ.pop("SYMBOL_MASTER_PATH", None)
+os.environ.pop("SHARD_URLS", None)
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(WORKDIR)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    email = f"{uuid.uuid4().hex[:12]}@example.com"
+    password = "secretpass1"
+    client.post("/auth/register", json={"email": email, "password": password})
+    token = client.post("/auth/login", json={"email": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def portfolio_id(client, auth_headers):
+    response = client.post("/api/portfolios/", json={"name": "Test", "email_frequency": "daily"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
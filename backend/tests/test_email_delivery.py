@@ -0,0 +1,96 @@
+"""Recap delivery against the in-process SMTP stand-in.
+
+Temporary (4xx) refusals are retried on the same pooled connection until
+the message goes through; permanent (5xx) ones fail the recap at once and
+leave it unsent.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.email_recap import EmailRecap
+from app.services.email_delivery import SMTPConnectionPool, deliver_pending_recaps, smtp_connection_factory
+from benchmarks.smtp_server import SMTPStandIn
+
+SENDER = "Scout Tests <recaps@example.com>"
+
+
+def generate_recap(client, headers, name: str) -> str:
+    portfolio = client.post("/api/portfolios/", json={"name": name}, headers=headers)
+    assert portfolio.status_code == 200, portfolio.text
+    recap = client.post(f"/api/portfolios/{portfolio.json()['id']}/recaps/generate", headers=headers)
+    assert recap.status_code == 200, recap.text
+    return recap.json()["id"]
+
+
+def deliver(stand_in: SMTPStandIn):
+    pool = SMTPConnectionPool(smtp_connection_factory(stand_in.host, stand_in.port, timeout=5), size=2)
+    try:
+        return deliver_pending_recaps(pool, SENDER, backoff_seconds=0)
+    finally:
+        pool.close()
+
+
+def delivery_state(recap_ids):
+    db = SessionLocal()
+    try:
+        return {
+            str(recap_id): (sent_at, attempts)
+            for recap_id, sent_at, attempts in db.execute(
+                select(EmailRecap.id, EmailRecap.sent_at, EmailRecap.delivery_attempts)
+                .where(EmailRecap.id.in_([uuid.UUID(recap_id) for recap_id in recap_ids]))
+            )
+        }
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def no_pending_recaps_from_other_tests(client):
+    # Recaps left unsent by earlier tests would be delivered here too; settle them first
+    with SMTPStandIn() as stand_in:
+        deliver(stand_in)
+
+
+def test_temporary_refusals_are_retried(client, auth_headers):
+    recap_ids = [generate_recap(client, auth_headers, f"Retried {index}") for index in range(3)]
+    refused = set()
+
+    def refuse_first_attempt(attempt, message):
+        if message not in refused:
+            refused.add(message)
+            return 451, "Try again later"
+        return None
+
+    with SMTPStandIn(refuse_first_attempt) as stand_in:
+        result = deliver(stand_in)
+
+    assert result["failed"] == 0
+    delivered = [message for message in stand_in.messages if b"Subject: Portfolio Recap: Retried" in message]
+    assert len(delivered) == 3
+    for sent_at, attempts in delivery_state(recap_ids).values():
+        assert sent_at is not None
+        assert attempts == 1
+
+
+def test_permanent_refusals_fail_without_retry(client, auth_headers):
+    rejected_id = generate_recap(client, auth_headers, "Rejected")
+    accepted_id = generate_recap(client, auth_headers, "Accepted")
+    rejections = []
+
+    def refuse_rejected(attempt, message):
+        if b"Subject: Portfolio Recap: Rejected" in message:
+            rejections.append(attempt)
+            return 550, "Mailbox unavailable"
+        return None
+
+    with SMTPStandIn(refuse_rejected) as stand_in:
+        result = deliver(stand_in)
+
+    assert result["failed"] >= 1
+    assert len(rejections) == 1
+    state = delivery_state([rejected_id, accepted_id])
+    assert state[rejected_id] == (None, 1)
+    assert state[accepted_id][0] is not None
@@ -0,0 +1,109 @@
+"""Statement budgets for the hot holdings endpoints.
+
+Each endpoint's query count must not grow with the number of holdings, so
+every test runs at two portfolio sizes against the same cap.
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.instrumentation import QueryTrackingMiddleware, assert_max_queries, instrument_engine
+
+SIZES = [20, 200]
+
+# A statement repeated this often in one request is reported as an N+1 loop
+N_PLUS_ONE = 3
+
+
+def upload_holdings(client, headers, portfolio_id, rows: int):
+    content = "symbol,name,quantity,value\n" + "".join(
+        f"T{index},Name {index},{index + 1},{(index + 1) * 10}\n" for index in range(rows)
+    )
+    response = client.post(
+        f"/api/portfolios/{portfolio_id}/upload-holdings",
+        files={"file": ("holdings.csv", content, "text/csv")},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+
+def process_holdings(client, headers, portfolio_id):
+    response = client.post(
+        f"/api/portfolios/{portfolio_id}/process-holdings",
+        json={"tickerColumn": 0, "nameColumn": 1, "quantityColumn": 2, "valueColumn": 3},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("rows", SIZES)
+def test_process_holdings_query_budget(client, auth_headers, portfolio_id, rows):
+    upload_holdings(client, auth_headers, portfolio_id, rows)
+
+    with assert_max_queries(8, n_plus_one_threshold=N_PLUS_ONE):
+        result = process_holdings(client, auth_headers, portfolio_id)
+
+    assert result["holdings_created"] == rows
+
+
+@pytest.mark.parametrize("rows", SIZES)
+def test_holdings_list_query_budget(client, auth_headers, portfolio_id, rows):
+    upload_holdings(client, auth_headers, portfolio_id, rows)
+    process_holdings(client, auth_headers, portfolio_id)
+
+    # The first read fills the holdings cache; the second is served from it
+    for limit in (3, 2):
+        with assert_max_queries(limit, n_plus_one_threshold=N_PLUS_ONE):
+            response = client.get(f"/api/portfolios/{portfolio_id}/holdings", headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == rows
+
+
+@pytest.mark.parametrize("rows", SIZES)
+def test_batch_query_budget(client, auth_headers, portfolio_id, rows):
+    upload_holdings(client, auth_headers, portfolio_id, rows)
+    process_holdings(client, auth_headers, portfolio_id)
+    holdings = client.get(f"/api/portfolios/{portfolio_id}/holdings", headers=auth_headers).json()
+
+    half = rows // 2
+    operations = (
+        [{"op": "update", "id": holding["id"], "data": {"quantity": "5"}} for holding in holdings[:half]]
+        + [{"op": "delete", "id": holding["id"]} for holding in holdings[half:half + 5]]
+        + [{"op": "create", "data": {"symbol": f"NEW{index}", "quantity": "1"}} for index in range(rows // 4)]
+    )
+
+    with assert_max_queries(10, n_plus_one_threshold=N_PLUS_ONE):
+        response = client.post(
+            f"/api/portfolios/{portfolio_id}/holdings/batch",
+            json={"operations": operations},
+            headers=auth_headers
+        )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["updated"], body["deleted"], body["created"], body["failed"]) == (half, 5, rows // 4, 0)
+
+
+def test_n_plus_one_warning_without_server_timing(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(QueryTrackingMiddleware, n_plus_one_threshold=N_PLUS_ONE)
+
+    @app.get("/loop")
+    def loop():
+        with engine.connect() as connection:
+            for _ in range(N_PLUS_ONE):
+                connection.execute(text("SELECT 1"))
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger="app.requests"):
+        TestClient(app).get("/loop")
+
+    warnings = [record.getMessage() for record in caplog.records if '"event":"n_plus_one"' in record.getMessage()]
+    assert len(warnings) == 1
+    assert f'"count":{N_PLUS_ONE}' in warnings[0]
@@ -169,7 +169,7 @@ export const EmailRecapDisplay: React.FC<EmailRecapDisplayProps> = ({
               </Badge>
               <div className="flex items-center text-sm text-muted-foreground">
                 <Clock className="h-4 w-4 mr-1" />
-                Last update: {format(new Date(latestRecap.sent_at), 'MMM d, yyyy')}
+                Last update: {format(new Date(latestRecap.sent_at ?? latestRecap.created_at), 'MMM d, yyyy')}
               </div>
             </div>
           </div>
@@ -185,7 +185,7 @@ export const EmailRecapDisplay: React.FC<EmailRecapDisplayProps> = ({
                 {latestRecap.subject}
               </CardTitle>
               <CardDescription className="text-muted-foreground">
-                Sent on {format(new Date(latestRecap.sent_at), 'EEEE, MMMM d, yyyy \'at\' h:mm a')}
+                {latestRecap.sent_at ? 'Sent on' : 'Generated on'} {format(new Date(latestRecap.sent_at ?? latestRecap.created_at), 'EEEE, MMMM d, yyyy \'at\' h:mm a')}
               </CardDescription>
             </div>
             <Button 
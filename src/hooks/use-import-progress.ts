@@ -0,0 +1,56 @@
+import * as React from "react";
+
+import { apiClient } from "@/lib/api";
+
+export interface ImportProgress {
+  processed: number;
+  total: number;
+}
+
+// How long to wait for the event stream before importing without progress
+const EVENT_STREAM_WAIT_MS = 2000;
+
+export function useImportProgress() {
+  const [progress, setProgress] = React.useState<ImportProgress | null>(null);
+
+  // Follows the portfolio's event stream while `run` is in flight. Waits until
+  // the stream is open, or a short while if it cannot be opened, so the import
+  // never waits on it for long.
+  const track = React.useCallback(async <T,>(portfolioId: string, run: () => Promise<T>): Promise<T> => {
+    const controller = new AbortController();
+    await new Promise<void>((resolve) => {
+      setTimeout(resolve, EVENT_STREAM_WAIT_MS);
+      apiClient
+        .subscribePortfolioEvents(
+          portfolioId,
+          (event) => {
+            if (event.type === "ready") {
+              resolve();
+            } else if (event.type === "import.started") {
+              setProgress({ processed: 0, total: Number(event.data.total_rows) });
+            } else if (event.type === "import.progress") {
+              setProgress({
+                processed: Number(event.data.processed_rows),
+                total: Number(event.data.total_rows),
+              });
+            }
+          },
+          controller.signal
+        )
+        .then(() => resolve());
+    });
+    try {
+      return await run();
+    } finally {
+      controller.abort();
+      setProgress(null);
+    }
+  }, []);
+
+  return { progress, track };
+}
+
+export function importProgressLabel(progress: ImportProgress | null, fallback: string) {
+  if (!progress || progress.total <= 0) return fallback;
+  return `Processing ${progress.processed.toLocaleString()} of ${progress.total.toLocaleString()} rows...`;
+}
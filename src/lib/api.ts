@@ -45,15 +45,23 @@ interface PortfolioHolding {
   updated_at: string;
 }
 
-interface EmailRecap {
+interface EmailRecapSummary {
   id: string;
   subject: string;
-  content: string;
   portfolio_id: string;
-  sent_at: string;
+  sent_at: string | null;
   created_at: string;
 }
 
+interface EmailRecap extends EmailRecapSummary {
+  content: string;
+}
+
+interface PortfolioEvent {
+  type: string;
+  data: { portfolio_id: string; [key: string]: unknown };
+}
+
 class ApiClient {
   private baseUrl: string;
   private accessToken: string | null = null;
@@ -245,8 +253,12 @@ class ApiClient {
   }
 
   // Email recap methods
-  async getPortfolioRecaps(portfolioId: string): Promise<ApiResponse<EmailRecap[]>> {
-    return this.request<EmailRecap[]>(`/api/portfolios/${portfolioId}/recaps`);
+  async getPortfolioRecaps(portfolioId: string): Promise<ApiResponse<EmailRecapSummary[]>> {
+    return this.request<EmailRecapSummary[]>(`/api/portfolios/${portfolioId}/recaps`);
+  }
+
+  async getRecap(portfolioId: string, recapId: string): Promise<ApiResponse<EmailRecap>> {
+    return this.request<EmailRecap>(`/api/portfolios/${portfolioId}/recaps/${recapId}`);
   }
 
   async getLatestRecap(portfolioId: string): Promise<ApiResponse<EmailRecap>> {
@@ -297,6 +309,54 @@ class ApiClient {
     }
   }
 
+  // Server-sent events: import progress and holding changes for one portfolio.
+  // Uses fetch rather than EventSource so the Authorization header can be sent.
+  // Resolves when the stream ends; abort the signal to unsubscribe.
+  async subscribePortfolioEvents(
+    portfolioId: string,
+    onEvent: (event: PortfolioEvent) => void,
+    signal?: AbortSignal
+  ): Promise<ApiResponse<void>> {
+    try {
+      const response = await fetch(`${this.baseUrl}/api/portfolios/${portfolioId}/events`, {
+        headers: this.accessToken ? { Authorization: `Bearer ${this.accessToken}` } : {},
+        signal,
+      });
+
+      if (!response.ok || !response.body) {
+        const errorData = await response.json().catch(() => ({}));
+        return { error: errorData.detail || `HTTP ${response.status}` };
+      }
+
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let type = 'message';
+          let data = '';
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('event: ')) type = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+          }
+          if (data) onEvent({ type, data: JSON.parse(data) });
+        }
+      }
+      return {};
+    } catch (error) {
+      if (signal?.aborted) return {};
+      return { error: error instanceof Error ? error.message : 'Network error' };
+    }
+  }
+
   async processPortfolioHoldings(
     portfolioId: string,
     columnMapping: { tickerColumn: number; nameColumn?: number }
@@ -319,7 +379,9 @@ export type {
   User,
   Portfolio,
   PortfolioHolding,
+  EmailRecapSummary,
   EmailRecap,
+  PortfolioEvent,
   AuthTokens,
   ApiResponse,
 };
\ No newline at end of file
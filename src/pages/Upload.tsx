@@ -9,6 +9,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Table, TableBody, TableCell, TableHeader, TableHead, TableRow } from '@/components/ui/table';
 import { toast } from '@/hooks/use-toast';
+import { importProgressLabel, useImportProgress } from '@/hooks/use-import-progress';
 import { Upload as UploadIcon, ArrowLeft, FileSpreadsheet, FileText, Loader2, Eye, CheckCircle } from 'lucide-react';
 
 interface FilePreviewData {
@@ -35,6 +36,7 @@ const Upload = () => {
     description: '',
     emailInstructions: ''
   });
+  const { progress: importProgress, track: trackImport } = useImportProgress();
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -197,10 +199,12 @@ const Upload = () => {
 
       // Process the file with column mapping if we have it
       if (filePreview && (columnMapping.nameColumn !== null || columnMapping.tickerColumn !== null)) {
-        const processResponse = await apiClient.processPortfolioHoldings(portfolio.id, {
-          tickerColumn: columnMapping.tickerColumn!,
-          nameColumn: columnMapping.nameColumn || undefined
-        });
+        const processResponse = await trackImport(portfolio.id, () =>
+          apiClient.processPortfolioHoldings(portfolio.id, {
+            tickerColumn: columnMapping.tickerColumn!,
+            nameColumn: columnMapping.nameColumn || undefined
+          })
+        );
 
         if (processResponse.error) {
           console.error('Processing error:', processResponse.error);
@@ -503,7 +507,7 @@ const Upload = () => {
                       {uploadingFile ? (
                         <>
                           <Loader2 className="h-4 w-4 mr-2 animate-spin" />
-                          Processing File...
+                          {importProgressLabel(importProgress, 'Processing File...')}
                         </>
                       ) : loading ? (
                         'Creating...'
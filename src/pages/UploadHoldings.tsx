@@ -8,6 +8,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Table, TableBody, TableCell, TableHeader, TableHead, TableRow } from '@/components/ui/table';
 import { toast } from '@/hooks/use-toast';
+import { importProgressLabel, useImportProgress } from '@/hooks/use-import-progress';
 import { Upload as UploadIcon, ArrowLeft, FileSpreadsheet, FileText, Loader2, Eye, CheckCircle } from 'lucide-react';
 
 interface FilePreviewData {
@@ -37,6 +38,7 @@ const UploadHoldings = () => {
   const [filePreview, setFilePreview] = useState<FilePreviewData | null>(null);
   const [columnMapping, setColumnMapping] = useState<ColumnMapping>({ nameColumn: null, tickerColumn: null });
   const [currentStep, setCurrentStep] = useState<'upload' | 'preview'>('upload');
+  const { progress: importProgress, track: trackImport } = useImportProgress();
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -207,10 +209,12 @@ const UploadHoldings = () => {
 
       // Process the file with column mapping if we have it
       if (filePreview && (columnMapping.nameColumn !== null || columnMapping.tickerColumn !== null)) {
-        const processResponse = await apiClient.processPortfolioHoldings(portfolio.id, {
-          tickerColumn: columnMapping.tickerColumn!,
-          nameColumn: columnMapping.nameColumn || undefined
-        });
+        const processResponse = await trackImport(portfolio.id, () =>
+          apiClient.processPortfolioHoldings(portfolio.id, {
+            tickerColumn: columnMapping.tickerColumn!,
+            nameColumn: columnMapping.nameColumn || undefined
+          })
+        );
 
         if (processResponse.error) {
           console.error('Processing error:', processResponse.error);
@@ -485,7 +489,7 @@ const UploadHoldings = () => {
                       {uploadingFile ? (
                         <>
                           <Loader2 className="h-4 w-4 mr-2 animate-spin" />
-                          Processing File...
+                          {importProgressLabel(importProgress, 'Processing File...')}
                         </>
                       ) : loading ? (
                         'Updating...'